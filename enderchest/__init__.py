@@ -1,9 +1,37 @@
-from . import _version
-from .enderchest import EnderChest
-from .instance import InstanceSpec
-from .shulker_box import ShulkerBox
+"""Syncing and linking for all your Minecraft instances"""
+from typing import TYPE_CHECKING, Any
 
-__version__ = _version.get_versions()["version"]
+if TYPE_CHECKING:
+    from .enderchest import EnderChest
+    from .instance import InstanceSpec
+    from .shulker_box import ShulkerBox
+
+    __version__: str
+
+# the top-level classes (and the version) are only loaded when they're first
+# accessed, so that importing a single submodule (like the CLI) stays cheap
+_LAZY_ATTRIBUTES = {
+    "EnderChest": "enderchest",
+    "InstanceSpec": "instance",
+    "ShulkerBox": "shulker_box",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        from ._version import get_versions
+
+        value = get_versions()["version"]
+    elif name in _LAZY_ATTRIBUTES:
+        import importlib
+
+        value = getattr(
+            importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__), name
+        )
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
 
 __all__ = [
@@ -1,13 +1,22 @@
-"""Command-line interface"""
+"""Command-line interface
+
+Notes
+-----
+To keep startup snappy, the modules that actually perform each action are
+only imported once that action is called, and only the parser for the
+requested action gets built.
+"""
+import importlib
 import logging
 import os
 import sys
-from argparse import ArgumentParser, RawTextHelpFormatter
+from argparse import SUPPRESS
+from argparse import Action as ArgumentAction
+from argparse import ArgumentParser, Namespace, RawTextHelpFormatter
 from pathlib import Path
-from typing import Any, Protocol, Sequence
+from typing import Any, Callable, Protocol, Sequence
 
-from . import craft, gather, loggers, place, remote
-from ._version import get_versions
+from . import loggers
 
 # mainly because I think I'm gonna forget what names are canonical (it's the first ones)
 _create_aliases = ("craft", "create")
@@ -25,10 +34,12 @@ def _place(
     minecraft_root: Path,
     errors: str = "prompt",
     cleanup: bool = False,
+    deep_clean: bool = False,
     stop_at_first_failure: bool = False,
     ignore_errors: bool = False,
     absolute: bool = False,
     relative: bool = False,
+    jobs: int | None = None,
 ) -> None:
     """Wrapper to coalesce error-handling flags and also abs/rel"""
 
@@ -42,14 +53,45 @@ def _place(
         # technically we get this for free already
         relative = False
 
+    from . import place
+
     place.place_ender_chest(
-        minecraft_root, cleanup=cleanup, error_handling=errors, relative=relative
+        minecraft_root,
+        cleanup=cleanup,
+        deep_clean=deep_clean,
+        error_handling=errors,
+        relative=relative,
+        jobs=jobs,
     )
 
 
+def _watch(
+    minecraft_root: Path, absolute: bool = False, relative: bool = False, **kwargs
+) -> None:
+    """Wrapper to resolve abs/rel the same way as `_place`"""
+    if absolute is True:
+        relative = False
+
+    from . import watch
+
+    watch.watch(minecraft_root, relative=relative, **kwargs)
+
+
+def _serve(minecraft_root: Path, stop: bool = False, **kwargs) -> None:
+    """Router for starting and stopping the service"""
+    from . import service
+
+    if stop:
+        service.stop_service(minecraft_root)
+    else:
+        service.serve(minecraft_root, **kwargs)
+
+
 def _craft_shulker_box(minecraft_root: Path, name: str | None = None, **kwargs):
     """Wrapper to handle the fact that name is a required argument"""
     assert name  # it's required by the parser, so this should be fine
+    from . import craft
+
     craft.craft_shulker_box(minecraft_root, name, **kwargs)
 
 
@@ -58,6 +100,8 @@ def _list_shulker_box(
 ):
     """Wrapper to handle the fact that name is a required argument"""
     assert shulker_box_name  # it's required by the parser, so this should be fine
+    from . import gather
+
     gather.load_shulker_box_matches(minecraft_root, shulker_box_name, **kwargs)
 
 
@@ -70,16 +114,22 @@ def _update_ender_chest(
     """Wrapper to resolve the official vs. MultiMC flag"""
     if mmc:
         official = False
+    from . import gather
+
     gather.update_ender_chest(minecraft_root, official=official, **kwargs)
 
 
 def _open(minecraft_root, **kwargs):
     """Router for open verb"""
+    from . import remote
+
     remote.sync_with_remotes(minecraft_root, "pull", **kwargs)
 
 
 def _close(minecraft_root, **kwargs):
     """Router for close verb"""
+    from . import remote
+
     remote.sync_with_remotes(minecraft_root, "push", **kwargs)
 
 
@@ -88,12 +138,36 @@ class Action(Protocol):
         ...
 
 
+class _LazyAction:
+    """An action method that lives in a module that shouldn't be imported
+    until the action is actually performed
+
+    Parameters
+    ----------
+    module : str
+        The name of the module (within this package)
+    method : str
+        The name of the method within that module
+    """
+
+    def __init__(self, module: str, method: str):
+        self.module = module
+        self.method = method
+
+    def __call__(self, minecraft_root: Path, /, **kwargs) -> Any:
+        module = importlib.import_module(f".{self.module}", __package__)
+        return getattr(module, self.method)(minecraft_root, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"{__package__}.{self.module}.{self.method}"
+
+
 ACTIONS: tuple[tuple[tuple[str, ...], str, Action], ...] = (
     # action names (first one is canonical), action description, action method
     (
         sum(((verb, verb + " enderchest") for verb in _create_aliases), ()),
         "create and configure a new EnderChest installation",
-        craft.craft_ender_chest,
+        _LazyAction("craft", "craft_ender_chest"),
     ),
     (
         tuple(
@@ -107,6 +181,16 @@ ACTIONS: tuple[tuple[tuple[str, ...], str, Action], ...] = (
         "link (or update the links) from your instances to your EnderChest",
         _place,
     ),
+    (
+        ("watch",),
+        "keep the links from your instances up to date as your EnderChest changes",
+        _watch,
+    ),
+    (
+        ("serve",),
+        "run a background service that speeds up place, list and status",
+        _serve,
+    ),
     (
         tuple("gather " + alias for alias in _instance_aliases),
         "register (or update the registry of) a Minecraft installation",
@@ -134,14 +218,14 @@ ACTIONS: tuple[tuple[tuple[str, ...], str, Action], ...] = (
             (),
         ),
         "list the shulker boxes inside your Enderchest",
-        gather.load_shulker_boxes,
+        _LazyAction("gather", "load_shulker_boxes"),
     ),
     (
         tuple(
             f"{verb} {alias}" for verb in _list_aliases for alias in _instance_aliases
         ),
         "list the minecraft instances registered with your Enderchest",
-        gather.load_ender_chest_instances,
+        _LazyAction("gather", "load_ender_chest_instances"),
     ),
     (
         tuple(
@@ -153,7 +237,7 @@ ACTIONS: tuple[tuple[tuple[str, ...], str, Action], ...] = (
     (
         tuple(f"{verb} {alias}" for verb in _list_aliases for alias in _remote_aliases),
         "list the other EnderChest installations registered with this EnderChest",
-        gather.load_ender_chest_remotes,
+        _LazyAction("gather", "load_ender_chest_remotes"),
     ),
     (
         ("open",),
@@ -165,6 +249,16 @@ ACTIONS: tuple[tuple[tuple[str, ...], str, Action], ...] = (
         "push changes to other EnderChests",
         _close,
     ),
+    (
+        ("status",),
+        "check whether this EnderChest is ahead of or behind its remotes",
+        _LazyAction("status", "report_status"),
+    ),
+    (
+        ("dedupe", "deduplicate"),
+        "store files shared between shulker boxes only once",
+        _LazyAction("store", "deduplicate"),
+    ),
 )
 
 
@@ -179,18 +273,70 @@ def generate_parsers() -> tuple[ArgumentParser, dict[str, ArgumentParser]]:
     action_parsers : dict of str to ArgumentParser
         The verb-specific argument parsers
     """
-    descriptions: dict[str, str] = {}
+    return _root_parser(), {
+        commands[0]: _action_parser(commands[0]) for commands, _, _ in ACTIONS
+    }
+
+
+def _get_version() -> str:
+    """Look up the EnderChest version (which can require a call to git,
+    so this is only done when it's actually needed)"""
+    from ._version import get_versions
+
+    return get_versions()["version"]
+
+
+class _RootParser(ArgumentParser):
+    """Top-level parser that only looks up the version if the help message
+    gets displayed"""
+
+    def format_help(self) -> str:
+        self.description = (
+            f"v{_get_version()}\n"
+            "\nsyncing and linking for all your Minecraft instances"
+        )
+        return super().format_help()
+
+
+class _VersionAction(ArgumentAction):
+    """Equivalent of argparse's "version" action that only looks up the
+    version if the flag is actually given"""
+
+    def __init__(self, option_strings: Sequence[str], dest: str = SUPPRESS, **kwargs):
+        super().__init__(
+            option_strings,
+            dest=dest,
+            default=SUPPRESS,
+            nargs=0,
+            help="show program's version number and exit",
+        )
+
+    def __call__(
+        self,
+        parser: ArgumentParser,
+        namespace: Namespace,
+        values: Any,
+        option_string: str | None = None,
+    ) -> None:
+        parser._print_message(f"{parser.prog} v{_get_version()}\n", sys.stdout)
+        parser.exit()
+
+
+def _root_parser() -> ArgumentParser:
+    """Generate the top-level parser
+
+    Returns
+    -------
+    ArgumentParser
+        The top-level argument parser responsible for routing arguments to
+        specific action parsers
+    """
     root_description: str = ""
-    for commands, description, method in ACTIONS:
-        descriptions[commands[0]] = description
+    for commands, description, _ in ACTIONS:
         root_description += f"\n\t{commands[0]}\n\t\tto {description}"
 
-    enderchest_parser = ArgumentParser(
+    enderchest_parser = _RootParser(
         prog="enderchest",
-        description=(
-            f"v{get_versions()['version']}\n"
-            "\nsyncing and linking for all your Minecraft instances"
-        ),
         formatter_class=RawTextHelpFormatter,
     )
 
@@ -198,8 +344,7 @@ def generate_parsers() -> tuple[ArgumentParser, dict[str, ArgumentParser]]:
         "-v",  # don't worry--this doesn't actually conflict with --verbose
         "-V",
         "--version",
-        action="version",
-        version=f"%(prog)s v{get_versions()['version']}",
+        action=_VersionAction,
     )
 
     # these are really just for the sake of --help
@@ -215,49 +360,71 @@ def generate_parsers() -> tuple[ArgumentParser, dict[str, ArgumentParser]]:
         help="any additional arguments for the specific action."
         " To learn more, try: enderchest {action} -h",
     )
+    return enderchest_parser
 
-    action_parsers: dict[str, ArgumentParser] = {}
-    for verb, description in descriptions.items():
-        parser = ArgumentParser(
-            prog=f"enderchest {verb}",
-            description=description,
-        )
-        root = parser.add_mutually_exclusive_group()
-        root.add_argument(
-            "root",
-            nargs="?",
-            help=(
-                "optionally specify your root minecraft directory."
-                "  If no path is given, the current working directory will be used."
-            ),
-            type=Path,
-        )
-        root.add_argument(
-            "--root",
-            dest="root_flag",
-            help="specify your root minecraft directory",
-            type=Path,
-        )
 
-        # I'm actually okay with -vvqvqqv hilarity
-        parser.add_argument(
-            "--verbose",
-            "-v",
-            action="count",
-            default=0,
-            help="increase the amount of information that's printed",
-        )
-        parser.add_argument(
-            "--quiet",
-            "-q",
-            action="count",
-            default=0,
-            help="decrease the amount of information that's printed",
-        )
-        action_parsers[verb] = parser
+def _action_parser(verb: str) -> ArgumentParser:
+    """Generate the parser for a single action
+
+    Parameters
+    ----------
+    verb : str
+        The canonical name of the action
+
+    Returns
+    -------
+    ArgumentParser
+        The verb-specific argument parser
+    """
+    for commands, description, _ in ACTIONS:
+        if commands[0] == verb:
+            break
+    else:
+        raise KeyError(f"Unknown action: {verb}")
+
+    parser = ArgumentParser(
+        prog=f"enderchest {verb}",
+        description=description,
+    )
+    root = parser.add_mutually_exclusive_group()
+    root.add_argument(
+        "root",
+        nargs="?",
+        help=(
+            "optionally specify your root minecraft directory."
+            "  If no path is given, the current working directory will be used."
+        ),
+        type=Path,
+    )
+    root.add_argument(
+        "--root",
+        dest="root_flag",
+        help="specify your root minecraft directory",
+        type=Path,
+    )
 
-    # craft options
-    craft_parser = action_parsers[_create_aliases[0]]
+    # I'm actually okay with -vvqvqqv hilarity
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help="increase the amount of information that's printed",
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="count",
+        default=0,
+        help="decrease the amount of information that's printed",
+    )
+    if verb in _ACTION_OPTIONS:
+        _ACTION_OPTIONS[verb](parser)
+    return parser
+
+
+def _add_craft_options(craft_parser: ArgumentParser) -> None:
+    """Add the options for the craft action"""
     craft_parser.add_argument(
         "--from",
         dest="copy_from",
@@ -294,8 +461,9 @@ def generate_parsers() -> tuple[ArgumentParser, dict[str, ArgumentParser]]:
         ),
     )
 
-    # shulker box craft options
-    shulker_craft_parser = action_parsers[f"{_create_aliases[0]} {_shulker_aliases[0]}"]
+
+def _add_shulker_craft_options(shulker_craft_parser: ArgumentParser) -> None:
+    """Add the options for the shulker box craft action"""
     shulker_craft_parser.add_argument(
         "name",
         help="specify the name for this shulker box",
@@ -348,8 +516,9 @@ def generate_parsers() -> tuple[ArgumentParser, dict[str, ArgumentParser]]:
         ),
     )
 
-    # place options
-    place_parser = action_parsers["place"]
+
+def _add_place_options(place_parser: ArgumentParser) -> None:
+    """Add the options for the place action"""
     place_parser.add_argument(
         "-k",
         "--keep-broken-links",
@@ -357,6 +526,14 @@ def generate_parsers() -> tuple[ArgumentParser, dict[str, ArgumentParser]]:
         dest="cleanup",
         help="do not remove broken links from instances",
     )
+    place_parser.add_argument(
+        "--deep-clean",
+        action="store_true",
+        help=(
+            "search every linked instance in its entirety for broken links"
+            " (by default, only the places where EnderChest puts links are checked)"
+        ),
+    )
     error_handling = place_parser.add_mutually_exclusive_group()
     error_handling.add_argument(
         "--stop-at-first-failure",
@@ -394,9 +571,73 @@ def generate_parsers() -> tuple[ArgumentParser, dict[str, ArgumentParser]]:
         action="store_true",
         help="use relative paths for all link targets",
     )
+    place_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help=(
+            "link this many instances at once"
+            " (default behavior is to link one instance at a time)"
+        ),
+    )
+
+
+def _add_watch_options(watch_parser: ArgumentParser) -> None:
+    """Add the options for the watch action"""
+    watch_link_type = watch_parser.add_mutually_exclusive_group()
+    watch_link_type.add_argument(
+        "--absolute",
+        "-a",
+        action="store_true",
+        help="use absolute paths for all link targets",
+    )
+    watch_link_type.add_argument(
+        "--relative",
+        "-r",
+        action="store_true",
+        help="use relative paths for all link targets",
+    )
+    watch_parser.add_argument(
+        "--polling",
+        action="store_true",
+        help=(
+            "check for changes periodically instead of using inotify"
+            " (use this if your EnderChest is on a network drive)"
+        ),
+    )
+    watch_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=SUPPRESS,
+        help=(
+            "the number of seconds to wait for things to settle down after a change"
+            " before updating any links (default is 0.5)"
+        ),
+    )
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        dest="poll_interval",
+        default=SUPPRESS,
+        help="when polling, the number of seconds between checks (default is 2)",
+    )
+
+
+def _add_serve_options(serve_parser: ArgumentParser) -> None:
+    """Add the options for the serve action"""
+    serve_parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=SUPPRESS,
+        help="shut down after this many seconds without any requests",
+    )
+    serve_parser.add_argument(
+        "--stop", action="store_true", help="stop the service if it's running"
+    )
+
 
-    # gather instance options
-    gather_instance_parser = action_parsers[f"gather {_instance_aliases[0]}"]
+def _add_gather_instance_options(gather_instance_parser: ArgumentParser) -> None:
+    """Add the options for the gather instance action"""
     gather_instance_parser.add_argument(
         "search_paths",
         nargs="+",
@@ -418,8 +659,9 @@ def generate_parsers() -> tuple[ArgumentParser, dict[str, ArgumentParser]]:
         help="specify that these are MultiMC-like instances",
     )
 
-    # gather remote options
-    gather_remote_parser = action_parsers[f"gather {_remote_aliases[0]}"]
+
+def _add_gather_remote_options(gather_remote_parser: ArgumentParser) -> None:
+    """Add the options for the gather remote action"""
     gather_remote_parser.add_argument(
         "remotes",
         nargs="+",
@@ -433,61 +675,168 @@ def generate_parsers() -> tuple[ArgumentParser, dict[str, ArgumentParser]]:
         ),
     )
 
-    # list instances options
-
-    # list shulkers options
 
-    # list shulker options
-    list_shulker_parser = action_parsers[f"{_list_aliases[0]} {_shulker_aliases[0]}"]
+def _add_list_shulker_options(list_shulker_parser: ArgumentParser) -> None:
+    """Add the options for the list shulker action"""
     list_shulker_parser.add_argument(
         "shulker_box_name", help="The name of the shulker box to query"
     )
 
-    # open / close options
-    for action in ("open", "close"):
-        sync_parser = action_parsers[action]
 
+def _add_sync_options(sync_parser: ArgumentParser, action: str) -> None:
+    """Add the options for the open and close actions"""
+    sync_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help=(
+            "Perform a dry run of the sync operation,"
+            " reporting the operations that will be performed"
+            " but not actually carrying them out"
+        ),
+    )
+    sync_parser.add_argument(
+        "--exclude",
+        "-e",
+        nargs="+",
+        help="Provide any file patterns you would like to skip syncing",
+    )
+    sync_parser.add_argument(
+        "--timeout",
+        "-t",
+        type=int,
+        help=(
+            "Set a maximum number of seconds to try to sync to a remote chest"
+            " before giving up and going on to the next one"
+        ),
+    )
+    sync_parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        default=SUPPRESS,
+        help=(
+            "The number of files to copy at once when syncing with a local"
+            " (file://) remote. By default, files are copied one at a time."
+        ),
+    )
+    sync_parser.add_argument(
+        "--hardlink",
+        nargs="+",
+        default=SUPPRESS,
+        help=(
+            "Provide any file patterns (say, *.jar) for files that should be"
+            " hard-linked rather than copied when syncing with a local (file://)"
+            " remote on the same filesystem. Only use this for files that never"
+            " get edited in place."
+        ),
+    )
+    if action == "open":
         sync_parser.add_argument(
-            "--dry-run",
+            "--fastest",
+            dest="fastest_remote",
             action="store_true",
+            default=SUPPRESS,
             help=(
-                "Perform a dry run of the sync operation,"
-                " reporting the operations that will be performed"
-                " but not actually carrying them out"
+                "Check in with every remote first and pull from the one that"
+                " was most recently updated (and, among those, responds"
+                " the quickest) rather than going through the remotes in order"
             ),
         )
-        sync_parser.add_argument(
-            "--exclude",
-            "-e",
-            nargs="+",
-            help="Provide any file patterns you would like to skip syncing",
-        )
-        sync_parser.add_argument(
-            "--timeout",
-            "-t",
-            type=int,
-            help=(
-                "Set a maximum number of seconds to try to sync to a remote chest"
-                " before giving up and going on to the next one"
-            ),
+        concurrency_help = (
+            "When using --fastest, the maximum number of remotes to check in"
+            " with at once. By default, all remotes are checked at once."
         )
-        sync_confirm_wait = sync_parser.add_mutually_exclusive_group()
-        sync_confirm_wait.add_argument(
-            "--wait",
-            "-w",
-            dest="sync_confirm_wait",
-            type=int,
-            help=(
-                "The default behavior when syncing EnderChests is to first perform a"
-                " dry run of every sync operation and then wait 5 seconds before"
-                " proceeding with the real sync. The idea is to give you time to"
-                " interrupt the sync if the dry run looks wrong. You can raise or"
-                " lower that wait time through this flag. You can also modify it"
-                " by editing the enderchest.cfg file."
-            ),
+    else:
+        concurrency_help = (
+            "Push to up to this many remotes at once. All dry runs will be"
+            " performed first, followed by a single wait (or confirmation)"
+            " before the real pushes. By default, remotes are pushed to"
+            " one at a time."
         )
+    sync_parser.add_argument(
+        "--concurrency", type=int, default=SUPPRESS, help=concurrency_help
+    )
+    sync_confirm_wait = sync_parser.add_mutually_exclusive_group()
+    sync_confirm_wait.add_argument(
+        "--wait",
+        "-w",
+        dest="sync_confirm_wait",
+        type=int,
+        help=(
+            "The default behavior when syncing EnderChests is to first perform a"
+            " dry run of every sync operation and then wait 5 seconds before"
+            " proceeding with the real sync. The idea is to give you time to"
+            " interrupt the sync if the dry run looks wrong. You can raise or"
+            " lower that wait time through this flag. You can also modify it"
+            " by editing the enderchest.cfg file."
+        ),
+    )
+
+
+def _add_status_options(status_parser: ArgumentParser) -> None:
+    """Add the options for the status action"""
+    status_parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only check for local changes (don't check in with any remotes)",
+    )
+    status_parser.add_argument(
+        "--timeout",
+        "-t",
+        type=int,
+        help=(
+            "Set a maximum number of seconds to wait for each remote to respond"
+            " before giving up on it"
+        ),
+    )
+
+
+def _add_dedupe_options(dedupe_parser: ArgumentParser) -> None:
+    """Add the options for the dedupe action"""
+    dedupe_parser.add_argument(
+        "--pattern",
+        "-p",
+        dest="patterns",
+        nargs="+",
+        default=SUPPRESS,
+        help=(
+            "Provide the file patterns for the files that should be deduplicated"
+            " (default is: *.jar *.zip). Only use this for files that never get"
+            " edited in place."
+        ),
+    )
+    dedupe_parser.add_argument(
+        "--symlink",
+        "-s",
+        action="store_true",
+        help=(
+            "Link files in your shulker boxes to the store using symlinks"
+            " (by default, hard links are used)"
+        ),
+    )
+    dedupe_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would be deduplicated without actually changing anything",
+    )
 
-    return enderchest_parser, action_parsers
+
+_ACTION_OPTIONS: dict[str, Callable[[ArgumentParser], None]] = {
+    _create_aliases[0]: _add_craft_options,
+    f"{_create_aliases[0]} {_shulker_aliases[0]}": _add_shulker_craft_options,
+    "place": _add_place_options,
+    "watch": _add_watch_options,
+    "serve": _add_serve_options,
+    f"gather {_instance_aliases[0]}": _add_gather_instance_options,
+    f"gather {_remote_aliases[0]}": _add_gather_remote_options,
+    f"{_list_aliases[0]} {_shulker_aliases[0]}": _add_list_shulker_options,
+    "open": lambda parser: _add_sync_options(parser, "open"),
+    "close": lambda parser: _add_sync_options(parser, "close"),
+    "status": _add_status_options,
+    "dedupe": _add_dedupe_options,
+}
+"""The functions for adding the action-specific options to each action's parser,
+keyed by canonical action name"""
 
 
 def parse_args(argv: Sequence[str]) -> tuple[Action, Path, int, dict[str, Any]]:
@@ -519,14 +868,14 @@ def parse_args(argv: Sequence[str]) -> tuple[Action, Path, int, dict[str, Any]]:
             aliases[command] = commands[0]
         actions[commands[0]] = method
 
-    enderchest_parser, action_parsers = generate_parsers()
+    enderchest_parser = _root_parser()
 
     _ = enderchest_parser.parse_args(argv[1:2])  # check for --help and --version
 
     for command in sorted(aliases.keys(), key=lambda x: -len(x)):  # longest first
         if " ".join((*argv[1:], "")).startswith(command + " "):
             action_kwargs = vars(
-                action_parsers[aliases[command]].parse_args(
+                _action_parser(aliases[command]).parse_args(
                     argv[1 + len(command.split()) :]
                 )
             )
@@ -564,4 +913,16 @@ def main():
     # TODO: when we add log files, set this to minimum log level across all handlers
     logger.setLevel(log_level)
 
+    for commands, _, method in ACTIONS:
+        if method is action:
+            from . import service
+
+            if (
+                commands[0] in service.SERVED_ACTIONS
+                and not service.will_prompt(commands[0], kwargs)
+                and service.request(root, commands[0], kwargs, log_level=log_level)
+            ):
+                return
+            break
+
     action(root, **kwargs)
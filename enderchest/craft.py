@@ -336,14 +336,15 @@ def specify_ender_chest_from_prompt(minecraft_root: Path) -> EnderChest:
             prompt(
                 (
                     "Specify the method for syncing with this EnderChest."
-                    "\nSupported protocols are: " + ", ".join(sync.SUPPORTED_PROTOCOLS)
+                    "\nSupported protocols are: "
+                    + ", ".join(sync.registered_protocols())
                 ),
                 suggestion=sync.DEFAULT_PROTOCOL,
             ).lower()
             or sync.DEFAULT_PROTOCOL
         )
 
-        if protocol not in sync.SUPPORTED_PROTOCOLS:
+        if protocol not in sync.registered_protocols():
             CRAFT_LOGGER.error("Unsupported protocol\n")
             continue
         break
@@ -1,6 +1,8 @@
 """Specification and configuration of an EnderChest"""
 import datetime as dt
-from configparser import ConfigParser, ParsingError
+from configparser import ConfigParser
+from configparser import Error as ConfigParserError
+from configparser import ParsingError
 from dataclasses import dataclass
 from io import StringIO
 from pathlib import Path
@@ -11,7 +13,6 @@ from urllib.parse import ParseResult, urlparse
 from . import filesystem as fs
 from . import instance as i
 from . import sync
-from ._version import get_versions
 from .loggers import CRAFT_LOGGER, GATHER_LOGGER
 from .sync import path_from_uri
 
@@ -226,13 +227,7 @@ class EnderChest:
         FileNotFoundError
             If there is no config file at the specified location
         """
-        parser = ConfigParser(
-            allow_no_value=True,
-            delimiters=("=",),
-            inline_comment_prefixes=(";",),
-            interpolation=None,
-        )
-        parser.optionxform = str  # type: ignore
+        parser = _config_parser()
         try:
             assert parser.read(config_file)
         except ParsingError as bad_cfg:
@@ -243,6 +238,59 @@ class EnderChest:
         # All I'm gonna say is that Windows pathing is the worst
         path = urlparse(config_file.absolute().parent.parent.as_uri()).path
 
+        return cls._from_parser(parser, path)
+
+    @classmethod
+    def from_string(cls, contents: str, path: str) -> "EnderChest":
+        """Parse an EnderChest from the contents of its config file
+
+        Parameters
+        ----------
+        contents : str
+            The contents of the config file
+        path : str
+            The path (URI-style) to the minecraft root containing the
+            EnderChest
+
+        Returns
+        -------
+        EnderChest
+            The resulting EnderChest
+
+        Raises
+        ------
+        ValueError
+            If the config cannot be parsed
+        """
+        parser = _config_parser()
+        try:
+            parser.read_string(contents)
+        except ConfigParserError as bad_cfg:
+            raise ValueError("Could not parse EnderChest config") from bad_cfg
+        return cls._from_parser(parser, path)
+
+    @classmethod
+    def _from_parser(cls, parser: ConfigParser, path: str) -> "EnderChest":
+        """Create an EnderChest from its parsed config
+
+        Parameters
+        ----------
+        parser : ConfigParser
+            The parsed config
+        path : str
+            The path (URI-style) to the minecraft root containing the
+            EnderChest
+
+        Returns
+        -------
+        EnderChest
+            The resulting EnderChest
+
+        Raises
+        ------
+        ValueError
+            If the config is invalid
+        """
         instances: list[i.InstanceSpec] = []
         remotes: list[str | tuple[str, str]] = []
 
@@ -333,6 +381,8 @@ class EnderChest:
             str(self.offer_to_update_symlink_allowlist),
         )
         config.set("properties", "last_modified", dt.datetime.now().isoformat(sep=" "))
+        from ._version import get_versions  # (which can call out to git)
+
         config.set(
             "properties", "generated_by_enderchest_version", get_versions()["version"]
         )
@@ -410,4 +460,23 @@ def create_ender_chest(minecraft_root: Path, ender_chest: EnderChest) -> None:
 
     config_path = fs.ender_chest_config(minecraft_root, check_exists=False)
     ender_chest.write_to_cfg(config_path)
+    fs.invalidate_cached_config(config_path)
     CRAFT_LOGGER.info(f"EnderChest configuration written to {config_path}")
+
+
+def _config_parser() -> ConfigParser:
+    """Create the parser for reading EnderChest configs
+
+    Returns
+    -------
+    ConfigParser
+        A parser set up to read EnderChest config files
+    """
+    parser = ConfigParser(
+        allow_no_value=True,
+        delimiters=("=",),
+        inline_comment_prefixes=(";",),
+        interpolation=None,
+    )
+    parser.optionxform = str  # type: ignore
+    return parser
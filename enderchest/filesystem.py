@@ -1,15 +1,33 @@
 """Functionality for managing the EnderChest and shulker box config files and folders"""
+import hashlib
+import os
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Callable, Iterable, TypeVar
 
 from .loggers import GATHER_LOGGER
 
+Config = TypeVar("Config")
+
 ENDER_CHEST_FOLDER_NAME = "EnderChest"
 
 ENDER_CHEST_CONFIG_NAME = "enderchest.cfg"
 
 SHULKER_BOX_CONFIG_NAME = "shulkerbox.cfg"
 
+LINK_MANIFEST_NAME = ".link_manifest.json"
+INDEX_NAME = ".index.json"
+SYNC_STATE_NAME = ".sync_state.json"
+
+STORE_FOLDER_NAME = "_objects"
+
+# folders that can be huge but that will never contain a Minecraft installation
+SKIP_WHEN_SEARCHING = frozenset(("saves", "libraries", "assets", ".git"))
+
+# parsed config files, keyed by absolute path (and the path as it was
+# provided, since that can end up in the parsed config) and stored alongside
+# the (mtime_ns, size) of the file at the time it was parsed
+_CONFIG_CACHE: dict[tuple[Path, Path], tuple[tuple[int, int], Any]] = {}
+
 
 def ender_chest_folder(minecraft_root: Path, check_exists: bool = True) -> Path:
     """Given a minecraft root directory, return the path to the EnderChest
@@ -122,6 +140,165 @@ def shulker_box_config(minecraft_root: Path, shulker_box_name: str) -> Path:
     return shulker_box_root(minecraft_root, shulker_box_name) / SHULKER_BOX_CONFIG_NAME
 
 
+def link_manifest(minecraft_root: Path) -> Path:
+    """Generate the path to the manifest recording the links that EnderChest
+    has placed into this machine's instances
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+
+    Returns
+    -------
+    Path
+        The path to the link manifest
+
+    Raises
+    ------
+    FileNotFoundError
+        If no valid EnderChest installation exists within the given
+        minecraft root
+
+    Notes
+    -----
+    - This method does not check if a link manifest exists at that location
+    - The manifest is a hidden file, so it is never synced to other machines
+    """
+    return ender_chest_folder(minecraft_root) / LINK_MANIFEST_NAME
+
+
+def index_file(minecraft_root: Path) -> Path:
+    """Generate the path to the index recording the size, modification time
+    (and, optionally, the hash) of every file in the EnderChest
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+
+    Returns
+    -------
+    Path
+        The path to the index
+
+    Raises
+    ------
+    FileNotFoundError
+        If no valid EnderChest installation exists within the given
+        minecraft root
+
+    Notes
+    -----
+    - This method does not check if an index exists at that location
+    - The index is a hidden file, so it is never synced to other machines
+    """
+    return ender_chest_folder(minecraft_root) / INDEX_NAME
+
+
+def sync_state_file(minecraft_root: Path) -> Path:
+    """Generate the path to the record of what the EnderChest looked like
+    the last time it was successfully synced with each remote
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+
+    Returns
+    -------
+    Path
+        The path to the sync state file
+
+    Raises
+    ------
+    FileNotFoundError
+        If no valid EnderChest installation exists within the given
+        minecraft root
+
+    Notes
+    -----
+    - This method does not check if a sync state file exists at that location
+    - The sync state is a hidden file, so it is never synced to other machines
+    """
+    return ender_chest_folder(minecraft_root) / SYNC_STATE_NAME
+
+
+def service_socket(minecraft_root: Path) -> Path:
+    """Generate the path to the socket for talking to the EnderChest service
+    running against the specified minecraft root
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+
+    Returns
+    -------
+    Path
+        The path to the socket
+
+    Raises
+    ------
+    FileNotFoundError
+        If no valid EnderChest installation exists within the given
+        minecraft root
+
+    Notes
+    -----
+    - This method does not check if a socket exists at that location
+    - Socket paths are limited to ~100 characters, so rather than living
+      inside the EnderChest folder, sockets live in a per-user folder inside
+      $XDG_RUNTIME_DIR (or the system's temp folder), named after a hash of
+      the EnderChest's location. The service won't use that folder unless
+      it's a real folder that only the current user can access.
+    """
+    import tempfile  # (which is comparatively slow to import)
+
+    chest_folder = os.path.abspath(ender_chest_folder(minecraft_root))
+    runtime_folder = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+    return (
+        Path(runtime_folder)
+        / f"enderchest-{user}"
+        / f"{hashlib.blake2b(chest_folder.encode(), digest_size=8).hexdigest()}.sock"
+    )
+
+
+def store_folder(minecraft_root: Path) -> Path:
+    """Generate the path to the content-addressed store holding files shared
+    between shulker boxes
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+
+    Returns
+    -------
+    Path
+        The path to the store
+
+    Raises
+    ------
+    FileNotFoundError
+        If no valid EnderChest installation exists within the given
+        minecraft root
+
+    Notes
+    -----
+    - This method does not check if the store exists
+    - The store is *not* hidden, so it gets synced along with the shulker boxes
+      (which is what lets symlinks into the store work on other machines)
+    """
+    return ender_chest_folder(minecraft_root) / STORE_FOLDER_NAME
+
+
 def shulker_box_configs(minecraft_root: Path) -> Iterable[Path]:
     """Find all shulker box configs on the system
 
@@ -160,7 +337,92 @@ def minecraft_folders(search_path: Path) -> Iterable[Path]:
 
     Notes
     -----
-    This method does not check to make sure that those .minecraft folders
-    contain valid minecraft instances, just that they exist
+    - This method does not check to make sure that those .minecraft folders
+      contain valid minecraft instances, just that they exist
+    - To keep the search fast, this method does not look inside of .minecraft
+      folders (for nested installations) or inside any folders listed in
+      `SKIP_WHEN_SEARCHING`, and it does not follow symlinks (other than
+      to a .minecraft folder itself)
+    """
+    try:
+        entries = list(os.scandir(search_path))
+    except (NotADirectoryError, FileNotFoundError, PermissionError):
+        return
+    for entry in sorted(entries, key=lambda entry: entry.name):
+        try:
+            if entry.name == ".minecraft":
+                if entry.is_dir():
+                    yield search_path / entry.name
+            elif entry.name not in SKIP_WHEN_SEARCHING and entry.is_dir(
+                follow_symlinks=False
+            ):
+                yield from minecraft_folders(search_path / entry.name)
+        except OSError as search_fail:
+            GATHER_LOGGER.debug(f"Could not search {entry.path}:\n  {search_fail}")
+
+
+def cached_config(config_file: Path, parse: Callable[[Path], Config]) -> Config:
+    """Parse a config file, re-using the results of a previous parse if the
+    file hasn't changed since
+
+    Parameters
+    ----------
+    config_file : Path
+        The path to the config file
+    parse : method
+        The method to use to parse the config file (if it hasn't already been
+        parsed), e.g. `ShulkerBox.from_cfg`
+
+    Returns
+    -------
+    object
+        The parsed config
+
+    Raises
+    ------
+    ValueError
+        If the config file at that location cannot be parsed
+    FileNotFoundError
+        If there is no config file at the specified location
+
+    Notes
+    -----
+    - A file is considered unchanged if its modification time and size are
+      both unchanged
+    - The same object is returned every time the (unchanged) file is loaded,
+      so if the parsed config is mutable, you may want to make a copy of it
+    - Failed parses are never cached
+    """
+    key = (Path(os.path.abspath(config_file)), Path(config_file))
+    try:
+        stat = os.stat(config_file)
+    except OSError:
+        _CONFIG_CACHE.pop(key, None)
+        return parse(config_file)  # let the parser report the problem
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if key in _CONFIG_CACHE:
+        cached_signature, config = _CONFIG_CACHE[key]
+        if cached_signature == signature:
+            GATHER_LOGGER.debug(f"Using previously parsed {config_file}")
+            return config
+    config = parse(config_file)
+    _CONFIG_CACHE[key] = (signature, config)
+    return config
+
+
+def invalidate_cached_config(config_file: Path | None = None) -> None:
+    """Forget the results of parsing a config file, so that the next time it's
+    loaded it will be parsed from scratch
+
+    Parameters
+    ----------
+    config_file : Path, optional
+        The config file to forget. If None is provided, *all* cached configs
+        will be forgotten.
     """
-    return search_path.rglob(".minecraft")
+    if config_file is None:
+        _CONFIG_CACHE.clear()
+    else:
+        path = Path(os.path.abspath(config_file))
+        for key in [key for key in _CONFIG_CACHE if key[0] == path]:
+            del _CONFIG_CACHE[key]
@@ -1,8 +1,10 @@
 """Functionality for finding, resolving and parsing local installations and instances"""
+import copy
 import json
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from configparser import ConfigParser, ParsingError
 from pathlib import Path
 from typing import Iterable, Sequence
@@ -40,10 +42,16 @@ def load_ender_chest(minecraft_root: Path) -> EnderChest:
         enderchest.cfg file exists within that EnderChest folder
     ValueError
         If the EnderChest configuration is invalid and could not be parsed
+
+    Notes
+    -----
+    The parsed configuration is cached, so loading the same (unmodified)
+    config multiple times within the same process will only parse it once.
     """
     config_path = fs.ender_chest_config(minecraft_root)
     GATHER_LOGGER.debug(f"Loading {config_path}")
-    ender_chest = EnderChest.from_cfg(config_path)
+    # EnderChests are mutable, so every caller gets their own copy
+    ender_chest = copy.deepcopy(fs.cached_config(config_path, EnderChest.from_cfg))
     GATHER_LOGGER.debug(f"Parsed EnderChest installation from {minecraft_root}")
     return ender_chest
 
@@ -212,7 +220,7 @@ def _load_shulker_box(config_file: Path) -> ShulkerBox:
         If there was a problem parsing the config file
     """
     GATHER_LOGGER.debug(f"Attempting to parse {config_file}")
-    shulker_box = ShulkerBox.from_cfg(config_file)
+    shulker_box = fs.cached_config(config_file, ShulkerBox.from_cfg)
     GATHER_LOGGER.debug(f"Successfully parsed {_render_shulker_box(shulker_box)}")
     return shulker_box
 
@@ -369,7 +377,10 @@ def load_shulker_box_matches(
 
 
 def gather_minecraft_instances(
-    minecraft_root: Path, search_path: Path, official: bool | None
+    minecraft_root: Path,
+    search_path: Path,
+    official: bool | None,
+    jobs: int | None = None,
 ) -> list[InstanceSpec]:
     """Search the specified directory for Minecraft installations and return
     any that are can be found and parsed
@@ -387,6 +398,9 @@ def gather_minecraft_instances(
           - from the official launcher (official=True)
           - from a MultiMC-style launcher (official=False)
           - a mix / unsure (official=None)
+    jobs : int, optional
+        The maximum number of instances to parse at once. By default, this
+        will be determined by the number of CPUs on your system.
 
     Returns
     -------
@@ -395,6 +409,8 @@ def gather_minecraft_instances(
 
     Notes
     -----
+    - See `fs.minecraft_folders` for the folders that are skipped over
+      during the search
     - If a minecraft installation is found but cannot be parsed
       (or parsed as specified) this method will report that failure but then
       continue on.
@@ -407,39 +423,18 @@ def gather_minecraft_instances(
         # because this method can be called during crafting
         ender_chest = EnderChest(minecraft_root)
     GATHER_LOGGER.debug(f"Searching for Minecraft folders inside {search_path}")
-    instances: list[InstanceSpec] = []
-    for folder in fs.minecraft_folders(search_path):
-        folder_path = folder.absolute()
-        GATHER_LOGGER.debug(f"Found minecraft installation at {folder}")
-        if official is not False:
-            try:
-                instances.append(gather_metadata_for_official_instance(folder_path))
-                GATHER_LOGGER.info(
-                    f"Gathered official Minecraft installation from {folder}"
-                )
-                _check_for_allowed_symlinks(ender_chest, instances[-1])
-                continue
-            except ValueError as not_official:
-                GATHER_LOGGER.log(
-                    logging.DEBUG if official is None else logging.WARNING,
-                    (f"{folder} is not an official instance:" f"\n{not_official}",),
-                )
-        if official is not True:
-            try:
-                instances.append(gather_metadata_for_mmc_instance(folder_path))
-                GATHER_LOGGER.info(
-                    f"Gathered MMC-like Minecraft installation from {folder}"
-                )
-                _check_for_allowed_symlinks(ender_chest, instances[-1])
-                continue
-            except ValueError as not_mmc:
-                GATHER_LOGGER.log(
-                    logging.DEBUG if official is None else logging.WARNING,
-                    f"{folder} is not an MMC-like instance:\n{not_mmc}",
-                )
-        GATHER_LOGGER.warning(
-            f"{folder_path} does not appear to be a valid Minecraft instance"
+    folders = list(fs.minecraft_folders(search_path))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        parsed = list(
+            pool.map(lambda folder: _gather_instance(folder, official), folders)
         )
+
+    instances: list[InstanceSpec] = []
+    for mc_instance in parsed:
+        if mc_instance is not None:
+            # this can prompt, so it can't happen inside the thread pool
+            _check_for_allowed_symlinks(ender_chest, mc_instance)
+            instances.append(mc_instance)
     for i, mc_instance in enumerate(instances):
         try:
             instances[i] = mc_instance._replace(
@@ -455,6 +450,55 @@ def gather_minecraft_instances(
     return instances
 
 
+def _gather_instance(folder: Path, official: bool | None) -> InstanceSpec | None:
+    """Parse the metadata for a single Minecraft installation
+
+    Parameters
+    ----------
+    folder : Path
+        The installation's .minecraft folder
+    official : bool or None
+        Whether the installation is expected to be from the official launcher
+        (True), from a MultiMC-like launcher (False) or either (None)
+
+    Returns
+    -------
+    InstanceSpec or None
+        The parsed instance, or None if the installation could not be parsed
+        (or parsed as specified)
+    """
+    folder_path = folder.absolute()
+    GATHER_LOGGER.debug(f"Found minecraft installation at {folder}")
+    if official is not False:
+        try:
+            mc_instance = gather_metadata_for_official_instance(folder_path)
+            GATHER_LOGGER.info(
+                f"Gathered official Minecraft installation from {folder}"
+            )
+            return mc_instance
+        except ValueError as not_official:
+            GATHER_LOGGER.log(
+                logging.DEBUG if official is None else logging.WARNING,
+                (f"{folder} is not an official instance:" f"\n{not_official}",),
+            )
+    if official is not True:
+        try:
+            mc_instance = gather_metadata_for_mmc_instance(folder_path)
+            GATHER_LOGGER.info(
+                f"Gathered MMC-like Minecraft installation from {folder}"
+            )
+            return mc_instance
+        except ValueError as not_mmc:
+            GATHER_LOGGER.log(
+                logging.DEBUG if official is None else logging.WARNING,
+                f"{folder} is not an MMC-like instance:\n{not_mmc}",
+            )
+    GATHER_LOGGER.warning(
+        f"{folder_path} does not appear to be a valid Minecraft instance"
+    )
+    return None
+
+
 def gather_metadata_for_official_instance(
     minecraft_folder: Path, name: str = "official"
 ) -> InstanceSpec:
@@ -560,33 +604,16 @@ def gather_metadata_for_mmc_instance(
 
     Notes
     -----
-    If this method is failing to find the appropriate files, you may want
-    to try ensuring that minecraft_folder is an absolute path.
+    - If this method is failing to find the appropriate files, you may want
+      to try ensuring that minecraft_folder is an absolute path.
+    - The contents of mmc-pack.json, instgroups.json and instance.cfg are
+      cached (see `fs.cached_config`), so re-gathering an unchanged instance
+      doesn't require re-reading any of them, and instgroups.json only needs
+      to be parsed once for all the instances in a launcher.
     """
     mmc_pack_file = minecraft_folder.parent / "mmc-pack.json"
     try:
-        with mmc_pack_file.open() as mmc_json:
-            components: list[dict] = json.load(mmc_json)["components"]
-
-        version: str | None = None
-        modloader: str | None = None
-
-        for component in components:
-            match component.get("uid"), component.get("cachedName", ""):
-                case "net.minecraft", _:
-                    version = _parse_version(component["version"])
-                case "net.fabricmc.fabric-loader", _:
-                    modloader = "Fabric Loader"
-                case "org.quiltmc.quilt-loader", _:
-                    modloader = "Quilt Loader"
-                case ("net.minecraftforge", _) | (_, "Forge"):
-                    modloader = "Forge"
-                case _, name if name.endswith("oader"):
-                    modloader = name
-                case _:
-                    continue
-        if version is None:
-            raise KeyError("Could not find a net.minecraft component")
+        version, modloader = fs.cached_config(mmc_pack_file, _parse_mmc_pack)
     except FileNotFoundError as no_json:
         raise ValueError(f"Could not find {mmc_pack_file}") from no_json
     except json.JSONDecodeError as bad_json:
@@ -600,7 +627,7 @@ def gather_metadata_for_mmc_instance(
 
     name = minecraft_folder.parent.name
 
-    tags: list[str] = []
+    tags: tuple[str, ...] = ()
 
     if name == "":
         GATHER_LOGGER.warn(
@@ -613,13 +640,8 @@ def gather_metadata_for_mmc_instance(
         )
 
         try:
-            with instgroups_file.open() as groups_json:
-                groups: dict[str, dict] = json.load(groups_json)["groups"]
-            for tag, metadata in groups.items():
-                # interestingly this comes from the folder name, not the actual name
-                if name in metadata.get("instances", ()):
-                    tags.append(tag)
-
+            # interestingly this comes from the folder name, not the actual name
+            tags = fs.cached_config(instgroups_file, _parse_instgroups).get(name, ())
         except FileNotFoundError as no_json:
             GATHER_LOGGER.warn(
                 f"Could not find {instgroups_file} and thus could not load tags"
@@ -628,15 +650,13 @@ def gather_metadata_for_mmc_instance(
             GATHER_LOGGER.warn(
                 f"{instgroups_file} is corrupt and could not be parsed for tags"
             )
-        except KeyError as weird_json:
+        except (KeyError, AttributeError) as weird_json:
             GATHER_LOGGER.warn(f"Could not parse tags from {instgroups_file}")
 
     instance_cfg = minecraft_folder.parent / "instance.cfg"
 
     try:
-        parser = ConfigParser(allow_no_value=True, interpolation=None)
-        parser.read_string("[instance]\n" + instance_cfg.read_text())
-        name = parser["instance"]["name"]
+        name = fs.cached_config(instance_cfg, _parse_instance_cfg)
     except FileNotFoundError as no_cfg:
         GATHER_LOGGER.warn(
             f"Could not find {instance_cfg} and thus could not load the instance name"
@@ -651,7 +671,115 @@ def gather_metadata_for_mmc_instance(
     if name == "":
         raise ValueError("Could not determine the name of the instance.")
 
-    return InstanceSpec(name, minecraft_folder, (version,), modloader, tuple(tags))
+    return InstanceSpec(name, minecraft_folder, (version,), modloader, tags)
+
+
+def _parse_mmc_pack(mmc_pack_file: Path) -> tuple[str, str | None]:
+    """Parse the Minecraft version and modloader out of an mmc-pack.json
+
+    Parameters
+    ----------
+    mmc_pack_file : Path
+        The path to the mmc-pack.json file
+
+    Returns
+    -------
+    str
+        The Minecraft version
+    str or None
+        The modloader (None if it's a vanilla instance)
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist
+    JSONDecodeError
+        If the file is not valid JSON
+    KeyError
+        If the file does not specify a Minecraft version
+    """
+    with mmc_pack_file.open() as mmc_json:
+        components: list[dict] = json.load(mmc_json)["components"]
+
+    version: str | None = None
+    modloader: str | None = None
+
+    for component in components:
+        match component.get("uid"), component.get("cachedName", ""):
+            case "net.minecraft", _:
+                version = _parse_version(component["version"])
+            case "net.fabricmc.fabric-loader", _:
+                modloader = "Fabric Loader"
+            case "org.quiltmc.quilt-loader", _:
+                modloader = "Quilt Loader"
+            case ("net.minecraftforge", _) | (_, "Forge"):
+                modloader = "Forge"
+            case _, name if name.endswith("oader"):
+                modloader = name
+            case _:
+                continue
+    if version is None:
+        raise KeyError("Could not find a net.minecraft component")
+    return version, modloader
+
+
+def _parse_instgroups(instgroups_file: Path) -> dict[str, tuple[str, ...]]:
+    """Parse a launcher's instgroups.json into the tags for each instance
+
+    Parameters
+    ----------
+    instgroups_file : Path
+        The path to the instgroups.json file
+
+    Returns
+    -------
+    dict of str to tuple of str
+        The groups each instance belongs to, keyed by the name of the
+        instance's folder
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist
+    JSONDecodeError
+        If the file is not valid JSON
+    KeyError
+        If the file does not specify any groups
+    """
+    with instgroups_file.open() as groups_json:
+        groups: dict[str, dict] = json.load(groups_json)["groups"]
+    tags: dict[str, list[str]] = {}
+    for tag, metadata in groups.items():
+        for instance_folder in metadata.get("instances", ()):
+            tags.setdefault(instance_folder, []).append(tag)
+    return {instance_folder: tuple(tags[instance_folder]) for instance_folder in tags}
+
+
+def _parse_instance_cfg(instance_cfg: Path) -> str:
+    """Parse the name of an instance out of its instance.cfg
+
+    Parameters
+    ----------
+    instance_cfg : Path
+        The path to the instance.cfg file
+
+    Returns
+    -------
+    str
+        The name of the instance
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist
+    ParsingError
+        If the file could not be parsed
+    KeyError
+        If the file does not specify a name
+    """
+    parser = ConfigParser(allow_no_value=True, interpolation=None)
+    parser.read_string("[instance]\n" + instance_cfg.read_text())
+    return parser["instance"]["name"]
 
 
 def update_ender_chest(
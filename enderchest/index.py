@@ -0,0 +1,440 @@
+"""Persistent index of the contents of an EnderChest, for quickly working out
+what's changed"""
+import datetime as dt
+import hashlib
+import json
+import os
+import stat
+from collections import defaultdict
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple
+
+from . import filesystem as fs
+from .loggers import SYNC_LOGGER
+
+
+class IndexEntry(NamedTuple):
+    """The recorded state of a single file (or symlink) in the EnderChest
+
+    Parameters
+    ----------
+    size : int
+        The size of the file, in bytes
+    mtime_ns : int
+        The modification time of the file, in nanoseconds
+    inode : int
+        The file's inode number
+    digest : str or None
+        The hex-encoded BLAKE2 hash of the file's contents, if it's been
+        computed (for a symlink, this is the hash of the link's target)
+    """
+
+    size: int
+    mtime_ns: int
+    inode: int
+    digest: str | None = None
+
+
+class Index(NamedTuple):
+    """The recorded state of an EnderChest
+
+    Parameters
+    ----------
+    folders : dict of str to int
+        The modification time (in nanoseconds) of every folder in the
+        EnderChest, keyed by its POSIX-style path relative to the EnderChest
+        root (with the root itself keyed as "")
+    files : dict of str to IndexEntry
+        The state of every file (and symlink) in the EnderChest, keyed by
+        its path relative to the EnderChest root
+    """
+
+    folders: dict[str, int]
+    files: dict[str, IndexEntry]
+
+
+class Changes(NamedTuple):
+    """The differences between two indices
+
+    Parameters
+    ----------
+    added : list of str
+        The files that are new
+    modified : list of str
+        The files that have been changed
+    removed : list of str
+        The files that no longer exist
+    """
+
+    added: list[str]
+    modified: list[str]
+    removed: list[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+
+def load_index(minecraft_root: Path) -> Index:
+    """Load the index saved from a previous run
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+
+    Returns
+    -------
+    Index
+        The saved index
+
+    Notes
+    -----
+    If no index exists or if the index cannot be read, this method will
+    return an empty index rather than failing outright (meaning that
+    the whole EnderChest will just get re-scanned)
+    """
+    return read_index(fs.index_file(minecraft_root))
+
+
+def read_index(index_path: Path) -> Index:
+    """Read an index from file
+
+    Parameters
+    ----------
+    index_path : Path
+        The path to the index file
+
+    Returns
+    -------
+    Index
+        The parsed index
+
+    Notes
+    -----
+    If the file does not exist or cannot be read, this method will return an
+    empty index rather than failing outright
+    """
+    try:
+        return parse_index(index_path.read_text())[1]
+    except FileNotFoundError:
+        SYNC_LOGGER.debug(f"No index found at {index_path}")
+    except ValueError:
+        SYNC_LOGGER.warning(
+            f"{index_path} is corrupt and could not be parsed. It will be ignored."
+        )
+    return Index({}, {})
+
+
+def parse_index(contents: str) -> tuple[dt.datetime | None, Index]:
+    """Parse the contents of an index file
+
+    Parameters
+    ----------
+    contents : str
+        The contents of the index file
+
+    Returns
+    -------
+    datetime or None
+        When the index was saved (if that was recorded)
+    Index
+        The parsed index
+
+    Raises
+    ------
+    ValueError
+        If the contents could not be parsed
+    """
+    try:
+        raw = json.loads(contents)
+        updated = raw.get("updated")
+        return (
+            None if updated is None else dt.datetime.fromisoformat(updated),
+            Index(
+                {folder: int(mtime) for folder, mtime in raw["folders"].items()},
+                {path: IndexEntry(*entry) for path, entry in raw["files"].items()},
+            ),
+        )
+    except (KeyError, TypeError, AttributeError) as bad_index:
+        raise ValueError(f"Invalid index: {bad_index}") from bad_index
+
+
+def save_index(minecraft_root: Path, index: Index) -> None:
+    """Write an index to file
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    index : Index
+        The index to save
+    """
+    index_path = fs.index_file(minecraft_root)
+    SYNC_LOGGER.debug(f"Writing index to {index_path}")
+    index_path.write_text(
+        json.dumps(
+            {
+                "updated": dt.datetime.now().isoformat(sep=" "),
+                "folders": index.folders,
+                "files": index.files,
+            }
+        )
+    )
+
+
+def update_index(
+    minecraft_root: Path, checksum: bool = False, save: bool = True
+) -> Index:
+    """Bring the index of the EnderChest up to date, re-scanning only the
+    folders that have changed since the index was last saved
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    checksum : bool, optional
+        Whether to also record a hash of the contents of each file. Hashes
+        are only (re)computed for files whose size, modification time or
+        inode have changed. Default is False.
+    save : bool, optional
+        Whether to save the updated index. Default is True.
+
+    Returns
+    -------
+    Index
+        The updated index
+
+    Notes
+    -----
+    - Only folders whose modification time has changed are listed. For all
+      other folders, the files recorded in the previous index are simply
+      `stat`ed, which is enough to catch files that were edited in place
+      (which doesn't update the folder's modification time).
+    - The EnderChest's config file and any hidden files at the root of the
+      EnderChest are not indexed, as they are never synced.
+    """
+    previous = load_index(minecraft_root)
+    previous_files: dict[str, list[str]] = defaultdict(list)
+    for path in previous.files:
+        previous_files[_parent(path)].append(path)
+    previous_folders: dict[str, list[str]] = defaultdict(list)
+    for folder in previous.folders:
+        if folder:
+            previous_folders[_parent(folder)].append(folder)
+
+    index = Index({}, {})
+    _index_folder(
+        fs.ender_chest_folder(minecraft_root),
+        "",
+        previous,
+        previous_files,
+        previous_folders,
+        index,
+        checksum,
+    )
+    if save:
+        save_index(minecraft_root, index)
+    return index
+
+
+def compare(old: Index, new: Index) -> Changes:
+    """Work out which files have changed between two indices
+
+    Parameters
+    ----------
+    old : Index
+        The earlier index
+    new : Index
+        The later index
+
+    Returns
+    -------
+    Changes
+        The files that were added, modified or removed
+
+    Notes
+    -----
+    If both indices have a hash for a file, the file is only considered
+    modified if its contents have changed. Otherwise a file is considered
+    modified if its size, modification time or inode have changed.
+    """
+    modified: list[str] = []
+    for path in old.files.keys() & new.files.keys():
+        old_entry, new_entry = old.files[path], new.files[path]
+        if old_entry.digest is not None and new_entry.digest is not None:
+            if (old_entry.size, old_entry.digest) != (new_entry.size, new_entry.digest):
+                modified.append(path)
+        elif old_entry[:3] != new_entry[:3]:
+            modified.append(path)
+    return Changes(
+        sorted(new.files.keys() - old.files.keys()),
+        sorted(modified),
+        sorted(old.files.keys() - new.files.keys()),
+    )
+
+
+def _parent(path: str) -> str:
+    """Get the parent of a path in the index
+
+    Parameters
+    ----------
+    path : str
+        The POSIX-style path, relative to the EnderChest root
+
+    Returns
+    -------
+    str
+        The parent folder, with the root itself represented as ""
+    """
+    parent = PurePosixPath(path).parent.as_posix()
+    return "" if parent == "." else parent
+
+
+def _index_folder(
+    folder: Path,
+    relative_folder: str,
+    previous: Index,
+    previous_files: dict[str, list[str]],
+    previous_folders: dict[str, list[str]],
+    index: Index,
+    checksum: bool,
+) -> None:
+    """Recursive helper for `update_index`
+
+    Parameters
+    ----------
+    folder : Path
+        The (full) path of the folder currently being indexed
+    relative_folder : str
+        The path of that folder relative to the EnderChest root
+    previous : Index
+        The previous index
+    previous_files : dict of str to list of str
+        The files recorded in the previous index, grouped by parent folder
+    previous_folders : dict of str to list of str
+        The folders recorded in the previous index, grouped by parent folder
+    index : Index
+        The index to populate
+    checksum : bool
+        Whether to record the hash of each file
+    """
+    mtime_ns = folder.stat().st_mtime_ns
+    index.folders[relative_folder] = mtime_ns
+
+    if previous.folders.get(relative_folder) == mtime_ns:
+        for path in previous_files[relative_folder]:
+            try:
+                path_stat = (folder / PurePosixPath(path).name).lstat()
+            except FileNotFoundError:
+                continue
+            index.files[path] = _entry(
+                folder / PurePosixPath(path).name,
+                path_stat,
+                previous.files[path],
+                checksum,
+            )
+        for subfolder in previous_folders[relative_folder]:
+            subfolder_path = folder / PurePosixPath(subfolder).name
+            if subfolder_path.is_dir() and not subfolder_path.is_symlink():
+                _index_folder(
+                    subfolder_path,
+                    subfolder,
+                    previous,
+                    previous_files,
+                    previous_folders,
+                    index,
+                    checksum,
+                )
+        return
+
+    SYNC_LOGGER.debug(f"Indexing {folder}")
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not relative_folder and (
+                entry.name.startswith(".") or entry.name == fs.ENDER_CHEST_CONFIG_NAME
+            ):
+                continue
+            path = f"{relative_folder}/{entry.name}" if relative_folder else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                _index_folder(
+                    Path(entry.path),
+                    path,
+                    previous,
+                    previous_files,
+                    previous_folders,
+                    index,
+                    checksum,
+                )
+            else:
+                index.files[path] = _entry(
+                    Path(entry.path),
+                    entry.stat(follow_symlinks=False),
+                    previous.files.get(path),
+                    checksum,
+                )
+
+
+def _entry(
+    path: Path,
+    path_stat: os.stat_result,
+    previous_entry: IndexEntry | None,
+    checksum: bool,
+) -> IndexEntry:
+    """Create the index entry for a file, re-using the previously computed
+    hash if the file hasn't changed
+
+    Parameters
+    ----------
+    path : Path
+        The file
+    path_stat : stat_result
+        The (lstat) stats of the file
+    previous_entry : IndexEntry or None
+        The file's entry in the previous index, if it had one
+    checksum : bool
+        Whether to record the hash of the file
+
+    Returns
+    -------
+    IndexEntry
+        The entry for the file
+    """
+    if stat.S_ISLNK(path_stat.st_mode):
+        # symlink modification times aren't preserved by every sync protocol,
+        # but a link's target is cheap to hash
+        return IndexEntry(
+            path_stat.st_size,
+            0,
+            path_stat.st_ino,
+            hashlib.blake2b(os.readlink(path).encode()).hexdigest(),
+        )
+    entry = IndexEntry(path_stat.st_size, path_stat.st_mtime_ns, path_stat.st_ino)
+    if not checksum or not stat.S_ISREG(path_stat.st_mode):
+        return entry
+    if previous_entry is not None and previous_entry[:3] == entry[:3]:
+        if previous_entry.digest is not None:
+            return previous_entry
+    return entry._replace(digest=_file_digest(path))
+
+
+def _file_digest(path: Path) -> str:
+    """Hash the contents of a file
+
+    Parameters
+    ----------
+    path : Path
+        The file to hash
+
+    Returns
+    -------
+    str
+        The file's hex-encoded BLAKE2 digest
+    """
+    digest = hashlib.blake2b()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
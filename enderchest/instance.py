@@ -1,4 +1,5 @@
 """Specification of a Minecraft instance"""
+import functools
 import re
 from configparser import SectionProxy
 from pathlib import Path
@@ -95,6 +96,7 @@ def equals(
     return path.expanduser().resolve() == other_path.expanduser().resolve()
 
 
+@functools.lru_cache(maxsize=1024)
 def _parse_version(version_string: str) -> str:
     """The first release of each major Minecraft version doesn't follow strict
     major.minor.patch semver. This method appends the ".0" so that our version
@@ -113,7 +115,8 @@ def _parse_version(version_string: str) -> str:
 
     Notes
     -----
-    Regex adapted straight from https://semver.org
+    - Regex adapted straight from https://semver.org
+    - Results are memoized (see `shulker_box.version_cache_info`)
     """
     if re.match(r"^(0|[1-9]\d*)\.(0|[1-9]\d*)$", version_string):
         return version_string + ".0"
@@ -5,6 +5,8 @@ CRAFT_LOGGER = logging.getLogger("enderchest.craft")
 GATHER_LOGGER = logging.getLogger("enderchest.gather")
 PLACE_LOGGER = logging.getLogger("enderchest.place")
 SYNC_LOGGER = logging.getLogger("enderchest.sync")
+STORE_LOGGER = logging.getLogger("enderchest.store")
+SERVICE_LOGGER = logging.getLogger("enderchest.service")
 
 
 class CLIFormatter(logging.Formatter):
@@ -1,24 +1,28 @@
 """Symlinking functionality"""
-import itertools
+import json
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable
 
 from . import filesystem as fs
 from .gather import load_ender_chest, load_ender_chest_instances, load_shulker_boxes
 from .instance import InstanceSpec
 from .loggers import PLACE_LOGGER
 from .prompt import prompt
-from .shulker_box import ShulkerBox
+from .shulker_box import ShulkerBox, version_cache_info
+from .walk import walk
 
 
 def place_ender_chest(
     minecraft_root: Path,
     cleanup: bool = True,
+    deep_clean: bool = False,
     error_handling: str = "abort",
     relative: bool = True,
     rollback=False,
+    jobs: int | None = None,
 ) -> None:
     """Link all instance files and folders to all shulker boxes
 
@@ -29,7 +33,16 @@ def place_ender_chest(
         that's the parent of your EnderChest folder)
     cleanup : bool, optional
         By default, this method will remove any broken links in your instances
-        and servers folders. To disable this behavior, pass in `cleanup=False`
+        and servers folders that could have been placed by EnderChest (that is,
+        at the location of any shulker box resource or of any link recorded in
+        the link manifest), along with any links it placed previously that
+        no longer correspond to any shulker box resource. To disable this
+        behavior, pass in `cleanup=False`
+    deep_clean : bool, optional
+        Searching for broken links is limited by default to the places where
+        EnderChest could have put them. To instead scour each linked instance
+        in its entirety for broken links (which can be *very* slow for instances
+        with lots of worlds), pass in `deep_clean=True`.
     error_handling : str, optional
         By default, if a linking failure occurs, this method will terminate
         immediately (`error_handling=abort`). Alternatively,
@@ -50,6 +63,22 @@ def place_ender_chest(
         In the future in the event of linking errors passing in `rollback=True`
         can be used to roll back any changes that have already been applied
         based on the error-handling method specified.
+    jobs : int, optional
+        By default, instances are linked one at a time. Pass in a number
+        greater than 1 to link that many instances at once (each instance is
+        still linked to its shulker boxes in priority order). This is mainly
+        useful when your instances live on a network drive.
+
+    Notes
+    -----
+    A record of every link that gets placed is kept in a manifest inside
+    the EnderChest folder. On subsequent runs, links that are already in place
+    are left alone, and links that were placed previously but which no longer
+    correspond to any shulker box resource are removed.
+
+    When linking in parallel, aborting will stop any further shulker boxes
+    from being linked, but instances that are already partway through being
+    linked to a shulker box will finish linking to that box first.
     """
     if rollback is not False:
         raise NotImplementedError("Rollbacks are not currently supported")
@@ -77,13 +106,17 @@ def place_ender_chest(
 
     skip_instances: list[InstanceSpec] = []
 
-    def handle_error(instance: InstanceSpec) -> str:
+    # so that parallel workers don't talk over each other when prompting
+    error_lock = threading.RLock()
+
+    def handle_error(instance: InstanceSpec | None) -> str:
         """Centralized error-handling
 
         Parameters
         ----------
         instance:
-            The current instance (in case it needs to be added to the skip list)
+            The current instance, if there is one (in case it needs to be added
+            to the skip list)
 
         Returns
         -------
@@ -94,6 +127,11 @@ def place_ender_chest(
               - coninue
               - pass
         """
+        with error_lock:
+            return _handle_error(instance)
+
+    def _handle_error(instance: InstanceSpec | None) -> str:
+        """Error-handling, without the lock"""
         if error_handling == "prompt":
             proceed_how = (
                 prompt(
@@ -120,7 +158,7 @@ def place_ender_chest(
                     proceed_how = "skip-shulker"
                 case _:
                     PLACE_LOGGER.error("Invalid selection.")
-                    return handle_error(instance)
+                    return _handle_error(instance)
         else:
             proceed_how = error_handling
 
@@ -136,7 +174,8 @@ def place_ender_chest(
                 return "continue"
             case "skip-instance":
                 PLACE_LOGGER.warning("Skipping any more linking from this instance")
-                skip_instances.append(instance)
+                if instance is not None:
+                    skip_instances.append(instance)
                 return "continue"
             case "skip-shulker-box" | "skip-shulkerbox" | "skip-shulker":
                 PLACE_LOGGER.warning("Skipping any more linking into this shulker box")
@@ -146,100 +185,285 @@ def place_ender_chest(
                     f"Unrecognized error-handling method: {error_handling}"
                 )
 
+    manifest = _load_link_manifest(minecraft_root)
+
+    box_resources: dict[str, list[Path]] = {}
+    box_listings: dict[str, dict] = {}
+    for shulker_box in shulker_boxes:
+        resources, box_listings[shulker_box.name] = _list_shulker_box_resources(
+            minecraft_root,
+            shulker_box,
+            manifest["shulker_boxes"].get(shulker_box.name),
+        )
+        box_resources[shulker_box.name] = [
+            resource
+            for resource in resources
+            if not any(
+                resource == Path(link_folder) or Path(link_folder) in resource.parents
+                for link_folder in shulker_box.link_folders
+            )
+        ]
+
+    # map of every link that *should* exist to its target, ignoring any errors
+    # that might come up (later shulker boxes overwrite earlier ones)
+    planned_links: dict[Path, str] = {}
     for shulker_box in shulker_boxes:
+        box_root = shulker_box.root.expanduser().absolute()
         for instance in instances:
             if not shulker_box.matches(instance):
                 continue
-            if instance in skip_instances:
+            instance_root = (minecraft_root / instance.root.expanduser()).expanduser()
+            for resource_path in (
+                *(Path(folder) for folder in shulker_box.link_folders),
+                *box_resources[shulker_box.name],
+            ):
+                instance_path, target = _link_target(
+                    resource_path, box_root, instance_root, relative
+                )
+                planned_links[instance_path] = target
+
+    # the only places EnderChest could have put a link: anywhere a shulker
+    # box resource could go in any instance, plus anywhere it's put one before
+    cleanup_candidates: set[Path] = set(planned_links.keys())
+    for instance in instances:
+        instance_root = (minecraft_root / instance.root.expanduser()).expanduser()
+        for shulker_box in shulker_boxes:
+            cleanup_candidates.update(
+                (instance_root / resource_path).absolute()
+                for resource_path in (
+                    *(Path(folder) for folder in shulker_box.link_folders),
+                    *box_resources[shulker_box.name],
+                )
+            )
+    cleanup_candidates.update(Path(record["path"]) for record in manifest["links"])
+
+    instances_by_name = {instance.name: instance for instance in instances}
+    recorded_links: dict[Path, dict[str, str]] = {}
+    for record in manifest["links"]:
+        instance_path = Path(record["path"])
+        if instance_path in planned_links:
+            recorded_links[instance_path] = record
+        elif _points_to(instance_path, record["target"]):
+            if not cleanup:
+                # keep track of it so that it can be cleaned up later
+                recorded_links[instance_path] = record
                 continue
+            PLACE_LOGGER.debug(f"Removing stale link: {instance_path}")
+            try:
+                instance_path.unlink()
+            except OSError as unlink_fail:
+                PLACE_LOGGER.error(
+                    f"Could not remove stale link {instance_path}:\n  {unlink_fail}"
+                )
+                recorded_links[instance_path] = record
+                if handle_error(instances_by_name.get(record["instance"])) == "return":
+                    return
+
+    def record_link(
+        instance: InstanceSpec,
+        shulker_box: ShulkerBox,
+        resource_path: Path,
+        instance_path: Path,
+        target: str,
+    ) -> None:
+        """Note that a link was placed (or was found already in place)"""
+        recorded_links[instance_path] = {
+            "path": str(instance_path),
+            "instance": instance.name,
+            "shulker_box": shulker_box.name,
+            "resource": resource_path.as_posix(),
+            "target": target,
+        }
+
+    def place_match(shulker_box: ShulkerBox, instance: InstanceSpec) -> str:
+        """Link a single instance to a single shulker box
 
-            instance_root = (minecraft_root / instance.root.expanduser()).expanduser()
-            box_root = shulker_box.root.expanduser().absolute()
+        Parameters
+        ----------
+        shulker_box : ShulkerBox
+            The shulker box to link to
+        instance : InstanceSpec
+            The instance to link from
 
-            if not instance_root.exists():
+        Returns
+        -------
+        str
+            Instructions on what to do next (see `handle_error`)
+        """
+        if not shulker_box.matches(instance):
+            return "pass"
+        if instance in skip_instances:
+            return "continue"
+
+        instance_root = (minecraft_root / instance.root.expanduser()).expanduser()
+        box_root = shulker_box.root.expanduser().absolute()
+
+        if not instance_root.exists():
+            PLACE_LOGGER.error(
+                "No minecraft instance exists at"
+                f" {instance_root.expanduser().absolute()}"
+            )
+            match handle_error(instance):
+                case "return":
+                    return "return"
+                case "break":
+                    return "break"
+                case _:  # nothing to link, so might as well skip the rest
+                    return "continue"
+
+        PLACE_LOGGER.info(f"Linking {instance.root} to {shulker_box.name}")
+
+        match_exit = "pass"
+        for link_folder in shulker_box.link_folders:
+            instance_path, target = _link_target(
+                link_folder, box_root, instance_root, relative
+            )
+            if _points_to(instance_path, planned_links[instance_path]):
+                if planned_links[instance_path] == target:
+                    record_link(
+                        instance, shulker_box, Path(link_folder), instance_path, target
+                    )
+                continue
+            try:
+                link_resource(link_folder, box_root, instance_root, relative)
+                record_link(
+                    instance, shulker_box, Path(link_folder), instance_path, target
+                )
+            except (OSError, NotADirectoryError) as oh_no:
                 PLACE_LOGGER.error(
-                    f"No minecraft instance exists at {instance_root.expanduser().absolute()}"
+                    f"Error linking shulker box {shulker_box.name}"
+                    f" to instance {instance.name}:"
+                    f"\n  {(instance.root / link_folder)} is a"
+                    " non-empty directory"
                 )
                 match handle_error(instance):
                     case "return":
-                        return
+                        return "return"
                     case "break":
+                        match_exit = "break"
                         break
-                    case _:  # nothing to link, so might as well skip the rest
-                        continue
-
-            PLACE_LOGGER.info(f"Linking {instance.root} to {shulker_box.name}")
-
-            resources = set(_rglob(box_root, shulker_box.max_link_depth))
-            resources.remove(
-                fs.shulker_box_config(minecraft_root, shulker_box.name)
-                .expanduser()
-                .absolute()
-            )
+                    case "continue":
+                        match_exit = "continue"
+                        break
+                    case "pass":
+                        continue  # or pass--it's the end of the loop
 
-            match_exit = "pass"
-            for link_folder in shulker_box.link_folders:
-                resources -= {box_root / link_folder}
-                resources -= set((box_root / link_folder).rglob("*"))
+        if match_exit not in ("break", "continue"):
+            for resource_path in box_resources[shulker_box.name]:
+                instance_path, target = _link_target(
+                    resource_path, box_root, instance_root, relative
+                )
+                if _points_to(instance_path, planned_links[instance_path]):
+                    # either it's already linked, or a later shulker box
+                    # is just going to overwrite it anyway
+                    if planned_links[instance_path] == target:
+                        record_link(
+                            instance, shulker_box, resource_path, instance_path, target
+                        )
+                    continue
                 try:
-                    link_resource(link_folder, box_root, instance_root, relative)
+                    link_resource(
+                        resource_path,
+                        box_root,
+                        instance_root,
+                        relative,
+                    )
+                    record_link(
+                        instance, shulker_box, resource_path, instance_path, target
+                    )
                 except (OSError, NotADirectoryError) as oh_no:
                     PLACE_LOGGER.error(
                         f"Error linking shulker box {shulker_box.name}"
                         f" to instance {instance.name}:"
-                        f"\n  {(instance.root / link_folder)} is a"
-                        " non-empty directory"
+                        f"\n  {(instance.root / resource_path)}"
+                        " already exists"
                     )
                     match handle_error(instance):
                         case "return":
-                            return
+                            return "return"
                         case "break":
                             match_exit = "break"
                             break
                         case "continue":
-                            match_exit = "continue"
+                            match_exit = "continue"  # technically does nothing
                             break
                         case "pass":
                             continue  # or pass--it's the end of the loop
 
-            if match_exit not in ("break", "continue"):
-                for resource in resources:
-                    resource_path = resource.relative_to(box_root)
-                    try:
-                        link_resource(
-                            resource_path,
-                            box_root,
-                            instance_root,
-                            relative,
-                        )
-                    except (OSError, NotADirectoryError) as oh_no:
-                        PLACE_LOGGER.error(
-                            f"Error linking shulker box {shulker_box.name}"
-                            f" to instance {instance.name}:"
-                            f"\n  {(instance.root / resource_path)}"
-                            " already exists"
-                        )
-                        match handle_error(instance):
-                            case "return":
-                                return
-                            case "break":
-                                match_exit = "break"
-                                break
-                            case "continue":
-                                match_exit = "continue"  # technically does nothing
-                                break
-                            case "pass":
-                                continue  # or pass--it's the end of the loop
-
-            if cleanup:  # consider this a "finally"
-                # we clean up as we go, just in case of a failure
-                for file in instance_root.rglob("*"):
-                    if not file.exists():
-                        PLACE_LOGGER.debug(f"Removing broken link: {file}")
-                        file.unlink()
-
-            if match_exit == "break":
-                break
+        if cleanup and deep_clean:  # consider this a "finally"
+            # we clean up as we go, just in case of a failure
+            for file in instance_root.rglob("*"):
+                if not file.exists():
+                    PLACE_LOGGER.debug(f"Removing broken link: {file}")
+                    file.unlink()
+
+        return match_exit
+
+    finished = False
+    try:
+        if jobs is None or jobs <= 1:
+            for shulker_box in shulker_boxes:
+                for instance in instances:
+                    match place_match(shulker_box, instance):
+                        case "return":
+                            return
+                        case "break":
+                            break
+            finished = True
+            return
+
+        # when working in parallel, each instance gets linked to each of its
+        # shulker boxes in turn (so that priority order is preserved), but
+        # different instances get linked at the same time
+        abort = threading.Event()
+        skip_shulker_boxes: set[str] = set()
+
+        def place_instance(instance: InstanceSpec) -> None:
+            """Link a single instance to all of its shulker boxes, in order"""
+            for shulker_box in shulker_boxes:
+                if abort.is_set():
+                    return
+                if shulker_box.name in skip_shulker_boxes:
+                    continue
+                match place_match(shulker_box, instance):
+                    case "return":
+                        abort.set()
+                        return
+                    case "break":
+                        skip_shulker_boxes.add(shulker_box.name)
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # consume the results so that any uncaught exceptions get raised
+            for _ in executor.map(place_instance, instances):
+                pass
+        finished = not abort.is_set()
+    finally:
+        # a placement that was cut short only knows about some of the links,
+        # so cleaning up (or recording) based on it would lose track of the rest
+        if finished:
+            if cleanup and not deep_clean:
+                for link_path in cleanup_candidates:
+                    if link_path.is_symlink() and not link_path.exists():
+                        PLACE_LOGGER.debug(f"Removing broken link: {link_path}")
+                        link_path.unlink()
+            _write_link_manifest(
+                minecraft_root,
+                {
+                    "shulker_boxes": box_listings,
+                    "links": list(recorded_links.values()),
+                },
+            )
+        else:
+            PLACE_LOGGER.debug(
+                "Linking did not finish, so the link manifest was left as it was"
+            )
+        PLACE_LOGGER.debug(
+            "Version cache performance:\n"
+            + "\n".join(
+                f"  {name}: {stats['hits']} hits, {stats['misses']} misses"
+                for name, stats in version_cache_info().items()
+            )
+        )
 
 
 def link_resource(
@@ -278,13 +502,11 @@ def link_resource(
     - This method will overwrite existing symlinks and empty folders
       but will not overwrite or delete any actual files.
     """
-    instance_path = (instance_root / resource_path).expanduser().absolute()
+    instance_path, target = _link_target(
+        resource_path, shulker_root, instance_root, relative
+    )
     instance_path.parent.mkdir(parents=True, exist_ok=True)
 
-    target: str | Path = (shulker_root / resource_path).expanduser().absolute()
-    if relative:
-        target = os.path.relpath(target, instance_path.parent)
-
     if instance_path.is_symlink():
         # remove previous symlink in this spot
         PLACE_LOGGER.debug(f"Removing old link at {instance_path}")
@@ -304,36 +526,205 @@ def link_resource(
     )
 
 
-def _rglob(root: Path, max_depth: int) -> Iterable[Path]:
-    """Find all files (and directories* and symlinks) in the path up to the
-    specified depth
+def _link_target(
+    resource_path: str | Path,
+    shulker_root: Path,
+    instance_root: Path,
+    relative: bool,
+) -> tuple[Path, str]:
+    """Determine where the link for a resource should go and what it should
+    point to
+
+    Parameters
+    ----------
+    resource_path : str or Path
+        Location of the resource relative to the instance's ".minecraft" folder
+    shulker_root : Path
+        The path to the shulker box
+    instance_root : Path
+        The path to the instance's ".minecraft" folder
+    relative : bool
+        If True, the link target will be a relative path if possible
+
+    Returns
+    -------
+    Path
+        The (absolute) path where the link should live
+    str
+        The target of the link, exactly as it should be written to the link
+    """
+    instance_path = (instance_root / resource_path).expanduser().absolute()
+    target = (shulker_root / resource_path).expanduser().absolute()
+    if relative:
+        return instance_path, os.path.relpath(target, instance_path.parent)
+    return instance_path, str(target)
+
+
+def _points_to(link_path: Path, target: str) -> bool:
+    """Check whether a path is a symlink pointing at the specified target
+
+    Parameters
+    ----------
+    link_path : Path
+        The path to check
+    target : str
+        The expected link target, exactly as it was written to the link
+
+    Returns
+    -------
+    bool
+        True if the path is a symlink with that target, False otherwise
+        (including if there's nothing at that path)
+    """
+    try:
+        return os.readlink(link_path) == target
+    except OSError:
+        return False
+
+
+def _load_link_manifest(minecraft_root: Path) -> dict:
+    """Load the record of the links placed on a previous run
 
     Parameters
     ----------
-    root : Path
-        The path to search
-    max_depth : int
-        The maximum number of levels to go
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
 
     Returns
     -------
-    list-like of paths
-        The files (and directories and symlinks) in the path up to that depth
+    dict
+        The link manifest, with the keys:
+          - shulker_boxes : the resource listing of each shulker box, keyed
+            by shulker box name
+          - links : a list of records of each link that was placed
 
     Notes
     -----
-    - Unlike an actual rglob, this method does not return any directories that
-      are not at the maximum depth
-    - Setting max_depth to 0 (or below) will return all files in the root, but
-      ***be warned*** that because this method follows symlinks, you can very
-      easily find yourself in an infinite loop
+    If no manifest exists or if the manifest cannot be read, this method will
+    return an empty manifest rather than failing outright (meaning that
+    everything will just get re-linked)
     """
-    top_level = root.iterdir()
-    if max_depth == 1:
-        return top_level
-    return itertools.chain(
-        *(
-            _rglob(path, max_depth - 1) if path.is_dir() else (path,)
-            for path in top_level
+    manifest_path = fs.link_manifest(minecraft_root)
+    try:
+        manifest = json.loads(manifest_path.read_text())
+        return {
+            "shulker_boxes": dict(manifest["shulker_boxes"]),
+            "links": list(manifest["links"]),
+        }
+    except FileNotFoundError:
+        PLACE_LOGGER.debug(f"No link manifest found at {manifest_path}")
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        PLACE_LOGGER.warning(
+            f"{manifest_path} is corrupt and could not be parsed."
+            "\nAll links will be re-created."
         )
+    return {"shulker_boxes": {}, "links": []}
+
+
+def _write_link_manifest(minecraft_root: Path, manifest: dict) -> None:
+    """Write the record of the links placed during this run
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    manifest : dict
+        The link manifest to write (see `_load_link_manifest`)
+    """
+    manifest_path = fs.link_manifest(minecraft_root)
+    PLACE_LOGGER.debug(f"Writing link manifest to {manifest_path}")
+    # write to a staging file first so that an interrupted write can't leave
+    # behind a truncated manifest
+    staging = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+    try:
+        staging.write_text(json.dumps(manifest))
+        os.replace(staging, manifest_path)
+    finally:
+        staging.unlink(missing_ok=True)
+
+
+def _list_shulker_box_resources(
+    minecraft_root: Path, shulker_box: ShulkerBox, listing: dict | None
+) -> tuple[list[Path], dict]:
+    """List the resources in a shulker box, re-using the listing from the
+    previous run if none of the folders within the box have been modified
+    since
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    shulker_box : ShulkerBox
+        The shulker box to list
+    listing : dict or None
+        The listing recorded in the link manifest from the previous run, if
+        there was one
+
+    Returns
+    -------
+    list of Path
+        The resources in the shulker box (other than its config file),
+        relative to the shulker box root
+    dict
+        The listing to record in the link manifest, consisting of the
+        (resolved) root of the shulker box, its max link depth, the
+        modification time of each folder that was searched and the resources
+        that were found
+    """
+    box_root = shulker_box.root.expanduser().absolute()
+    if listing is not None and _listing_is_current(
+        box_root, shulker_box.max_link_depth, listing
+    ):
+        PLACE_LOGGER.debug(f"{shulker_box.name} is unchanged since the last place")
+        return [Path(resource) for resource in listing["resources"]], listing
+
+    walked = walk(box_root, shulker_box.max_link_depth)
+    resources = sorted(walked.resources)
+    resources.remove(
+        fs.shulker_box_config(minecraft_root, shulker_box.name)
+        .expanduser()
+        .absolute()
+        .relative_to(box_root)
     )
+    return resources, {
+        "root": str(box_root),
+        "max_link_depth": shulker_box.max_link_depth,
+        "directories": {
+            folder.as_posix(): mtime for folder, mtime in walked.folders.items()
+        },
+        "resources": [resource.as_posix() for resource in resources],
+    }
+
+
+def _listing_is_current(box_root: Path, max_link_depth: int, listing: dict) -> bool:
+    """Check whether a recorded shulker box listing is still valid
+
+    Parameters
+    ----------
+    box_root : Path
+        The (absolute) path to the shulker box
+    max_link_depth : int
+        The shulker box's current max link depth
+    listing : dict
+        The listing recorded in the link manifest
+
+    Returns
+    -------
+    bool
+        True if the box is in the same place, has the same link depth and
+        none of the recorded folders has been modified, False otherwise
+    """
+    try:
+        if listing["root"] != str(box_root):
+            return False
+        if listing["max_link_depth"] != max_link_depth:
+            return False
+        for folder, mtime in listing["directories"].items():
+            if (box_root / folder).stat().st_mtime_ns != mtime:
+                return False
+    except (OSError, KeyError, TypeError, AttributeError):
+        return False
+    return True
@@ -1,25 +1,46 @@
 """Higher-level functionality around synchronizing with different EnderCherts"""
+import datetime as dt
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from configparser import Error as ConfigParserError
+from contextlib import contextmanager
 from pathlib import Path
-from time import sleep
+from time import monotonic, sleep
+from typing import Iterable, Iterator, NamedTuple
 from urllib.parse import ParseResult, urlparse
 
 from . import filesystem as fs
-from . import gather
+from . import gather, index
 from .enderchest import EnderChest
 from .loggers import SYNC_LOGGER
 from .prompt import confirm
-from .sync import path_from_uri, pull, push, remote_file, render_remote
+from .status import fetch_remote_index, record_sync
+from .sync import (
+    path_from_uri,
+    pull,
+    push,
+    read_remote_file,
+    render_remote,
+    resolve_protocol,
+    unsupported_options,
+)
 
 
-def load_remote_ender_chest(uri: str | ParseResult) -> EnderChest:
+def load_remote_ender_chest(
+    uri: str | ParseResult, timeout: int | None = None
+) -> EnderChest:
     """Load an EnderChest configuration from another machine
 
     Parameters
     ----------
     uri : URI
         The URI to the remote Minecraft root
+    timeout : int, optional
+        The number of seconds to wait before giving up. By default, there
+        is no timeout.
 
     Returns
     -------
@@ -32,6 +53,15 @@ def load_remote_ender_chest(uri: str | ParseResult) -> EnderChest:
         If the provided URI is invalid
     RuntimeError
         If the config from the remote EnderChest could not be parsed
+    OSError
+        If the config could not be fetched
+    TimeoutError
+        If the config could not be fetched within the specified timeout
+
+    Notes
+    -----
+    Where the protocol supports it, the config is streamed straight into
+    memory rather than being synced to a temp folder.
     """
     try:
         uri = uri if isinstance(uri, ParseResult) else urlparse(uri)
@@ -40,20 +70,67 @@ def load_remote_ender_chest(uri: str | ParseResult) -> EnderChest:
 
     remote_root = Path(uri.path)
     remote_config_path = fs.ender_chest_config(remote_root, check_exists=False)
-    uri = uri._replace(path=remote_config_path.as_posix())
+    config_uri = uri._replace(path=remote_config_path.as_posix())
+
+    contents = read_remote_file(config_uri, timeout=timeout)
+    try:
+        return EnderChest.from_string(contents, uri.path)
+    except ValueError as bad_chest:
+        raise RuntimeError(
+            "The remote EnderChest config downloaded"
+            f"from {config_uri.geturl()} could not be parsed."
+        ) from bad_chest
+
 
-    with remote_file(uri) as remote_config:
+def load_remote_ender_chests(
+    uris: Iterable[str | ParseResult],
+    concurrency: int | None = None,
+    timeout: int | None = None,
+) -> list[EnderChest | None]:
+    """Load the EnderChest configurations from several machines at once
+
+    Parameters
+    ----------
+    uris : list of URIs
+        The URIs to the remote Minecraft roots
+    concurrency : int, optional
+        The maximum number of remotes to fetch from at once. By default, all
+        remotes are fetched from at once.
+    timeout : int, optional
+        The number of seconds to wait on each remote before giving up on it.
+        By default, there is no timeout.
+
+    Returns
+    -------
+    list of EnderChest or None
+        The remote EnderChest configurations, in the same order as the
+        provided URIs, with None in place of any that could not be loaded
+    """
+    uris = list(uris)
+    if not uris:
+        return []
+
+    def load(uri: str | ParseResult) -> EnderChest | None:
         try:
-            return EnderChest.from_cfg(remote_config)
-        except ValueError as bad_chest:
-            raise RuntimeError(
-                "The remote EnderChest config downloaded"
-                f"from {uri.geturl()} could not be parsed."
-            ) from bad_chest
+            return load_remote_ender_chest(uri, timeout=timeout)
+        except (
+            OSError,
+            ValueError,
+            RuntimeError,
+            NotImplementedError,
+        ) as load_fail:
+            SYNC_LOGGER.warning(
+                "Could not load the EnderChest config from"
+                f" {uri if isinstance(uri, str) else uri.geturl()}:\n  {load_fail}"
+            )
+            return None
+
+    with ThreadPoolExecutor(max_workers=concurrency or len(uris)) as pool:
+        return list(pool.map(load, uris))
 
 
 def fetch_remotes_from_a_remote_ender_chest(
-    uri: str | ParseResult,
+    uri: str | ParseResult, timeout: int | None = None
 ) -> list[tuple[ParseResult, str]]:
     """Grab the list of EnderChests registered with the specified remote EnderChest
 
@@ -61,6 +138,9 @@ def fetch_remotes_from_a_remote_ender_chest(
     ----------
     uri : URI
         The URI to the remote Minecraft root
+    timeout : int, optional
+        The number of seconds to wait before giving up. By default, there
+        is no timeout.
 
     Returns
     -------
@@ -72,7 +152,7 @@ def fetch_remotes_from_a_remote_ender_chest(
     RuntimeError
         If the remote list could not be pulled
     """
-    remote_chest = load_remote_ender_chest(uri)
+    remote_chest = load_remote_ender_chest(uri, timeout=timeout)
     remotes: list[tuple[ParseResult, str]] = [
         (urlparse(uri) if isinstance(uri, str) else uri, remote_chest.name)
     ]
@@ -90,11 +170,186 @@ def fetch_remotes_from_a_remote_ender_chest(
     return remotes
 
 
+class RemoteProbe(NamedTuple):
+    """The results of checking in on a remote EnderChest
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the remote
+    alias : str
+        The remote's name
+    latency : float or None
+        The number of seconds it took to fetch the remote's config, or None
+        if the remote could not be reached
+    last_modified : datetime or None
+        When the remote's config was last written, if known
+    """
+
+    uri: ParseResult
+    alias: str
+    latency: float | None
+    last_modified: dt.datetime | None
+
+
+PROBE_TTL = 30
+"""The number of seconds for which the results of probing a remote are reused"""
+
+FRESHNESS_WINDOW = 60
+"""Remotes whose configs were written within this many seconds of each other
+are considered equally fresh when deciding which remote to pull from"""
+
+_PROBE_CACHE: dict[str, tuple[float, RemoteProbe]] = {}
+
+
+def probe_remote(
+    uri: ParseResult, alias: str, ttl: float = PROBE_TTL, timeout: int | None = None
+) -> RemoteProbe:
+    """Check how quickly a remote EnderChest responds and how recently it
+    was updated by fetching its config file
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the remote Minecraft root
+    alias : str
+        The remote's name
+    ttl : float, optional
+        If this remote was already probed within this many seconds, the earlier
+        result will be reused. Default is 30 seconds.
+    timeout : int, optional
+        The number of seconds to wait before giving up on the remote (for
+        protocols that support timeouts). By default, no explicit timeout
+        will be set.
+
+    Returns
+    -------
+    RemoteProbe
+        The results of the probe
+    """
+    cached = _PROBE_CACHE.get(uri.geturl())
+    if cached is not None and monotonic() - cached[0] < ttl:
+        SYNC_LOGGER.debug(f"Using cached probe of {render_remote(alias, uri)}")
+        return cached[1]._replace(alias=alias)
+
+    config_uri = uri._replace(
+        path=fs.ender_chest_config(Path(uri.path), check_exists=False).as_posix()
+    )
+    start = monotonic()
+    latency: float | None = None
+    last_modified: dt.datetime | None = None
+    try:
+        contents = read_remote_file(config_uri, timeout=timeout)
+        latency = monotonic() - start
+        parser = ConfigParser(
+            allow_no_value=True,
+            delimiters=("=",),
+            inline_comment_prefixes=(";",),
+            interpolation=None,
+        )
+        parser.read_string(contents)
+        try:
+            last_modified = dt.datetime.fromisoformat(
+                parser.get("properties", "last_modified")
+            )
+        except (ConfigParserError, ValueError):
+            SYNC_LOGGER.debug(
+                f"Could not tell when {render_remote(alias, uri)} was last modified"
+            )
+    except (
+        ConfigParserError,
+        OSError,
+        ValueError,
+        NotImplementedError,
+        RuntimeError,
+    ) as probe_fail:
+        SYNC_LOGGER.debug(f"Could not reach {render_remote(alias, uri)}: {probe_fail}")
+
+    probe = RemoteProbe(uri, alias, latency, last_modified)
+    _PROBE_CACHE[uri.geturl()] = (monotonic(), probe)
+    return probe
+
+
+def rank_remotes(
+    remotes: Iterable[tuple[ParseResult, str]],
+    concurrency: int | None = None,
+    ttl: float = PROBE_TTL,
+    timeout: int | None = None,
+) -> list[RemoteProbe]:
+    """Probe a set of remote EnderChests (concurrently) and rank them by how
+    recently they were updated and how quickly they respond
+
+    Parameters
+    ----------
+    remotes : list of (URI, str) tuples
+        The remotes to probe, paired with their aliases
+    concurrency : int, optional
+        The maximum number of remotes to probe at once. By default, all
+        remotes will be probed at once.
+    ttl : float, optional
+        The number of seconds for which earlier probe results can be reused.
+        Default is 30 seconds.
+    timeout : int, optional
+        The number of seconds to wait before giving up on any one remote (for
+        protocols that support timeouts). By default, no explicit timeout
+        will be set.
+
+    Returns
+    -------
+    list of RemoteProbe
+        The results of the probes, best remote first
+
+    Notes
+    -----
+    Remotes that could be reached come first, ordered by freshness (newest
+    `last_modified` first, treating remotes within `FRESHNESS_WINDOW` seconds
+    of each other as tied) and then by latency. Unreachable remotes come last,
+    in their original order.
+    """
+    remotes = list(remotes)
+    if not remotes:
+        return []
+    with ThreadPoolExecutor(max_workers=concurrency or len(remotes)) as pool:
+        probes = list(
+            pool.map(
+                lambda remote: probe_remote(
+                    remote[0], remote[1], ttl=ttl, timeout=timeout
+                ),
+                remotes,
+            )
+        )
+
+    newest = max(
+        (
+            probe.last_modified
+            for probe in probes
+            if probe.latency is not None and probe.last_modified is not None
+        ),
+        default=None,
+    )
+
+    def staleness(probe: RemoteProbe) -> float:
+        if newest is None or probe.last_modified is None:
+            return float("inf")
+        return (newest - probe.last_modified).total_seconds() // FRESHNESS_WINDOW
+
+    return sorted(
+        probes,
+        key=lambda probe: (
+            probe.latency is None,
+            staleness(probe) if probe.latency is not None else 0,
+            probe.latency or 0,
+        ),
+    )
+
+
 def sync_with_remotes(
     minecraft_root: Path,
     pull_or_push: str,
     dry_run: bool = False,
     sync_confirm_wait: bool | int | None = None,
+    concurrency: int | None = None,
+    fastest_remote: bool = False,
     **sync_kwargs,
 ) -> None:
     """Pull changes from or push changes to remote EnderChests
@@ -120,6 +375,16 @@ def sync_with_remotes(
         the sync (`confirm=True`). This default behavior can also be modified
         in the EnderChest config. This parameter will be ignored when performing
         a dry run.
+    concurrency : int, optional
+        When pushing, the maximum number of remotes to push to at once. By
+        default (or if a value of 1 or less is provided), remotes will be
+        pushed to one at a time. When pulling from the fastest remote, this is
+        the maximum number of remotes to probe at once (by default, all of them).
+    fastest_remote : bool, optional
+        When pulling, first probe every remote (concurrently) and try them
+        in order of how recently they were updated and how quickly they
+        respond, rather than in the order they are configured. Default is False.
+        This parameter is ignored when pushing.
     sync_kwargs
         Any additional arguments that should be passed into the syncing
         operation
@@ -127,7 +392,11 @@ def sync_with_remotes(
     Notes
     -----
     - When pulling changes, this method will try each remote in the order they
-      are configured and stop once it has successfully pulled from a remote.
+      are configured (or, with `fastest_remote=True`, in the order determined
+      by `rank_remotes`) and stop once it has successfully pulled from a remote.
+    - When pushing concurrently, the dry runs for every remote are performed
+      (in parallel) up front, followed by a single wait or confirmation, after
+      which the real pushes are all performed (in parallel).
 
     This method will attempt to push local changes to *every* remote
     """
@@ -152,85 +421,482 @@ def sync_with_remotes(
         SYNC_LOGGER.error("Enderchest has no remotes. Aborting")
         return  # kinda unnecessary
 
-    synced_somewhere = False
-    for remote_uri, alias in remotes:
-        if dry_run:
-            runs: tuple[bool, ...] = (True,)
-        elif sync_confirm_wait is False or sync_confirm_wait <= 0:
-            runs = (False,)
-        else:
-            runs = (True, False)
-        for do_dry_run in runs:
-            try:
-                if pull_or_push == "pull":
-                    SYNC_LOGGER.info(
-                        "Attempting to pull changes from"
-                        f" {render_remote(alias, remote_uri)}"
-                    )
-                    remote_chest = remote_uri._replace(
-                        path=urlparse(
-                            (
-                                fs.ender_chest_folder(
-                                    path_from_uri(remote_uri),
-                                    check_exists=False,
-                                )
-                            ).as_uri()
-                        ).path
-                    )
-                    pull(
-                        remote_chest,
-                        minecraft_root,
-                        exclude=[
-                            os.path.join(
-                                fs.ENDER_CHEST_FOLDER_NAME, fs.ENDER_CHEST_CONFIG_NAME
-                            ),
-                            os.path.join(fs.ENDER_CHEST_FOLDER_NAME, ".*"),
-                            *(sync_kwargs.pop("exclude", None) or ()),
-                        ],
-                        dry_run=do_dry_run,
-                        **sync_kwargs,
-                    )
-                else:
-                    SYNC_LOGGER.info(
-                        f"Attempting to push changes to {render_remote(alias, remote_uri)}"
-                    )
-                    local_chest = fs.ender_chest_folder(minecraft_root)
-                    push(
-                        local_chest,
-                        remote_uri,
-                        exclude=[
-                            os.path.join(
-                                fs.ENDER_CHEST_FOLDER_NAME, fs.ENDER_CHEST_CONFIG_NAME
-                            ),
-                            os.path.join(fs.ENDER_CHEST_FOLDER_NAME, ".*"),
-                            *(sync_kwargs.pop("exclude", None) or ()),
-                        ],
-                        dry_run=do_dry_run,
-                        **sync_kwargs,
+    remotes = _viable_remotes(remotes, pull_or_push, sync_kwargs)
+    if not remotes:
+        SYNC_LOGGER.error("Could not sync with any remote EnderChests")
+        return
+
+    if dry_run:
+        runs: tuple[bool, ...] = (True,)
+    elif sync_confirm_wait is False or sync_confirm_wait <= 0:
+        runs = (False,)
+    else:
+        runs = (True, False)
+
+    sync_kwargs["exclude"] = [
+        os.path.join(fs.ENDER_CHEST_FOLDER_NAME, fs.ENDER_CHEST_CONFIG_NAME),
+        os.path.join(fs.ENDER_CHEST_FOLDER_NAME, ".*"),
+        *(sync_kwargs.pop("exclude", None) or ()),
+    ]
+
+    chest_index: index.Index | None = None
+    if pull_or_push == "push":
+        # pushing doesn't change the local EnderChest, so this is what gets recorded
+        chest_index = index.update_index(minecraft_root, save=False)
+        _report_local_changes(minecraft_root, chest_index)
+
+    if pull_or_push == "push" and concurrency is not None and concurrency > 1:
+        pushed = _push_concurrently(
+            minecraft_root,
+            remotes,
+            runs,
+            sync_confirm_wait,
+            concurrency,
+            **sync_kwargs,
+        )
+        if pushed and not dry_run:
+            _record_sync(
+                minecraft_root,
+                [remote for remote in remotes if remote[1] in pushed],
+                chest_index,
+                timeout=sync_kwargs.get("timeout"),
+            )
+        return
+
+    if pull_or_push == "pull" and fastest_remote:
+        probes = rank_remotes(
+            remotes,
+            concurrency=concurrency,
+            timeout=sync_kwargs.get("timeout"),
+        )
+        SYNC_LOGGER.info(
+            "Remotes ranked by freshness and response time:\n"
+            + "\n".join(
+                f"  - {render_remote(probe.alias, probe.uri)}: "
+                + (
+                    "unreachable"
+                    if probe.latency is None
+                    else f"{probe.latency:.2f}s"
+                    + (
+                        f", last modified {probe.last_modified}"
+                        if probe.last_modified
+                        else ""
                     )
-            except (
-                FileNotFoundError,
-                ValueError,
-                NotImplementedError,
-                TimeoutError,
-            ) as sync_fail:
-                SYNC_LOGGER.warning(
-                    f"Could not sync changes with {render_remote(alias, remote_uri)}:"
-                    f"\n  {sync_fail}"
                 )
+                for probe in probes
+            )
+        )
+        remotes = [(probe.uri, probe.alias) for probe in probes]
+
+    synced: list[str] = []
+    for remote_uri, alias in remotes:
+        for do_dry_run in runs:
+            if not _sync_with_remote(
+                minecraft_root,
+                pull_or_push,
+                remote_uri,
+                alias,
+                dry_run=do_dry_run,
+                **sync_kwargs,
+            ):
                 break
             if do_dry_run == runs[-1]:
                 continue
-            if sync_confirm_wait is True:
-                if not confirm(default=True):
-                    SYNC_LOGGER.error("Aborting")
-                    return
-            else:
-                SYNC_LOGGER.debug(f"Waiting for {sync_confirm_wait} seconds")
-                sleep(sync_confirm_wait)
+            if not _wait_for_confirmation(sync_confirm_wait):
+                return
         else:
-            synced_somewhere = True
+            synced.append(alias)
             if pull_or_push == "pull":
                 break
-    if not synced_somewhere:
+    if not synced:
+        SYNC_LOGGER.error("Could not sync with any remote EnderChests")
+    elif not dry_run:
+        _record_sync(
+            minecraft_root,
+            [remote for remote in remotes if remote[1] in synced],
+            chest_index,
+            timeout=sync_kwargs.get("timeout"),
+        )
+
+
+def _report_local_changes(minecraft_root: Path, current: index.Index) -> None:
+    """Report on the files in the EnderChest that have changed since the last
+    sync, as determined from the EnderChest's index
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    current : Index
+        The up-to-date index of the EnderChest
+    """
+    previous = index.load_index(minecraft_root)
+    if not previous.folders:
+        SYNC_LOGGER.debug("EnderChest has not yet been indexed")
+        return
+    changes = index.compare(previous, current)
+    if not changes:
+        SYNC_LOGGER.info("No local changes since the last sync")
+        return
+    SYNC_LOGGER.info(
+        f"Local changes since the last sync: {len(changes.added)} added,"
+        f" {len(changes.modified)} modified, {len(changes.removed)} removed"
+    )
+    for label, paths in zip(("Added", "Modified", "Removed"), changes):
+        for path in paths:
+            SYNC_LOGGER.debug(f"  {label}: {path}")
+
+
+def _record_sync(
+    minecraft_root: Path,
+    remotes: list[tuple[ParseResult, str]],
+    chest_index: index.Index | None,
+    timeout: int | None = None,
+) -> None:
+    """Save the EnderChest's index and record that the EnderChest is now in
+    sync with the specified remotes
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    remotes : list of (URI, str) tuples
+        The remotes that were synced with, paired with their aliases
+    chest_index : Index or None
+        The index of the EnderChest as it was synced, or None if it needs to
+        be (re)computed (as is the case after pulling)
+    timeout : int, optional
+        The number of seconds to wait for each remote's index before giving up
+
+    Notes
+    -----
+    Alongside the EnderChest's own index, this records when (according to
+    each remote's clock) each remote's index was last updated, so that
+    `status.get_status` can later tell whether the remote has been
+    re-indexed since.
+    """
+    if chest_index is None:
+        chest_index = index.update_index(minecraft_root)
+    else:
+        index.save_index(minecraft_root, chest_index)
+    with ThreadPoolExecutor(max_workers=len(remotes)) as pool:
+        remote_indices = pool.map(
+            lambda remote: fetch_remote_index(remote[0], remote[1], timeout=timeout),
+            remotes,
+        )
+        remote_indexed = {
+            alias: None if remote_index is None else remote_index[0]
+            for (_, alias), remote_index in zip(remotes, remote_indices)
+        }
+    record_sync(
+        minecraft_root,
+        [alias for _, alias in remotes],
+        chest_index,
+        remote_indexed,
+    )
+
+
+def _viable_remotes(
+    remotes: Iterable[tuple[ParseResult, str]],
+    pull_or_push: str,
+    sync_kwargs: dict,
+) -> list[tuple[ParseResult, str]]:
+    """Check up front which remotes can actually be synced with, picking
+    the protocol to use for each one
+
+    Parameters
+    ----------
+    remotes : list of (URI, str) tuples
+        The remotes to check, paired with their aliases
+    pull_or_push : str
+        "pull" or "push"
+    sync_kwargs : dict
+        The additional arguments that will be passed into the syncing operation
+
+    Returns
+    -------
+    list of (URI, str) tuples
+        The remotes that can be synced with (using the URI scheme of the
+        protocol that should be used), paired with their aliases
+
+    Notes
+    -----
+    Remotes with no viable protocol are reported as warnings when pushing.
+    When pulling, they're only mentioned at the info level, since only
+    one remote is needed.
+    """
+    options = {key: value for key, value in sync_kwargs.items() if key != "exclude"}
+    viable: list[tuple[ParseResult, str]] = []
+    for remote_uri, alias in remotes:
+        try:
+            sync_uri = resolve_protocol(remote_uri)
+        except NotImplementedError as no_protocol:
+            SYNC_LOGGER.log(
+                logging.WARNING if pull_or_push == "push" else logging.INFO,
+                f"Could not sync changes with {render_remote(alias, remote_uri)}:"
+                f"\n  {no_protocol}",
+            )
+            continue
+        if sync_uri.scheme != remote_uri.scheme:
+            SYNC_LOGGER.info(
+                f"Protocol {remote_uri.scheme} is not available on this system."
+                f" Syncing with {render_remote(alias, remote_uri)} using"
+                f" the {sync_uri.scheme} protocol instead."
+            )
+        if ignored := unsupported_options(sync_uri.scheme, options):
+            SYNC_LOGGER.warning(
+                f"The {sync_uri.scheme} protocol does not support the following"
+                " options, which will be ignored when syncing with"
+                f" {render_remote(alias, remote_uri)}: " + ", ".join(ignored)
+            )
+        viable.append((sync_uri, alias))
+    return viable
+
+
+def _sync_with_remote(
+    minecraft_root: Path,
+    pull_or_push: str,
+    remote_uri: ParseResult,
+    alias: str,
+    dry_run: bool,
+    **sync_kwargs,
+) -> bool:
+    """Pull changes from or push changes to a single remote EnderChest
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff is in
+    pull_or_push : str
+        "pull" or "push"
+    remote_uri : ParseResult
+        The URI of the remote
+    alias : str
+        The remote's name
+    dry_run: bool
+         Whether to perform a dry run of the sync operation
+    sync_kwargs
+        Any additional arguments that should be passed into the syncing
+        operation (including the complete list of exclusions)
+
+    Returns
+    -------
+    bool
+        True if the sync was successful, False otherwise
+    """
+    # unsupported options were already reported by _viable_remotes
+    ignored = unsupported_options(
+        remote_uri.scheme,
+        {key: value for key, value in sync_kwargs.items() if key != "exclude"},
+    )
+    sync_kwargs = {
+        key: value for key, value in sync_kwargs.items() if key not in ignored
+    }
+    try:
+        if pull_or_push == "pull":
+            SYNC_LOGGER.info(
+                f"Attempting to pull changes from {render_remote(alias, remote_uri)}"
+            )
+            remote_chest = remote_uri._replace(
+                path=urlparse(
+                    (
+                        fs.ender_chest_folder(
+                            path_from_uri(remote_uri),
+                            check_exists=False,
+                        )
+                    ).as_uri()
+                ).path
+            )
+            pull(remote_chest, minecraft_root, dry_run=dry_run, **sync_kwargs)
+        else:
+            SYNC_LOGGER.info(
+                f"Attempting to push changes to {render_remote(alias, remote_uri)}"
+            )
+            local_chest = fs.ender_chest_folder(minecraft_root)
+            push(local_chest, remote_uri, dry_run=dry_run, **sync_kwargs)
+    except (
+        FileNotFoundError,
+        ValueError,
+        NotImplementedError,
+        TimeoutError,
+    ) as sync_fail:
+        SYNC_LOGGER.warning(
+            f"Could not sync changes with {render_remote(alias, remote_uri)}:"
+            f"\n  {sync_fail}"
+        )
+        return False
+    return True
+
+
+def _wait_for_confirmation(sync_confirm_wait: bool | int) -> bool:
+    """Give the user a chance to look over the results of a dry run before
+    performing the real sync
+
+    Parameters
+    ----------
+    sync_confirm_wait : bool or int
+        True to require that the user explicitly confirms, otherwise the
+        number of seconds to wait
+
+    Returns
+    -------
+    bool
+        False if the user aborted the sync, True otherwise
+    """
+    if sync_confirm_wait is True:
+        if not confirm(default=True):
+            SYNC_LOGGER.error("Aborting")
+            return False
+    else:
+        SYNC_LOGGER.debug(f"Waiting for {sync_confirm_wait} seconds")
+        sleep(sync_confirm_wait)
+    return True
+
+
+class _LogBuffer(logging.Filter):
+    """Log filter that holds back the messages logged from a thread so that
+    they can be shown all together later"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._local = threading.local()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        records: list[logging.LogRecord] | None = getattr(self._local, "records", None)
+        if records is None:
+            return True
+        records.append(record)
+        return False
+
+    @contextmanager
+    def capture(self, hold: bool = True) -> Iterator[list[logging.LogRecord]]:
+        """Hold back every message logged from the current thread
+
+        Parameters
+        ----------
+        hold : bool, optional
+            Pass in False to let messages through as normal. Default is True.
+
+        Yields
+        ------
+        list of LogRecord
+            The messages that were held back
+        """
+        records: list[logging.LogRecord] = []
+        if hold:
+            self._local.records = records
+        try:
+            yield records
+        finally:
+            self._local.records = None
+
+
+def _push_concurrently(
+    minecraft_root: Path,
+    remotes: list[tuple[ParseResult, str]],
+    runs: tuple[bool, ...],
+    sync_confirm_wait: bool | int,
+    concurrency: int,
+    **sync_kwargs,
+) -> list[str]:
+    """Push changes to several remote EnderChests at once
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff is in
+    remotes : list of (URI, str) tuples
+        The remotes to push to, paired with their aliases
+    runs : tuple of bool
+        Whether each round of pushes should be a dry run. If there's more than
+        one round, the user will be given a chance to look over the results
+        between rounds.
+    sync_confirm_wait : bool or int
+        True to require that the user explicitly confirms between rounds,
+        otherwise the number of seconds to wait
+    concurrency : int
+        The maximum number of remotes to push to at once
+    sync_kwargs
+        Any additional arguments that should be passed into the syncing
+        operation (including the complete list of exclusions)
+
+    Returns
+    -------
+    list of str
+        The aliases of the remotes for which the final round of pushes
+        succeeded
+
+    Notes
+    -----
+    The output of each dry run is held back until every remote has finished
+    and then shown one remote at a time, so that it's clear which changes
+    belong to which remote.
+    """
+    status: dict[ParseResult, str] = {}
+    pending = list(remotes)
+    log_buffer = _LogBuffer()
+    SYNC_LOGGER.addFilter(log_buffer)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for do_dry_run in runs:
+
+                def push_to(
+                    remote: tuple[ParseResult, str]
+                ) -> tuple[bool, list[logging.LogRecord]]:
+                    """Push to a single remote, holding back the output of a
+                    dry run"""
+                    with log_buffer.capture(do_dry_run) as records:
+                        return (
+                            _sync_with_remote(
+                                minecraft_root,
+                                "push",
+                                remote[0],
+                                remote[1],
+                                dry_run=do_dry_run,
+                                **sync_kwargs,
+                            ),
+                            records,
+                        )
+
+                results = list(pool.map(push_to, pending))
+                for _, records in results:
+                    for record in records:
+                        SYNC_LOGGER.handle(record)
+                successes = [success for success, _ in results]
+                for (remote_uri, _), success in zip(pending, successes):
+                    if not success:
+                        status[remote_uri] = (
+                            "dry run failed" if do_dry_run != runs[-1] else "failed"
+                        )
+                    elif do_dry_run == runs[-1]:
+                        status[remote_uri] = (
+                            "dry run succeeded" if do_dry_run else "synced"
+                        )
+                pending = [
+                    remote for remote, success in zip(pending, successes) if success
+                ]
+                if not pending:
+                    break
+                if do_dry_run != runs[-1] and not _wait_for_confirmation(
+                    sync_confirm_wait
+                ):
+                    return []
+    finally:
+        SYNC_LOGGER.removeFilter(log_buffer)
+
+    SYNC_LOGGER.info(
+        "Push summary:\n"
+        + "\n".join(
+            f"  - {render_remote(alias, remote_uri)}: {status[remote_uri]}"
+            for remote_uri, alias in remotes
+        )
+    )
+    if not any(
+        outcome in ("synced", "dry run succeeded") for outcome in status.values()
+    ):
         SYNC_LOGGER.error("Could not sync with any remote EnderChests")
+    return [
+        alias for remote_uri, alias in remotes if status.get(remote_uri) == "synced"
+    ]
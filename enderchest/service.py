@@ -0,0 +1,376 @@
+"""Long-running service that keeps an EnderChest's parsed configs and caches
+warm, so that frequent commands (like a `place` before every game launch)
+don't have to start from scratch"""
+import json
+import logging
+import os
+import socket
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from . import filesystem as fs
+from .loggers import SERVICE_LOGGER
+
+SERVED_ACTIONS = ("place", "inventory", "inventory minecraft", "status")
+"""The (canonical names of the) CLI actions the service can perform"""
+
+CONNECT_TIMEOUT = 0.5
+"""The number of seconds to wait for the service to accept a connection
+before giving up on it"""
+
+RESPONSE_TIMEOUT = 60.0
+"""The number of seconds to wait for the service to respond to a request
+before giving up on it (and performing the action locally instead)"""
+
+
+def serve(
+    minecraft_root: Path,
+    idle_timeout: float | None = None,
+    stop: threading.Event | None = None,
+) -> None:
+    """Run the EnderChest service (in the foreground) until it's stopped
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    idle_timeout : float, optional
+        Shut down the service after this many seconds without any requests.
+        By default, the service runs until it's stopped.
+    stop : Event, optional
+        Set this event (from another thread) to stop the service
+
+    Notes
+    -----
+    - Requests are handled one at a time.
+    - Configs are re-parsed whenever they're modified (see
+      `fs.cached_config`), so the service never needs to be restarted to
+      pick up changes.
+    - The service can't ask you questions, so a `place` that was told to
+      prompt on errors will instead abort at the first error (the CLI
+      performs such requests itself, see `will_prompt`).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        SERVICE_LOGGER.error("The EnderChest service is not supported on this system")
+        return
+
+    # only the service itself needs these (the client should stay lightweight)
+    import socketserver
+
+    from . import gather, index
+
+    try:
+        gather.load_ender_chest(minecraft_root)
+        socket_path = fs.service_socket(minecraft_root)
+    except (FileNotFoundError, ValueError) as bad_chest:
+        SERVICE_LOGGER.error(
+            f"Could not load EnderChest from {minecraft_root}:\n  {bad_chest}"
+        )
+        return
+    existing_service = _connect(socket_path)
+    if existing_service is not None:
+        existing_service.close()
+        SERVICE_LOGGER.error("The EnderChest service is already running")
+        return
+    try:
+        socket_path.parent.mkdir(mode=0o700)
+        os.chmod(socket_path.parent, 0o700)  # (in case the umask got in the way)
+    except FileExistsError:
+        pass
+    if not _is_private(socket_path.parent):
+        SERVICE_LOGGER.error(
+            f"Refusing to serve from {socket_path.parent}, as it needs to be"
+            " a folder that only you can access"
+        )
+        return
+    socket_path.unlink(missing_ok=True)  # left over from a service that crashed
+
+    # warm up
+    gather.load_shulker_boxes(minecraft_root, log_level=logging.DEBUG)
+    gather.load_ender_chest_instances(minecraft_root, log_level=logging.DEBUG)
+    index.update_index(minecraft_root, save=False)
+
+    stopped = stop or threading.Event()
+    last_request = time.monotonic()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            nonlocal last_request
+            try:
+                request = json.loads(self.rfile.readline())
+                response = _handle_request(minecraft_root, request, stopped)
+            except (json.JSONDecodeError, TypeError, KeyError) as bad_request:
+                response = {"ok": False, "log": [], "error": str(bad_request)}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            last_request = time.monotonic()
+
+    with socketserver.UnixStreamServer(str(socket_path), Handler) as server:
+        os.chmod(socket_path, 0o600)
+        server.timeout = 0.5
+        SERVICE_LOGGER.info(f"Serving {minecraft_root} on {socket_path}")
+        try:
+            while not stopped.is_set():
+                server.handle_request()
+                if (
+                    idle_timeout is not None
+                    and time.monotonic() - last_request > idle_timeout
+                ):
+                    SERVICE_LOGGER.info("Shutting down after being idle")
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+    SERVICE_LOGGER.info("EnderChest service stopped")
+
+
+def request(
+    minecraft_root: Path,
+    action: str,
+    options: dict[str, Any] | None = None,
+    log_level: int = logging.INFO,
+) -> bool:
+    """Ask the EnderChest service (if it's running) to perform an action
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    action : str
+        The canonical name of the CLI action to perform (see `SERVED_ACTIONS`),
+        or "ping" to just check that the service is running, or "stop" to
+        shut the service down
+    options : dict, optional
+        The options to pass to the action
+    log_level : int, optional
+        The minimum level of the log messages from performing the action that
+        should be sent back. Default is INFO.
+
+    Returns
+    -------
+    bool
+        True if the service handled the request, False if the service
+        isn't running (in which case you'll want to perform the action
+        yourself)
+
+    Notes
+    -----
+    - Any messages the service logged while performing the action get
+      re-logged (to the same loggers) by this method, so the output is the
+      same as if the action had been performed locally.
+    - If the service doesn't respond within `RESPONSE_TIMEOUT` seconds, this
+      method gives up on it and returns False.
+    """
+    try:
+        socket_path = fs.service_socket(minecraft_root)
+    except FileNotFoundError:
+        return False
+    connection = _connect(socket_path)
+    if connection is None:
+        return False
+    with connection:
+        connection.settimeout(RESPONSE_TIMEOUT)
+        try:
+            connection.sendall(
+                (
+                    json.dumps(
+                        {
+                            "action": action,
+                            "options": options or {},
+                            "log_level": log_level,
+                        }
+                    )
+                    + "\n"
+                ).encode()
+            )
+            with connection.makefile("rb") as reply:
+                raw_response = reply.readline()
+        except OSError as comm_fail:  # including timing out
+            SERVICE_LOGGER.warning(
+                f"The EnderChest service did not respond:\n  {comm_fail}"
+            )
+            return False
+    try:
+        response = json.loads(raw_response)
+        log: list[tuple[str, int, str]] = response["log"]
+    except (json.JSONDecodeError, KeyError, TypeError):
+        SERVICE_LOGGER.error("Received an invalid response from the EnderChest service")
+        return True
+    for logger_name, level, message in log:
+        logging.getLogger(logger_name).log(level, message)
+    if not response.get("ok"):
+        SERVICE_LOGGER.error(
+            f"The EnderChest service could not {action}:\n  {response.get('error')}"
+        )
+    return True
+
+
+def will_prompt(action: str, options: dict[str, Any]) -> bool:
+    """Check whether performing an action could involve asking the user
+    questions, which the service can't do
+
+    Parameters
+    ----------
+    action : str
+        The canonical name of the CLI action
+    options : dict
+        The options that will be passed to the action
+
+    Returns
+    -------
+    bool
+        True if the action may need to prompt the user (and so should not
+        be sent to the service), False otherwise
+    """
+    return (
+        action == "place"
+        and options.get("errors", "prompt") == "prompt"
+        and not options.get("stop_at_first_failure")
+        and not options.get("ignore_errors")
+    )
+
+
+def stop_service(minecraft_root: Path) -> None:
+    """Shut down the EnderChest service, if it's running
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    """
+    if not request(minecraft_root, "stop"):
+        SERVICE_LOGGER.warning("The EnderChest service is not running")
+
+
+def _connect(socket_path: Path) -> socket.socket | None:
+    """Connect to the EnderChest service
+
+    Parameters
+    ----------
+    socket_path : Path
+        The path to the service's socket
+
+    Returns
+    -------
+    socket or None
+        The connection, or None if nothing is listening at that path (or if
+        the socket is in a folder that someone else could have tampered with)
+    """
+    if (
+        not hasattr(socket, "AF_UNIX")
+        or not _is_private(socket_path.parent)
+        or not socket_path.exists()
+    ):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(CONNECT_TIMEOUT)
+    try:
+        connection.connect(str(socket_path))
+    except OSError:
+        connection.close()
+        return None
+    return connection
+
+
+def _is_private(folder: Path) -> bool:
+    """Check that a folder is safe to keep the service's socket in
+
+    Parameters
+    ----------
+    folder : Path
+        The folder to check
+
+    Returns
+    -------
+    bool
+        True if the folder is an actual folder (and not a symlink) that
+        belongs to the current user and that no one else can access,
+        False otherwise
+    """
+    try:
+        folder_stat = os.lstat(folder)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(folder_stat.st_mode)
+        and folder_stat.st_uid == os.getuid()
+        and stat.S_IMODE(folder_stat.st_mode) == 0o700
+    )
+
+
+class _LogCollector(logging.Handler):
+    """Log handler that holds onto every record so that they can be sent back
+    to the client"""
+
+    def __init__(self, level: int):
+        super().__init__(level)
+        self.records: list[tuple[str, int, str]] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append((record.name, record.levelno, record.getMessage()))
+
+
+def _handle_request(
+    minecraft_root: Path, request: dict[str, Any], stop: threading.Event
+) -> dict[str, Any]:
+    """Perform a requested action
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    request : dict
+        The request, consisting of the name of the action, the options for
+        that action and the minimum level of log messages to collect
+    stop : Event
+        The event to set if the service is asked to stop
+
+    Returns
+    -------
+    dict
+        The response, consisting of whether the action was successful,
+        all log messages emitted while performing it and, if the action could
+        not be performed, the reason why
+    """
+    from . import cli  # (which imports this module)
+
+    action: str = request["action"]
+    options: dict[str, Any] = dict(request.get("options") or {})
+    log_level = int(request.get("log_level", logging.INFO))
+
+    collector = _LogCollector(log_level)
+    package_logger = logging.getLogger("enderchest")
+    previous_level = package_logger.level
+    package_logger.addHandler(collector)
+    package_logger.setLevel(min(log_level, package_logger.getEffectiveLevel()))
+    try:
+        match action:
+            case "ping":
+                pass
+            case "stop":
+                SERVICE_LOGGER.info("Stopping the EnderChest service")
+                stop.set()
+            case served if served in SERVED_ACTIONS:
+                if will_prompt(served, options):
+                    SERVICE_LOGGER.warning(
+                        "The service can't prompt, so it will abort on any error"
+                    )
+                    options["errors"] = "abort"
+                SERVICE_LOGGER.debug(f"Performing {served}")
+                actions = {commands[0]: method for commands, _, method in cli.ACTIONS}
+                actions[served](minecraft_root, **options)
+            case _:
+                raise ValueError(f"Unsupported action: {action}")
+    except Exception as action_fail:  # the service should never go down
+        return {"ok": False, "log": collector.records, "error": str(action_fail)}
+    finally:
+        package_logger.removeHandler(collector)
+        package_logger.setLevel(previous_level)
+    return {"ok": True, "log": collector.records}
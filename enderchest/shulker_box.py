@@ -1,17 +1,18 @@
 """Specification and configuration of a shulker box"""
 import datetime as dt
 import fnmatch
+import functools
 import os
+import re
 from configparser import ConfigParser, ParsingError
 from io import StringIO
 from pathlib import Path
-from typing import NamedTuple
+from typing import Iterable, NamedTuple
 
 import semantic_version as semver
 
 from . import filesystem as fs
-from ._version import get_versions
-from .instance import InstanceSpec
+from .instance import InstanceSpec, _parse_version
 from .loggers import CRAFT_LOGGER
 
 
@@ -174,6 +175,8 @@ class ShulkerBox(NamedTuple):
         if self.max_link_depth != 2:
             config.set("properties", "max-link-depth", str(self.max_link_depth))
         config.set("properties", "last_modified", dt.datetime.now().isoformat(sep=" "))
+        from ._version import get_versions  # (which can call out to git)
+
         config.set(
             "properties", "generated_by_enderchest_version", get_versions()["version"]
         )
@@ -211,56 +214,29 @@ class ShulkerBox(NamedTuple):
             True if the instance matches the shulker box's conditions, False
             otherwise.
         """
-        for condition, values in self.match_criteria:
-            match condition:  # these should have been normalized on read-in
-                case "instances":
-                    for value in values:
-                        if fnmatch.fnmatchcase(instance.name, value):
-                            break
-                    else:
-                        return False
-                case "tags":
-                    for value in values:
-                        if fnmatch.filter(
-                            [tag.lower() for tag in instance.tags], value.lower()
-                        ):
-                            break
-                    else:
-                        return False
-                case "modloader":
-                    normalized: list[str] = sum(
-                        [_normalize_modloader(value) for value in values], []
-                    )
-                    for value in normalized:
-                        if fnmatch.filter(
-                            [
-                                loader.lower()
-                                for loader in _normalize_modloader(instance.modloader)
-                            ],
-                            value.lower(),
-                        ):
-                            break
-                    else:
-                        return False
-                case "minecraft":
-                    for value in values:
-                        if any(
-                            (
-                                _matches_version(value, version)
-                                for version in instance.minecraft_versions
-                            )
-                        ):
-                            break
-                    else:
-                        return False
-                case "hosts":
-                    # this is handled at a higher level
-                    pass
-                case _:
-                    raise NotImplementedError(
-                        f"Don't know how to apply match condition {condition}."
-                    )
-        return True
+        return self.compile().matches(instance)
+
+    def compile(self) -> "MatchPlan":
+        """Pre-process the shulker box's match criteria so that checking
+        instances against them is as cheap as possible
+
+        Returns
+        -------
+        MatchPlan
+            The compiled match criteria
+
+        Raises
+        ------
+        NotImplementedError
+            If the shulker box has a match condition that EnderChest doesn't
+            know how to apply
+
+        Notes
+        -----
+        Compiled match criteria are cached, so calling this method on two
+        shulker boxes with the same match criteria will only compile them once.
+        """
+        return _compile_match_criteria(self.match_criteria)
 
     def matches_host(self, hostname: str):
         """Determine whether the shulker box should be linked to from the
@@ -281,6 +257,203 @@ class ShulkerBox(NamedTuple):
         return True
 
 
+# each version spec within a condition, parsed as semver (if possible) and
+# paired with an fnmatch pattern to fall back to
+_VersionSpecs = tuple[tuple[semver.SimpleSpec | None, re.Pattern], ...]
+
+
+class MatchPlan(NamedTuple):
+    """Pre-compiled shulker box match criteria. Each element of each field
+    is a condition that an instance must satisfy (where satisfying a condition
+    means matching at least one of its values).
+
+    Parameters
+    ----------
+    instance_names : list-like of compiled regexes
+        Patterns for (case-sensitively) matching instance names
+    tags : list-like of compiled regexes
+        Patterns for matching (lower-cased) instance tags
+    modloaders : list-like of compiled regexes
+        Patterns for matching (normalized, lower-cased) modloaders
+    minecraft_versions : list-like of tuples
+        The version specs for each condition, where each spec is given as
+        the parsed semver spec (or None if the spec isn't valid semver) paired
+        with a pattern to match against (lower-cased) version strings that
+        aren't valid semver either
+    """
+
+    instance_names: tuple[re.Pattern, ...]
+    tags: tuple[re.Pattern, ...]
+    modloaders: tuple[re.Pattern, ...]
+    minecraft_versions: tuple["_VersionSpecs", ...]
+
+    def matches(self, instance: InstanceSpec) -> bool:
+        """Determine whether the given instance satisfies every condition
+
+        Parameters
+        ----------
+        instance : InstanceSpec
+            The instance's specification
+
+        Returns
+        -------
+        bool
+            True if the instance matches the compiled conditions, False
+            otherwise.
+        """
+        for pattern in self.instance_names:
+            if not pattern.match(instance.name):
+                return False
+        if self.tags:
+            tags = [tag.lower() for tag in instance.tags]
+            for pattern in self.tags:
+                if not any(pattern.match(tag) for tag in tags):
+                    return False
+        if self.modloaders:
+            loaders = [
+                loader.lower() for loader in _normalize_modloader(instance.modloader)
+            ]
+            for pattern in self.modloaders:
+                if not any(pattern.match(loader) for loader in loaders):
+                    return False
+        for version_specs in self.minecraft_versions:
+            if not any(
+                _matches_compiled_version(spec, pattern, version)
+                for spec, pattern in version_specs
+                for version in instance.minecraft_versions
+            ):
+                return False
+        return True
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_match_criteria(
+    match_criteria: tuple[tuple[str, tuple[str, ...]], ...]
+) -> MatchPlan:
+    """Compile a shulker box's match criteria
+
+    Parameters
+    ----------
+    match_criteria : list-like of tuples
+        The shulker box's match criteria
+
+    Returns
+    -------
+    MatchPlan
+        The compiled match criteria
+
+    Raises
+    ------
+    NotImplementedError
+        If there's a match condition EnderChest doesn't know how to apply
+    """
+    instance_names: list[re.Pattern] = []
+    tags: list[re.Pattern] = []
+    modloaders: list[re.Pattern] = []
+    minecraft_versions: list[_VersionSpecs] = []
+    for condition, values in match_criteria:
+        match condition:  # these should have been normalized on read-in
+            case "instances":
+                instance_names.append(_compile_patterns(values))
+            case "tags":
+                tags.append(_compile_patterns(value.lower() for value in values))
+            case "modloader":
+                modloaders.append(
+                    _compile_patterns(
+                        loader.lower()
+                        for value in values
+                        for loader in _normalize_modloader(value)
+                    )
+                )
+            case "minecraft":
+                minecraft_versions.append(
+                    tuple(
+                        (
+                            _parse_version_spec(value),
+                            _compile_patterns((value.lower(),)),
+                        )
+                        for value in values
+                    )
+                )
+            case "hosts":
+                # this is handled at a higher level
+                pass
+            case _:
+                raise NotImplementedError(
+                    f"Don't know how to apply match condition {condition}."
+                )
+    return MatchPlan(
+        tuple(instance_names), tuple(tags), tuple(modloaders), tuple(minecraft_versions)
+    )
+
+
+def _compile_patterns(patterns: Iterable[str]) -> re.Pattern:
+    """Combine a collection of fnmatch-style patterns into a single regex that
+    will match anything that matches any of them
+
+    Parameters
+    ----------
+    patterns : list-like of str
+        The patterns to combine
+
+    Returns
+    -------
+    compiled regex
+        The combined pattern. If no patterns are given, the regex will never
+        match anything.
+    """
+    translated = [f"(?:{fnmatch.translate(pattern)})" for pattern in patterns]
+    if not translated:
+        return re.compile(r"(?!)")
+    return re.compile("|".join(translated))
+
+
+def _parse_version_spec(version_spec: str) -> semver.SimpleSpec | None:
+    """Parse a user-provided version spec, if it's valid semver
+
+    Parameters
+    ----------
+    version_spec : str
+        A version specification provided by a user
+
+    Returns
+    -------
+    SimpleSpec or None
+        The parsed spec, or None if the spec can't be parsed
+    """
+    try:
+        return semver.SimpleSpec(version_spec)
+    except ValueError:
+        return None
+
+
+def _matches_compiled_version(
+    spec: semver.SimpleSpec | None, pattern: re.Pattern, version_string: str
+) -> bool:
+    """Apply the same logic as `_matches_version`, but using a pre-parsed spec
+    and pre-compiled fallback pattern
+
+    Parameters
+    ----------
+    spec : SimpleSpec or None
+        The parsed version spec (or None if the spec wasn't valid semver)
+    pattern : compiled regex
+        The compiled pattern to fall back to
+    version_string : str
+        A version string, likely parsed from an instance's configuration
+
+    Returns
+    -------
+    bool
+        True if the spec matches the version, False otherwise
+    """
+    if spec is not None:
+        version = _parse_semver(version_string)
+        if version is not None:
+            return spec.match(version)
+    return pattern.match(version_string.lower()) is not None
+
+
 def _normalize_modloader(loader: str | None) -> list[str]:
     """Implement common modloader aliases
 
@@ -314,6 +487,32 @@ def _normalize_modloader(loader: str | None) -> list[str]:
             return [loader]
 
 
+@functools.lru_cache(maxsize=1024)
+def _parse_semver(version_string: str) -> semver.Version | None:
+    """Parse a version string as semver, if it's valid semver
+
+    Parameters
+    ----------
+    version_string : str
+        A version string, likely parsed from an instance's configuration
+
+    Returns
+    -------
+    Version or None
+        The parsed version, or None if the version string isn't valid semver
+
+    Notes
+    -----
+    Results are memoized, since the same handful of version strings
+    get checked over and over and failed parses are expensive
+    """
+    try:
+        return semver.Version(version_string)
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
 def _matches_version(version_spec: str, version_string: str) -> bool:
     """Determine whether a version spec matches a version string, taking into
     account that neither users nor Mojang rigidly follow semver (or at least
@@ -333,14 +532,43 @@ def _matches_version(version_spec: str, version_string: str) -> bool:
 
     Notes
     -----
-    This method *does not* match snapshots to their corresponding version
-    range--for that you're just going to have to be explicit.
+    - This method *does not* match snapshots to their corresponding version
+      range--for that you're just going to have to be explicit.
+    - Results are memoized (see `version_cache_info`)
     """
-    try:
-        return semver.SimpleSpec(version_spec).match(semver.Version(version_string))
-    except ValueError:
-        # fall back to simple fnmatching
-        return fnmatch.fnmatchcase(version_string.lower(), version_spec.lower())
+    spec = _parse_version_spec(version_spec)
+    version = _parse_semver(version_string)
+    if spec is not None and version is not None:
+        return spec.match(version)
+    # fall back to simple fnmatching
+    return fnmatch.fnmatchcase(version_string.lower(), version_spec.lower())
+
+
+def version_cache_info() -> dict[str, dict[str, int | None]]:
+    """Report on how well the memoization of version parsing and matching
+    is working
+
+    Returns
+    -------
+    dict
+        The hit and miss counts, along with the current and maximum sizes,
+        for each of the version caches
+    """
+    return {
+        name: cache_info()._asdict()
+        for name, cache_info in (
+            ("_parse_version", _parse_version.cache_info),
+            ("_parse_semver", _parse_semver.cache_info),
+            ("_matches_version", _matches_version.cache_info),
+        )
+    }
+
+
+def clear_version_caches() -> None:
+    """Empty all the version caches (and reset their counters)"""
+    _parse_version.cache_clear()
+    _parse_semver.cache_clear()
+    _matches_version.cache_clear()
 
 
 DEFAULT_SHULKER_FOLDERS = (  # TODO: customize in enderchest.cfg
@@ -393,4 +621,5 @@ def create_shulker_box(minecraft_root: Path, shulker_box: ShulkerBox) -> None:
 
     config_path = fs.shulker_box_config(minecraft_root, shulker_box.name)
     shulker_box.write_to_cfg(config_path)
+    fs.invalidate_cached_config(config_path)
     CRAFT_LOGGER.info(f"Shulker box configuration written to {config_path}")
@@ -0,0 +1,391 @@
+"""Report on how an EnderChest compares to its remotes, using only cached state"""
+import datetime as dt
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Mapping, NamedTuple
+from urllib.parse import ParseResult
+
+from . import filesystem as fs
+from . import gather, index
+from .loggers import SYNC_LOGGER
+from .sync import read_remote_file, render_remote, resolve_protocol
+
+
+class RemoteStatus(NamedTuple):
+    """How the local EnderChest compares to a remote
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the remote
+    alias : str
+        The name of the remote
+    last_synced : datetime or None
+        When this EnderChest was last successfully synced with the remote,
+        if ever
+    local_changes : Changes or None
+        The files that have changed locally since the last sync, if the
+        remote has ever been synced with
+    remote_changes : Changes or None
+        The files that have changed on the remote since the last sync, if
+        that could be determined
+    """
+
+    uri: ParseResult
+    alias: str
+    last_synced: dt.datetime | None
+    local_changes: index.Changes | None
+    remote_changes: index.Changes | None
+
+    @property
+    def state(self) -> str:
+        """A one-word (or two) summary of the status"""
+        if self.last_synced is None:
+            return "never synced"
+        ahead, behind = bool(self.local_changes), bool(self.remote_changes)
+        if ahead and behind:
+            return "diverged"
+        if ahead:
+            return "ahead"
+        if behind:
+            return "behind"
+        return "up to date"
+
+
+class SyncRecord(NamedTuple):
+    """What was recorded about the last successful sync with a remote
+
+    Parameters
+    ----------
+    synced : datetime
+        When the sync happened
+    chest_index : Index
+        The index of the EnderChest right after the sync
+    remote_indexed : datetime or None
+        When, according to the remote's own clock, the remote's index had
+        last been updated as of the sync (if that could be determined)
+    """
+
+    synced: dt.datetime
+    chest_index: index.Index
+    remote_indexed: dt.datetime | None
+
+
+def record_sync(
+    minecraft_root: Path,
+    aliases: Iterable[str],
+    chest_index: index.Index,
+    remote_indexed: Mapping[str, dt.datetime | None] | None = None,
+) -> None:
+    """Record what the EnderChest looked like when it was successfully synced
+    with the specified remotes
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    aliases : list of str
+        The names of the remotes that were synced with
+    chest_index : Index
+        The index of the EnderChest right after the sync
+    remote_indexed : dict of str to datetime, optional
+        When each remote's own index had last been updated (see
+        `fetch_remote_index`), keyed by alias. This is what lets `get_status`
+        tell whether a remote has been re-indexed since the sync without
+        comparing clocks across machines.
+    """
+    state = _read_sync_state(minecraft_root)
+    synced = dt.datetime.now().isoformat(sep=" ")
+    files = {
+        path: [entry.size, entry.mtime_ns, entry.digest]
+        for path, entry in chest_index.files.items()
+    }
+    for alias in aliases:
+        record: dict[str, Any] = {"synced": synced, "files": files}
+        if (indexed := (remote_indexed or {}).get(alias)) is not None:
+            record["remote_indexed"] = indexed.isoformat(sep=" ")
+        state[alias] = record
+    state_path = fs.sync_state_file(minecraft_root)
+    SYNC_LOGGER.debug(f"Writing sync state to {state_path}")
+    state_path.write_text(json.dumps(state))
+
+
+def load_sync_state(minecraft_root: Path) -> dict[str, SyncRecord]:
+    """Load the record of when this EnderChest was last synced with each remote
+    and what it looked like at the time
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+
+    Returns
+    -------
+    dict of str to SyncRecord
+        What was recorded about the last sync with each remote, keyed by
+        remote alias
+
+    Notes
+    -----
+    The recorded indices don't contain inode numbers, as those won't match
+    across machines.
+    """
+    sync_state: dict[str, SyncRecord] = {}
+    for alias, record in _read_sync_state(minecraft_root).items():
+        try:
+            remote_indexed = record.get("remote_indexed")
+            sync_state[alias] = SyncRecord(
+                dt.datetime.fromisoformat(record["synced"]),
+                index.Index(
+                    {},
+                    {
+                        path: index.IndexEntry(size, mtime_ns, 0, digest)
+                        for path, (size, mtime_ns, digest) in record["files"].items()
+                    },
+                ),
+                None
+                if remote_indexed is None
+                else dt.datetime.fromisoformat(remote_indexed),
+            )
+        except (KeyError, TypeError, ValueError, AttributeError):
+            SYNC_LOGGER.warning(f"Sync state for {alias} is corrupt and was ignored")
+    return sync_state
+
+
+def get_status(
+    minecraft_root: Path,
+    offline: bool = False,
+    timeout: int | None = None,
+) -> list[RemoteStatus]:
+    """Compare the EnderChest to each of its remotes, using the state recorded
+    during the last successful sync with each one
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    offline : bool, optional
+        By default, the index of each remote EnderChest will be fetched
+        (all at once) to check for changes on the remote side. Pass in
+        `offline=True` to only check for local changes.
+    timeout : int, optional
+        The number of seconds to wait for each remote's index before giving up
+
+    Returns
+    -------
+    list of RemoteStatus
+        The status of each remote
+
+    Notes
+    -----
+    - No file contents are transferred: local changes come from the
+      EnderChest's index, and remote changes from the index each remote keeps
+      of itself.
+    - A remote's index is only updated when that remote syncs, so changes
+      made on a remote since then won't show up. If a remote hasn't
+      re-indexed since the last sync with it (meaning its index was last
+      updated when it was at the time of the sync, going by the remote's own
+      clock) and its index doesn't match what was synced, remote changes are
+      reported as unknown.
+    """
+    remotes = gather.load_ender_chest_remotes(minecraft_root, log_level=logging.DEBUG)
+    sync_state = load_sync_state(minecraft_root)
+    current = _portable(index.update_index(minecraft_root, save=False))
+
+    remote_indices: list[tuple[dt.datetime, index.Index] | None]
+    if offline or not remotes:
+        remote_indices = [None] * len(remotes)
+    else:
+        with ThreadPoolExecutor(max_workers=len(remotes)) as pool:
+            remote_indices = list(
+                pool.map(
+                    lambda remote: fetch_remote_index(
+                        remote[0], remote[1], timeout=timeout
+                    ),
+                    remotes,
+                )
+            )
+
+    statuses: list[RemoteStatus] = []
+    for (uri, alias), remote_index in zip(remotes, remote_indices):
+        if alias not in sync_state:
+            statuses.append(RemoteStatus(uri, alias, None, None, None))
+            continue
+        record = sync_state[alias]
+        remote_changes: index.Changes | None = None
+        if remote_index is not None:
+            remote_updated, remote_files = remote_index
+            changes = index.compare(record.chest_index, _portable(remote_files))
+            # if the remote hasn't re-indexed since the last sync, any
+            # differences could just be from the sync itself
+            if not changes or (
+                record.remote_indexed is not None
+                and remote_updated != record.remote_indexed
+            ):
+                remote_changes = changes
+        statuses.append(
+            RemoteStatus(
+                uri,
+                alias,
+                record.synced,
+                index.compare(record.chest_index, current),
+                remote_changes,
+            )
+        )
+    return statuses
+
+
+def report_status(
+    minecraft_root: Path, offline: bool = False, timeout: int | None = None
+) -> list[RemoteStatus]:
+    """Report how the EnderChest compares to each of its remotes
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    offline : bool, optional
+        Whether to skip checking the remotes for changes. Default is False.
+    timeout : int, optional
+        The number of seconds to wait for each remote's index before giving up
+
+    Returns
+    -------
+    list of RemoteStatus
+        The status of each remote
+    """
+    try:
+        statuses = get_status(minecraft_root, offline=offline, timeout=timeout)
+    except (FileNotFoundError, ValueError) as bad_chest:
+        SYNC_LOGGER.error(
+            f"Could not load EnderChest from {minecraft_root}:\n  {bad_chest}"
+        )
+        return []
+    if not statuses:
+        SYNC_LOGGER.warning("EnderChest has no remotes")
+    for remote_status in statuses:
+        report = f"{render_remote(remote_status.alias, remote_status.uri)}:"
+        report += f" {remote_status.state}"
+        if remote_status.last_synced is not None:
+            report += (
+                f" (last synced {remote_status.last_synced.isoformat(sep=' ')[:16]})"
+            )
+        for side, changes in (
+            ("local", remote_status.local_changes),
+            ("remote", remote_status.remote_changes),
+        ):
+            if remote_status.last_synced is None:
+                break
+            if changes is None:
+                report += f"\n  - {side} changes: unknown"
+            elif changes:
+                report += (
+                    f"\n  - {side} changes: {len(changes.added)} added,"
+                    f" {len(changes.modified)} modified, {len(changes.removed)} removed"
+                )
+        SYNC_LOGGER.info(report)
+        if remote_status.local_changes:
+            for label, paths in zip(
+                ("Added", "Modified", "Removed"), remote_status.local_changes
+            ):
+                for path in paths:
+                    SYNC_LOGGER.debug(f"  {label}: {path}")
+    return statuses
+
+
+def fetch_remote_index(
+    uri: ParseResult, alias: str, timeout: int | None = None
+) -> tuple[dt.datetime, index.Index] | None:
+    """Grab the index a remote EnderChest keeps of itself
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the remote
+    alias : str
+        The name of the remote
+    timeout : int, optional
+        The number of seconds to wait before giving up
+
+    Returns
+    -------
+    (datetime, Index) tuple or None
+        When the remote's index was last updated and the index itself,
+        or None if the index could not be retrieved
+    """
+    try:
+        index_uri = resolve_protocol(uri)._replace(
+            path=(
+                fs.ender_chest_folder(Path(uri.path), check_exists=False)
+                / fs.INDEX_NAME
+            ).as_posix()
+        )
+        updated, fetched = index.parse_index(
+            read_remote_file(index_uri, timeout=timeout)
+        )
+    except (OSError, ValueError, RuntimeError, NotImplementedError) as fetch_fail:
+        SYNC_LOGGER.debug(
+            f"Could not fetch the index of {render_remote(alias, uri)}:"
+            f"\n  {fetch_fail}"
+        )
+        return None
+    if not fetched.folders:
+        return None
+    if updated is None:
+        # for indices that don't record when they were saved, the best
+        # available guess is the latest change the index knows about
+        updated = dt.datetime.fromtimestamp(max(fetched.folders.values()) / 1e9)
+    return updated, fetched
+
+
+def _read_sync_state(minecraft_root: Path) -> dict:
+    """Read the raw contents of the sync state file
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+
+    Returns
+    -------
+    dict
+        The recorded state of each remote, keyed by alias. If the file does
+        not exist or cannot be parsed, this will be an empty dict.
+    """
+    state_path = fs.sync_state_file(minecraft_root)
+    try:
+        state = json.loads(state_path.read_text())
+        if isinstance(state, dict):
+            return state
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        pass
+    SYNC_LOGGER.warning(f"{state_path} is corrupt and will be ignored")
+    return {}
+
+
+def _portable(chest_index: index.Index) -> index.Index:
+    """Strip out the parts of an index that won't match across machines
+
+    Parameters
+    ----------
+    chest_index : Index
+        The index to convert
+
+    Returns
+    -------
+    Index
+        The index without any inode numbers
+    """
+    return index.Index(
+        {},
+        {path: entry._replace(inode=0) for path, entry in chest_index.files.items()},
+    )
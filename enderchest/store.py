@@ -0,0 +1,267 @@
+"""Content-addressed storage for files shared between shulker boxes"""
+import fnmatch
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from . import filesystem as fs
+from .loggers import STORE_LOGGER
+
+DEFAULT_PATTERNS = ("*.jar", "*.zip")
+"""By default, only mods, resource packs and the like are deduplicated, since
+those are the files most likely to be shared between shulker boxes (and the
+least likely to be edited in place)"""
+
+
+class DedupeReport(NamedTuple):
+    """The results of deduplicating the files in an EnderChest
+
+    Parameters
+    ----------
+    files : int
+        The number of files that were replaced with links into the store
+    bytes_saved : int
+        The number of bytes that no longer need to be stored (or synced) thanks
+        to the deduplication
+    pruned : int
+        The number of objects removed from the store because nothing
+        references them anymore
+    """
+
+    files: int
+    bytes_saved: int
+    pruned: int
+
+
+def hash_file(path: Path) -> str:
+    """Compute the content address of a file
+
+    Parameters
+    ----------
+    path : Path
+        The file to hash
+
+    Returns
+    -------
+    str
+        The hex-encoded SHA-256 digest of the file's contents
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def object_path(store: Path, content_hash: str) -> Path:
+    """Generate the path where the file with the given hash would live within
+    the store
+
+    Parameters
+    ----------
+    store : Path
+        The store folder
+    content_hash : str
+        The file's content address
+
+    Returns
+    -------
+    Path
+        The path to the object
+    """
+    return store / content_hash[:2] / content_hash
+
+
+def deduplicate(
+    minecraft_root: Path,
+    patterns: Iterable[str] = DEFAULT_PATTERNS,
+    symlink: bool = False,
+    dry_run: bool = False,
+) -> DedupeReport:
+    """Move the files inside of your shulker boxes into a content-addressed
+    store so that each unique file is only kept (and synced) once
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    patterns : list of str, optional
+        Filename patterns for the files to deduplicate. By default, only .jar
+        and .zip files will be deduplicated.
+    symlink : bool, optional
+        By default, shulker boxes will reference the store via hard links.
+        Pass in `symlink=True` to use (relative) symlinks instead.
+    dry_run : bool, optional
+        Whether to only report on what would be deduplicated. Default is False.
+
+    Returns
+    -------
+    DedupeReport
+        A summary of the deduplication
+
+    Notes
+    -----
+    - **Files that have been deduplicated should not be edited in place**, as
+      that will change every copy of the file (when using hard links) or the
+      store itself (when using symlinks). Replacing such a file with a new
+      one is perfectly fine.
+    - Files that were previously deduplicated using hard links will be
+      converted to symlinks when deduplicating with `symlink=True`.
+    - Hard links are transparent to Minecraft and every other program, and
+      rsync (run with --hard-links, which EnderChest does by default once
+      the store exists) and the file protocol will only transfer each linked
+      file once. Symlinks
+      survive syncing with any protocol, since they point into the
+      store, which is synced along with everything else.
+    - Objects in the store that are no longer referenced by any shulker box
+      are pruned at the end of the deduplication.
+    """
+    patterns = tuple(patterns)
+    store = fs.store_folder(minecraft_root)
+
+    files = 0
+    bytes_saved = 0
+    stored_hashes: set[str] = set()
+    for config in fs.shulker_box_configs(minecraft_root):
+        for path in _box_files(config.parent, patterns):
+            content_hash = hash_file(path)
+            stored = object_path(store, content_hash)
+            already_linked = stored.exists() and path.samefile(stored)
+            if already_linked and not symlink:
+                continue
+            if not already_linked and (
+                content_hash in stored_hashes or stored.exists()
+            ):
+                bytes_saved += path.stat().st_size
+            stored_hashes.add(content_hash)
+            STORE_LOGGER.debug(f"Deduplicating {path} as {content_hash}")
+            files += 1
+            if dry_run:
+                continue
+            if not stored.exists():
+                stored.parent.mkdir(parents=True, exist_ok=True)
+                _link_or_copy(path, stored)
+            if symlink or not path.samefile(stored):
+                _replace_with_link(path, stored, symlink)
+
+    pruned = prune(minecraft_root, dry_run=dry_run)
+
+    STORE_LOGGER.info(
+        f"{'Would deduplicate' if dry_run else 'Deduplicated'} {files} files,"
+        f" saving {bytes_saved:,} bytes"
+    )
+    return DedupeReport(files, bytes_saved, pruned)
+
+
+def prune(minecraft_root: Path, dry_run: bool = False) -> int:
+    """Remove any objects from the store that are no longer referenced by
+    any shulker box
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    dry_run : bool, optional
+        Whether to only report on what would be removed. Default is False.
+
+    Returns
+    -------
+    int
+        The number of objects that were (or would be) removed
+    """
+    store = fs.store_folder(minecraft_root)
+    if not store.is_dir():
+        return 0
+
+    symlinked: set[Path] = set()
+    for config in fs.shulker_box_configs(minecraft_root):
+        for folder, dirs, filenames in os.walk(config.parent):
+            for name in (*dirs, *filenames):
+                path = Path(folder) / name
+                if path.is_symlink():
+                    target = path.resolve()
+                    if target.is_relative_to(store.resolve()):
+                        symlinked.add(target)
+
+    pruned = 0
+    for stored in store.glob("*/*"):
+        if stored.stat().st_nlink > 1 or stored.resolve() in symlinked:
+            continue
+        STORE_LOGGER.debug(f"Removing unreferenced object {stored.name}")
+        pruned += 1
+        if not dry_run:
+            stored.unlink()
+            if not any(stored.parent.iterdir()):
+                stored.parent.rmdir()
+    return pruned
+
+
+def _box_files(box_root: Path, patterns: tuple[str, ...]) -> Iterable[Path]:
+    """Find all the regular files (not symlinks) within a shulker box that
+    match the provided patterns
+
+    Parameters
+    ----------
+    box_root : Path
+        The root folder of the shulker box
+    patterns : tuple of str
+        The filename patterns to match
+
+    Yields
+    ------
+    Path
+        Each matching file
+    """
+    for folder, _, filenames in os.walk(box_root):
+        for name in filenames:
+            path = Path(folder) / name
+            if path.is_symlink() or name == fs.SHULKER_BOX_CONFIG_NAME:
+                continue
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                yield path
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Hard link a file into place, falling back to a copy if hard links
+    aren't supported
+
+    Parameters
+    ----------
+    source : Path
+        The file to link
+    destination : Path
+        Where to put the link
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def _replace_with_link(path: Path, stored: Path, symlink: bool) -> None:
+    """Atomically replace a file with a link to its stored copy
+
+    Parameters
+    ----------
+    path : Path
+        The file to replace
+    stored : Path
+        The object in the store
+    symlink : bool
+        Whether to use a (relative) symlink rather than a hard link
+    """
+    staging = path.with_name(f".{path.name}.enderchest-dedupe")
+    staging.unlink(missing_ok=True)
+    if symlink:
+        staging.symlink_to(os.path.relpath(stored, path.parent))
+    else:
+        try:
+            os.link(stored, staging)
+        except OSError as link_fail:
+            STORE_LOGGER.warning(f"Could not deduplicate {path}:\n  {link_fail}")
+            return
+    os.replace(staging, path)
@@ -1,4 +1,5 @@
 """Low-level functionality for synchronizing across different machines"""
+import functools
 import getpass
 import importlib
 import os
@@ -7,9 +8,9 @@ from collections.abc import Generator
 from contextlib import contextmanager
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Iterable
+from types import ModuleType
+from typing import Any, Callable, Iterable, NamedTuple
 from urllib.parse import ParseResult, unquote
-from urllib.request import url2pathname
 
 from ..loggers import SYNC_LOGGER
 
@@ -17,6 +18,260 @@ SUPPORTED_PROTOCOLS = ("rsync", "file")
 
 DEFAULT_PROTOCOL = SUPPORTED_PROTOCOLS[0]
 
+PROTOCOL_ENTRY_POINT_GROUP = "enderchest.sync_protocols"
+"""Third-party packages can provide additional sync protocols by registering
+modules (implementing `pull` and `push` and, ideally, defining `CAPABILITIES`
+and `is_available`) under this entry point group, using the URI scheme as the
+entry point name"""
+
+
+class Capabilities(NamedTuple):
+    """What a sync protocol is able to do
+
+    Parameters
+    ----------
+    options : frozenset of str
+        The names of the optional keyword arguments accepted by the protocol's
+        `pull` and `push` methods
+    local_only : bool
+        Whether the protocol can only sync with locations on this machine
+    delete : bool
+        Whether the protocol can be told not to delete files at the destination
+        that aren't at the source
+    checksum : bool
+        Whether the protocol can compare files by their contents
+    compression : bool
+        Whether the protocol compresses data in transit
+    daemon : bool
+        Whether the protocol can connect to a sync daemon
+    """
+
+    options: frozenset[str] = frozenset()
+    local_only: bool = False
+    delete: bool = False
+    checksum: bool = False
+    compression: bool = False
+    daemon: bool = False
+
+
+def entry_points(group: str) -> Iterable[Any]:
+    """Look up the installed entry points for a group
+
+    Parameters
+    ----------
+    group : str
+        The entry point group
+
+    Returns
+    -------
+    list-like of EntryPoint
+        The entry points in that group
+
+    Notes
+    -----
+    importlib.metadata is slow to import, so it's only imported once it's
+    actually needed
+    """
+    from importlib import metadata
+
+    return metadata.entry_points(group=group)
+
+
+@functools.cache
+def _protocol_registry() -> dict[str, Callable[[], Any]]:
+    """Collect the built-in sync protocols along with any registered through
+    entry points
+
+    Returns
+    -------
+    dict of str to Callable
+        Methods for loading each protocol's module, keyed by URI scheme
+    """
+    registry: dict[str, Callable[[], Any]] = {}
+    for plugin in entry_points(group=PROTOCOL_ENTRY_POINT_GROUP):
+        registry[plugin.name.lower()] = plugin.load
+    for builtin in SUPPORTED_PROTOCOLS:
+        registry[builtin] = functools.partial(
+            importlib.import_module, f"{__package__}.{builtin}"
+        )
+    return registry
+
+
+def registered_protocols() -> list[str]:
+    """List the schemes of every sync protocol EnderChest knows about
+    (whether or not it's available on this system)
+
+    Returns
+    -------
+    list of str
+        The built-in protocols, followed by any provided by plugins
+    """
+    return [
+        *SUPPORTED_PROTOCOLS,
+        *sorted(set(_protocol_registry()) - set(SUPPORTED_PROTOCOLS)),
+    ]
+
+
+@functools.cache
+def _import_protocol(scheme: str) -> ModuleType:
+    """Import (just once) the module implementing a sync protocol
+
+    Parameters
+    ----------
+    scheme : str
+        The (lowercase) URI scheme
+
+    Returns
+    -------
+    module
+        The protocol's module
+
+    Raises
+    ------
+    NotImplementedError
+        If no such protocol is registered
+    """
+    try:
+        loader = _protocol_registry()[scheme]
+    except KeyError:
+        raise NotImplementedError(f"Protocol {scheme} is not currently implemented")
+    return loader()
+
+
+def load_protocol(scheme: str) -> ModuleType:
+    """Load the module implementing a sync protocol, importing it only the
+    first time it's needed
+
+    Parameters
+    ----------
+    scheme : str
+        The URI scheme of the protocol
+
+    Returns
+    -------
+    module
+        The protocol's module
+
+    Raises
+    ------
+    NotImplementedError
+        If no such protocol is registered, or if the protocol cannot be used
+        on this system
+    """
+    protocol = _import_protocol(scheme.lower())
+    if not getattr(protocol, "is_available", lambda: True)():
+        raise NotImplementedError(f"Protocol {scheme} is not available on this system")
+    return protocol
+
+
+def protocol_capabilities(scheme: str) -> Capabilities:
+    """Look up what a sync protocol is able to do
+
+    Parameters
+    ----------
+    scheme : str
+        The URI scheme of the protocol
+
+    Returns
+    -------
+    Capabilities
+        The protocol's capabilities. Protocols that don't declare their
+        capabilities are assumed to support no optional arguments.
+
+    Raises
+    ------
+    NotImplementedError
+        If no such protocol is registered
+    """
+    return getattr(_import_protocol(scheme.lower()), "CAPABILITIES", Capabilities())
+
+
+def resolve_protocol(uri: ParseResult) -> ParseResult:
+    """Determine the cheapest way of syncing with a remote that's actually
+    available on this system
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the remote
+
+    Returns
+    -------
+    ParseResult
+        The URI to use for syncing. This will be the original URI unless its
+        protocol is unavailable and the remote is on this machine, in which
+        case it'll be switched to the file protocol.
+
+    Raises
+    ------
+    NotImplementedError
+        If there's no viable protocol for syncing with the remote
+    """
+    try:
+        load_protocol(uri.scheme)
+        return uri
+    except NotImplementedError:
+        if uri.scheme.lower() == "file" or uri.hostname not in (
+            None,
+            "localhost",
+            socket.gethostname().lower(),
+        ):
+            raise
+        return uri._replace(scheme="file")
+
+
+def unsupported_options(scheme: str, options: dict[str, Any]) -> list[str]:
+    """Check which of the specified sync options a protocol doesn't support
+
+    Parameters
+    ----------
+    scheme : str
+        The URI scheme of the protocol
+    options : dict
+        The options that would be passed into the sync
+
+    Returns
+    -------
+    list of str
+        The names of any options that have been set (to something other than
+        None) but that the protocol does not support
+    """
+    supported = protocol_capabilities(scheme).options
+    return [
+        option
+        for option, value in options.items()
+        if value is not None and option not in supported
+    ]
+
+
+def _supported_options(scheme: str, options: dict[str, Any]) -> dict[str, Any]:
+    """Filter out any options that a protocol doesn't support
+
+    Parameters
+    ----------
+    scheme : str
+        The URI scheme of the protocol
+    options : dict
+        The options that would be passed into the sync
+
+    Returns
+    -------
+    dict
+        Just the options the protocol supports
+
+    Notes
+    -----
+    Options that have been set (to something other than None) are reported
+    as warnings, since they won't have the effect that was asked for
+    """
+    supported = protocol_capabilities(scheme).options
+    if ignored := unsupported_options(scheme, options):
+        SYNC_LOGGER.warning(
+            f"The {scheme} protocol does not support the following options,"
+            " which will be ignored: " + ", ".join(ignored)
+        )
+    return {option: value for option, value in options.items() if option in supported}
+
 
 def get_default_netloc() -> str:
     """Compile a netloc from environment variables, etc.
@@ -53,13 +308,15 @@ def render_remote(alias: str, uri: ParseResult) -> str:
 
 
 @contextmanager
-def remote_file(uri: ParseResult) -> Generator[Path, None, None]:
+def remote_file(uri: ParseResult, **kwargs) -> Generator[Path, None, None]:
     """Grab a file from a remote filesystem by its URI and read its contents
 
     Parameters
     ----------
     uri : parsed URI
         The URI of the file to read
+    **kwargs
+        Any additional options to pass into the sync command
 
     Yields
     ------
@@ -67,10 +324,56 @@ def remote_file(uri: ParseResult) -> Generator[Path, None, None]:
         A path to a local (temp) copy of the file
     """
     with TemporaryDirectory(ignore_cleanup_errors=True) as tmpdir:
-        pull(uri, Path(tmpdir))
+        pull(uri, Path(tmpdir), **kwargs)
         yield Path(tmpdir) / Path(uri.path).name
 
 
+def read_remote_file(uri: ParseResult, **kwargs) -> str:
+    """Read the contents of a (small) file on a remote filesystem straight
+    into memory
+
+    Parameters
+    ----------
+    uri : parsed URI
+        The URI of the file to read
+    **kwargs
+        Any additional options to pass into the protocol (for example,
+        `timeout`)
+
+    Returns
+    -------
+    str
+        The contents of the file
+
+    Raises
+    ------
+    NotImplementedError
+        If the protocol is not implemented or is unavailable on this system
+    OSError
+        If the file could not be read
+    TimeoutError
+        If the file could not be read within the specified timeout
+
+    Notes
+    -----
+    Protocols can provide a `read_file` method that streams the file's
+    contents (as bytes) directly. For protocols that don't (or that raise a
+    `NotImplementedError` for a given set of options), the file is pulled
+    into a temporary directory and read from there.
+    """
+    protocol = load_protocol(uri.scheme)
+    options = _supported_options(uri.scheme, kwargs)
+    if (read_file := getattr(protocol, "read_file", None)) is not None:
+        try:
+            return read_file(uri, **options).decode("utf-8")
+        except NotImplementedError as no_direct_read:
+            SYNC_LOGGER.debug(
+                f"Could not read {uri.geturl()} directly:\n  {no_direct_read}"
+            )
+    with remote_file(uri, **kwargs) as local_copy:
+        return local_copy.read_text("utf-8")
+
+
 def pull(
     remote_uri: ParseResult,
     local_path: Path,
@@ -92,14 +395,22 @@ def pull(
         Whether to only simulate this sync (report the operations to be performed
         but not actually perform them). Default is False.
     **kwargs
-        Any additional options to pass into the sync command
+        Any additional options to pass into the sync command. Options the
+        protocol doesn't support will be ignored.
+
+    Raises
+    ------
+    NotImplementedError
+        If the protocol is not implemented or is unavailable on this system
     """
+    protocol = load_protocol(remote_uri.scheme)
     try:
-        protocol = importlib.import_module(f"{__package__}.{remote_uri.scheme.lower()}")
-        protocol.pull(remote_uri, local_path, exclude or (), dry_run, **kwargs)
-    except ModuleNotFoundError:
-        raise NotImplementedError(
-            f"Protocol {remote_uri.scheme} is not currently implemented"
+        protocol.pull(
+            remote_uri,
+            local_path,
+            exclude or (),
+            dry_run,
+            **_supported_options(remote_uri.scheme, kwargs),
         )
     except TypeError as unknown_kwarg:
         raise NotImplementedError(
@@ -128,15 +439,22 @@ def push(
         Whether to only simulate this sync (report the operations to be performed
         but not actually perform them). Default is False.
     **kwargs
-        Any additional options to pass into the sync command
+        Any additional options to pass into the sync command. Options the
+        protocol doesn't support will be ignored.
+
+    Raises
+    ------
+    NotImplementedError
+        If the protocol is not implemented or is unavailable on this system
     """
-    try:
-        protocol = importlib.import_module(f"{__package__}.{remote_uri.scheme.lower()}")
-        protocol.push(local_path, remote_uri, exclude or (), dry_run, **kwargs)
-    except ModuleNotFoundError:
-        raise NotImplementedError(
-            f"Protocol {remote_uri.scheme} is not currently implemented"
-        )
+    protocol = load_protocol(remote_uri.scheme)
+    protocol.push(
+        local_path,
+        remote_uri,
+        exclude or (),
+        dry_run,
+        **_supported_options(remote_uri.scheme, kwargs),
+    )
 
 
 def path_from_uri(uri: ParseResult) -> Path:
@@ -154,6 +472,8 @@ def path_from_uri(uri: ParseResult) -> Path:
     Path
         The path part of the URI as a Path
     """
+    from urllib.request import url2pathname  # (which is slow to import)
+
     host = "{0}{0}{mnt}{0}".format(os.path.sep, mnt=uri.netloc)
     return Path(os.path.abspath(os.path.join(host, url2pathname(unquote(uri.path)))))
 
@@ -162,8 +482,16 @@ __all__ = [
     "SYNC_LOGGER",
     "SUPPORTED_PROTOCOLS",
     "DEFAULT_PROTOCOL",
+    "PROTOCOL_ENTRY_POINT_GROUP",
+    "Capabilities",
+    "registered_protocols",
+    "load_protocol",
+    "protocol_capabilities",
+    "resolve_protocol",
+    "unsupported_options",
     "render_remote",
     "remote_file",
+    "read_remote_file",
     "path_from_uri",
     "pull",
     "push",
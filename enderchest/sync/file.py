@@ -1,17 +1,75 @@
 """shutil-based sync implementation"""
 import fnmatch
+import functools
+import hashlib
 import logging
 import os
 import shutil
+import stat
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Collection, Iterable
+from typing import Callable, Collection, Iterable, NamedTuple
 from urllib.parse import ParseResult
 
-from . import SYNC_LOGGER, path_from_uri
+from . import SYNC_LOGGER, Capabilities, path_from_uri
+
+if sys.platform.startswith("linux"):
+    import fcntl
+
+    # from linux/fs.h: _IOW(0x94, 9, int)
+    FICLONE: int | None = 0x40049409
+else:
+    FICLONE = None
+
+CAPABILITIES = Capabilities(
+    options=frozenset(("checksum", "workers", "hardlink")),
+    local_only=True,
+    checksum=True,
+)
+
+
+class _SyncOptions(NamedTuple):
+    """The settings (and shared state) for a single `copy` operation
+
+    Parameters
+    ----------
+    ignore : Callable
+        The ignore pattern created by `ignore_pattern` that specifies
+        which files to skip
+    dry_run : bool
+        Whether to only simulate this sync (report the operations to be performed
+        but not actually perform them)
+    checksum : bool
+        Whether to compare file contents rather than sizes and modification
+        times when determining if a file has changed
+    copy_file : Callable
+        The method to use to copy a single file from the source to the
+        destination
+    hard_links : dict of (int, int) to Path
+        The destination of the first file encountered for each source
+        (device, inode) pair that has more than one hard link
+    deferred_links : list of (Path, Path) tuples
+        The (existing destination, new destination) pairs of hard links that
+        need to be created once all the copies are done
+    """
+
+    ignore: Callable[[str, Collection[str]], set[str]]
+    dry_run: bool
+    checksum: bool
+    copy_file: Callable[[Path, Path], None]
+    hard_links: dict[tuple[int, int], Path]
+    deferred_links: list[tuple[Path, Path]]
 
 
 def copy(
-    source_path: Path, destination_folder: Path, exclude: Iterable[str], dry_run: bool
+    source_path: Path,
+    destination_folder: Path,
+    exclude: Iterable[str],
+    dry_run: bool,
+    checksum: bool = False,
+    workers: int | None = None,
+    hardlink: Iterable[str] = (),
 ) -> None:
     """Copy the specified source file or folder to the provided destination,
     overwriting any existing files and deleting any that weren't in the source
@@ -27,43 +85,387 @@ def copy(
     dry_run : bool
         Whether to only simulate this sync (report the operations to be performed
         but not actually perform them)
+    checksum : bool, optional
+        By default, a file that has the same size and modification time at the
+        source and the destination is considered unchanged and is skipped.
+        Pass in `checksum=True` to compare the files' contents instead (slower,
+        but robust against filesystems that don't preserve modification times).
+    workers : int, optional
+        The number of files to copy at once. By default (or if a value of 1 or
+        less is provided), files will be copied one at a time.
+    hardlink : list of str, optional
+        Filename patterns (say, "*.jar") for files that should be hard-linked
+        rather than copied when the source and destination are on the same
+        filesystem. **Only use this for files that never get modified in
+        place**, as the source and destination will share the same data.
 
     Notes
     -----
-    If the source file does not exist, the destination file will simply be deleted
-    (if it exists)
+    - If the source file does not exist, the destination file will simply be
+      deleted (if it exists)
+    - Only files that have changed are copied, and only files that are missing
+      from the source are deleted. Copied files keep the modification time
+      of their source so that the next sync can tell that they're unchanged.
+    - When copying with multiple workers, folders are still created (and
+      deletions and symlinks still processed) one at a time and in order,
+      so only the file copies themselves happen concurrently.
+    - When the source and destination are on the same device, files are
+      cloned (on copy-on-write filesystems like btrfs and XFS) or copied
+      in-kernel when possible, falling back to a regular copy otherwise.
+    - Files that are hard-linked together at the source (say, by
+      `enderchest dedupe`) are copied only once and hard-linked together at
+      the destination.
     """
-    log_level = logging.INFO if dry_run else logging.DEBUG
-
     ignore = ignore_patterns(*exclude)
     SYNC_LOGGER.debug(f"Ignoring patterns: {exclude}")
 
     destination_path = destination_folder / source_path.name
-    if destination_path.exists():
-        if destination_path.is_symlink():
-            SYNC_LOGGER.log(log_level, f"Removing symlink {destination_path}")
-            if not dry_run:
-                destination_path.unlink()
-        elif destination_path.is_dir():
-            clean(destination_path, ignore, dry_run)
-        else:
-            SYNC_LOGGER.log(log_level, f"Deleting {destination_path}")
+    if not os.path.lexists(source_path):
+        if os.path.lexists(destination_path):
+            _remove(destination_path, ignore, dry_run)
+        return
+
+    SYNC_LOGGER.debug(f"Syncing {source_path} into {destination_folder}")
+    same_device = source_path.lstat().st_dev == destination_folder.stat().st_dev
+    if same_device:
+        SYNC_LOGGER.debug("Source and destination are on the same device")
+    copy_file = functools.partial(
+        _copy_file, same_device=same_device, hardlink=tuple(hardlink)
+    )
+
+    if dry_run or workers is None or workers <= 1:
+        options = _SyncOptions(ignore, dry_run, checksum, copy_file, {}, [])
+        _sync(source_path, destination_path, options)
+        _create_deferred_links(options.deferred_links)
+        return
+
+    SYNC_LOGGER.debug(f"Copying files using {workers} workers")
+    copies: list[Future] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+
+        def submit_copy(source_file: Path, destination_file: Path) -> None:
+            copies.append(pool.submit(copy_file, source_file, destination_file))
+
+        options = _SyncOptions(ignore, dry_run, checksum, submit_copy, {}, [])
+        try:
+            _sync(source_path, destination_path, options)
+        except BaseException:
+            for pending_copy in copies:
+                pending_copy.cancel()
+            raise
+    for finished_copy in copies:
+        finished_copy.result()  # raise any errors that came up during copying
+    _create_deferred_links(options.deferred_links)
+
+
+def _sync(source_path: Path, destination_path: Path, options: _SyncOptions) -> None:
+    """Make the destination path a copy of the source path, touching only
+    what's changed
+
+    Parameters
+    ----------
+    source_path : Path
+        The file, folder or symlink to copy
+    destination_path : Path
+        Where the copy should go
+    options : _SyncOptions
+        The settings for this sync
+    """
+    ignore, dry_run, checksum, copy_file, hard_links, deferred_links = options
+    log_level = logging.INFO if dry_run else logging.DEBUG
+
+    source_stat = source_path.lstat()
+    try:
+        destination_stat: os.stat_result | None = destination_path.lstat()
+    except FileNotFoundError:
+        destination_stat = None
+
+    if stat.S_ISLNK(source_stat.st_mode):
+        target = os.readlink(source_path)
+        if destination_stat is not None:
+            if (
+                stat.S_ISLNK(destination_stat.st_mode)
+                and os.readlink(destination_path) == target
+            ):
+                return
+            _remove(destination_path, ignore, dry_run)
+        SYNC_LOGGER.log(log_level, f"Linking {destination_path} to {target}")
+        if not dry_run:
+            os.symlink(target, destination_path)
+        return
+
+    if stat.S_ISDIR(source_stat.st_mode):
+        if destination_stat is not None and not stat.S_ISDIR(destination_stat.st_mode):
+            _remove(destination_path, ignore, dry_run)
+            destination_stat = None
+        if destination_stat is None:
+            SYNC_LOGGER.log(log_level, f"Creating {destination_path}")
             if not dry_run:
-                destination_path.unlink()
+                destination_path.mkdir()
+        _sync_folder(
+            source_path, destination_path, destination_stat is not None, options
+        )
+        return
+
+    linked_to = destination_path
+    if source_stat.st_nlink > 1:
+        linked_to = hard_links.setdefault(
+            (source_stat.st_dev, source_stat.st_ino), destination_path
+        )
 
-    if source_path.exists():
-        SYNC_LOGGER.log(log_level, f"Copying {source_path} into {destination_folder}")
+    if destination_stat is not None:
+        if stat.S_ISREG(destination_stat.st_mode) and _is_unchanged(
+            source_path, source_stat, destination_path, destination_stat, checksum
+        ):
+            SYNC_LOGGER.debug(f"{destination_path} is up to date")
+            return
+        _remove(destination_path, ignore, dry_run)
+    if linked_to != destination_path:
+        SYNC_LOGGER.log(log_level, f"Hard-linking {destination_path} to {linked_to}")
         if not dry_run:
-            if source_path.is_dir():
-                shutil.copytree(
-                    source_path,
-                    destination_path,
-                    symlinks=True,
-                    ignore=ignore,
-                    dirs_exist_ok=True,
-                )
-            else:
-                shutil.copy(source_path, destination_path, follow_symlinks=False)
+            deferred_links.append((linked_to, destination_path))
+        return
+    SYNC_LOGGER.log(log_level, f"Copying {source_path} to {destination_path}")
+    if not dry_run:
+        copy_file(source_path, destination_path)
+
+
+def _sync_folder(
+    source_folder: Path,
+    destination_folder: Path,
+    destination_exists: bool,
+    options: _SyncOptions,
+) -> None:
+    """Sync the contents of one folder into another
+
+    Parameters
+    ----------
+    source_folder : Path
+        The folder to copy the contents of
+    destination_folder : Path
+        The folder to copy them into
+    destination_exists : bool
+        Whether the destination folder already existed before this sync
+        (during a dry run, a folder that would be created won't actually
+        exist)
+    options : _SyncOptions
+        The settings for this sync
+    """
+    source_names = _list_folder(source_folder, options.ignore)
+    if destination_exists:
+        for name in _list_folder(destination_folder, options.ignore) - source_names:
+            _remove(destination_folder / name, options.ignore, options.dry_run)
+
+    for name in sorted(source_names):
+        _sync(source_folder / name, destination_folder / name, options)
+
+
+def _create_deferred_links(deferred_links: Iterable[tuple[Path, Path]]) -> None:
+    """Recreate the hard links found at the source once all the files they
+    link to have been copied
+
+    Parameters
+    ----------
+    deferred_links : list of (Path, Path) tuples
+        The (existing destination, new destination) pairs of links to create
+
+    Notes
+    -----
+    If a link cannot be created (say, because the destination filesystem
+    doesn't support hard links), the file will be copied instead.
+    """
+    for existing, destination in deferred_links:
+        try:
+            os.link(existing, destination)
+        except OSError as link_fail:
+            SYNC_LOGGER.debug(f"Could not hard-link {destination}: {link_fail}")
+            shutil.copy2(existing, destination, follow_symlinks=False)
+
+
+def _copy_file(
+    source_path: Path,
+    destination_path: Path,
+    same_device: bool = False,
+    hardlink: Collection[str] = (),
+) -> None:
+    """Copy a single file, preserving its modification time
+
+    Parameters
+    ----------
+    source_path : Path
+        The file to copy
+    destination_path : Path
+        Where to copy it to
+    same_device : bool, optional
+        Whether the source and destination are on the same device, in which
+        case the file will be hard-linked or cloned if possible
+    hardlink : list of str, optional
+        Filename patterns for files that should be hard-linked rather than
+        copied if the source and destination are on the same device
+    """
+    if same_device:
+        if any(fnmatch.fnmatch(source_path.name, pattern) for pattern in hardlink):
+            try:
+                os.link(source_path, destination_path)
+                return
+            except OSError as link_fail:
+                SYNC_LOGGER.debug(f"Could not hard-link {source_path}: {link_fail}")
+        if _clone_file(source_path, destination_path):
+            shutil.copystat(source_path, destination_path, follow_symlinks=False)
+            return
+    shutil.copy2(source_path, destination_path, follow_symlinks=False)
+
+
+def _clone_file(source_path: Path, destination_path: Path) -> bool:
+    """Copy a file's contents without pulling them through userspace, either
+    by creating a copy-on-write clone (reflink) or by using `copy_file_range`
+
+    Parameters
+    ----------
+    source_path : Path
+        The file to copy
+    destination_path : Path
+        Where to copy it to
+
+    Returns
+    -------
+    bool
+        True if the contents were copied, False if neither method is supported
+        (in which case the destination may have been created but will need to
+        be overwritten)
+    """
+    if FICLONE is None and not hasattr(os, "copy_file_range"):
+        return False
+    with source_path.open("rb") as source, destination_path.open("wb") as dest:
+        if FICLONE is not None:
+            try:
+                fcntl.ioctl(dest.fileno(), FICLONE, source.fileno())
+                return True
+            except OSError:
+                pass
+        if hasattr(os, "copy_file_range"):
+            remaining = os.fstat(source.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(
+                        source.fileno(), dest.fileno(), remaining
+                    )
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except OSError:
+                return False
+            return remaining == 0
+    return False
+
+
+def _list_folder(
+    folder: Path, ignore: Callable[[str, Collection[str]], set[str]]
+) -> set[str]:
+    """List the names of the contents of a folder that aren't being ignored
+
+    Parameters
+    ----------
+    folder : Path
+        The folder to list
+    ignore : Callable
+        The ignore pattern created by `ignore_pattern` that specifies
+        which files to skip
+
+    Returns
+    -------
+    set of str
+        The names of the files, folders and symlinks inside the folder
+    """
+    with os.scandir(folder) as entries:
+        names = {entry.name for entry in entries}
+    ignored = ignore(os.fspath(folder), names)
+    for name in ignored:
+        SYNC_LOGGER.debug(f"Skipping {folder / name}")
+    return names - ignored
+
+
+def _remove(path: Path, ignore, dry_run: bool) -> None:
+    """Remove a file, symlink or (while respecting the provided ignore pattern)
+    folder
+
+    Parameters
+    ----------
+    path : Path
+        The path to remove
+    ignore : Callable
+        The ignore pattern created by `ignore_pattern` that specifies
+        which files to leave alone
+    dry_run : bool
+        Whether to only simulate this sync (report the operations to be performed
+        but not actually perform them)
+    """
+    log_level = logging.INFO if dry_run else logging.DEBUG
+    if path.is_symlink():
+        SYNC_LOGGER.log(log_level, f"Removing symlink {path}")
+        if not dry_run:
+            path.unlink()
+    elif path.is_dir():
+        clean(path, ignore, dry_run)
+    else:
+        SYNC_LOGGER.log(log_level, f"Deleting {path}")
+        if not dry_run:
+            path.unlink()
+
+
+def _is_unchanged(
+    source_path: Path,
+    source_stat: os.stat_result,
+    destination_path: Path,
+    destination_stat: os.stat_result,
+    checksum: bool,
+) -> bool:
+    """Determine whether a file at the destination is already an up-to-date
+    copy of the source
+
+    Parameters
+    ----------
+    source_path : Path
+        The source file
+    source_stat : stat_result
+        The (lstat) stats of the source file
+    destination_path : Path
+        The destination file
+    destination_stat : stat_result
+        The (lstat) stats of the destination file
+    checksum : bool
+        Whether to compare file contents rather than modification times
+
+    Returns
+    -------
+    bool
+        True if the destination does not need to be re-copied, False otherwise
+    """
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+    if checksum:
+        return _file_digest(source_path) == _file_digest(destination_path)
+    return source_stat.st_mtime_ns == destination_stat.st_mtime_ns
+
+
+def _file_digest(path: Path) -> bytes:
+    """Hash the contents of a file
+
+    Parameters
+    ----------
+    path : Path
+        The file to hash
+
+    Returns
+    -------
+    bytes
+        The file's BLAKE2 digest
+    """
+    digest = hashlib.blake2b()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
 
 
 def clean(root: Path, ignore, dry_run: bool) -> None:
@@ -149,11 +551,32 @@ def ignore_patterns(*patterns: str):
     return _ignore_patterns
 
 
+def read_file(uri: ParseResult, **unsupported_kwargs) -> bytes:
+    """Read the contents of a file on this machine
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the file to read
+    **unsupported_kwargs
+        Any other provided options will be ignored
+
+    Returns
+    -------
+    bytes
+        The contents of the file
+    """
+    return path_from_uri(uri).expanduser().read_bytes()
+
+
 def pull(
     remote_uri: ParseResult,
     local_path: Path,
     exclude: Iterable[str],
     dry_run: bool,
+    checksum: bool = False,
+    workers: int | None = None,
+    hardlink: Iterable[str] = (),
     **unsupported_kwargs,
 ) -> None:
     """Copy an upstream file or folder into the specified location, where the remote
@@ -171,6 +594,16 @@ def pull(
     dry_run : bool
         Whether to only simulate this sync (report the operations to be performed
         but not actually perform them)
+    checksum : bool, optional
+        Whether to compare file contents (rather than sizes and modification
+        times) when deciding which files need to be copied. Default is False.
+    workers : int, optional
+        The number of files to copy at once. By default, files are copied
+        one at a time.
+    hardlink : list of str, optional
+        Filename patterns for files that should be hard-linked rather than
+        copied when the source and destination are on the same filesystem.
+        Only use this for files that never get modified in place.
     **unsupported_kwargs
         Any other provided options will be ignored
 
@@ -205,7 +638,15 @@ def pull(
             + "\n".join("  {}: {}".format(*item) for item in unsupported_kwargs.items())
         )
 
-    copy(source_path, destination_folder, exclude, dry_run)
+    copy(
+        source_path,
+        destination_folder,
+        exclude,
+        dry_run,
+        checksum=checksum,
+        workers=workers,
+        hardlink=hardlink,
+    )
 
 
 def push(
@@ -213,6 +654,9 @@ def push(
     remote_uri: ParseResult,
     exclude: Iterable[str],
     dry_run: bool,
+    checksum: bool = False,
+    workers: int | None = None,
+    hardlink: Iterable[str] = (),
     **unsupported_kwargs,
 ) -> None:
     """Copy a local file or folder into the specified location, where the remote
@@ -230,6 +674,16 @@ def push(
     dry_run : bool
         Whether to only simulate this sync (report the operations to be performed
         but not actually perform them)
+    checksum : bool, optional
+        Whether to compare file contents (rather than sizes and modification
+        times) when deciding which files need to be copied. Default is False.
+    workers : int, optional
+        The number of files to copy at once. By default, files are copied
+        one at a time.
+    hardlink : list of str, optional
+        Filename patterns for files that should be hard-linked rather than
+        copied when the source and destination are on the same filesystem.
+        Only use this for files that never get modified in place.
     **unsupported_kwargs
         Any other provided options will be ignored
 
@@ -264,4 +718,12 @@ def push(
             + "\n".join("  {}: {}".format(*item) for item in unsupported_kwargs.items())
         )
 
-    copy(source_path, destination_folder, exclude, dry_run)
+    copy(
+        source_path,
+        destination_folder,
+        exclude,
+        dry_run,
+        checksum=checksum,
+        workers=workers,
+        hardlink=hardlink,
+    )
@@ -1,16 +1,96 @@
 """rsync sync implementation. Relies on the user having rsync installed on their system"""
+import hashlib
 import logging
+import os
+import re
+import shlex
 import shutil
 import subprocess
+import threading
 from pathlib import Path
-from typing import Iterable
+from tempfile import NamedTemporaryFile
+from time import monotonic
+from typing import IO, Callable, Iterable, Iterator, NamedTuple
 from urllib.parse import ParseResult
 
-from . import SYNC_LOGGER, get_default_netloc, path_from_uri
+from .. import filesystem as fs
+from . import SYNC_LOGGER, Capabilities, get_default_netloc, path_from_uri, ssh
 
 RSYNC = shutil.which("rsync")
-if RSYNC is None:
-    raise RuntimeError("No rsync executable found on your system. Cannot sync using.")
+
+CAPABILITIES = Capabilities(
+    options=frozenset(
+        (
+            "use_daemon",
+            "timeout",
+            "delete",
+            "rsync_flags",
+            "rsync_args",
+            "progress_callback",
+            "reuse_dry_run",
+        )
+    ),
+    delete=True,
+    compression=True,
+    daemon=True,
+)
+
+CHANGE_LIST_TTL = 300
+"""The maximum age (in seconds) of a dry run whose list of changes can be reused
+for the real sync"""
+
+_ITEMIZED_CHANGE = re.compile(
+    r"^(?:\*deleting|(?P<update>[<>ch.])[fdLDS][.+ ?a-zA-Z]{7,9})\s+(?P<name>.+?)"
+    r"(?: -> .*| => .*)?$"
+)
+
+_CHANGE_LISTS: dict[tuple, tuple[float, str, list[str]]] = {}
+
+_PROGRESS = re.compile(
+    r"^\s*(?P<bytes>[\d,]+)\s+(?P<percent>\d+)%\s+(?P<rate>[\d.]+)(?P<unit>[kMGT]?)B/s"
+    r"\s+\S+(?:\s+\(xfe?r#(?P<files>\d+),.*\))?"
+)
+
+_UNITS = {"": 1, "k": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+PROGRESS_LOG_INTERVAL = 1.0
+"""The minimum number of seconds between progress messages sent to the log"""
+
+MAX_LINE_LENGTH = 1 << 16
+"""The longest line of rsync output that will be held in memory. Anything
+longer will be split."""
+
+
+class ProgressEvent(NamedTuple):
+    """An update on how an rsync transfer is going
+
+    Parameters
+    ----------
+    files : int
+        The number of files that have been fully transferred so far
+    bytes : int
+        The number of bytes that have been transferred so far
+    rate : float
+        The current transfer rate, in bytes per second
+    name : str or None
+        The file currently being transferred, if known
+    """
+
+    files: int
+    bytes: int
+    rate: float
+    name: str | None
+
+
+def is_available() -> bool:
+    """Check whether rsync is installed on this system
+
+    Returns
+    -------
+    bool
+        True if an rsync executable could be found, False otherwise
+    """
+    return RSYNC is not None
 
 
 def run_rsync(
@@ -23,6 +103,9 @@ def run_rsync(
     *additional_args: str,
     timeout: int | None = None,
     rsync_flags: str | None = None,
+    progress_callback: Callable[[ProgressEvent], None] | None = None,
+    reuse_dry_run: bool = False,
+    local_path: Path | None = None,
 ) -> None:
     """Run an operation with rsync
 
@@ -59,16 +142,173 @@ def run_rsync(
 
         Advanced users may choose to override these options, but **you do so
         at your own peril**.
+    progress_callback : Callable, optional
+        A method that will be called with a `ProgressEvent` every time rsync
+        reports on the progress of the transfer
+    reuse_dry_run : bool, optional
+        By default, every sync compares the full source and destination trees.
+        Passing in `reuse_dry_run=True` instead has a dry run record the list
+        of changes rsync reports so that, if the same sync is then run for real
+        (within `CHANGE_LIST_TTL` seconds), only the files on that list are
+        transferred (or deleted).
+    local_path : Path, optional
+        The local file or folder taking part in the sync. A dry run's changes
+        will only be reused if nothing inside of it has changed since the dry
+        run, so this must be provided for `reuse_dry_run` to have any effect.
+
+    Raises
+    ------
+    TimeoutError
+        If the sync did not complete within the specified timeout
 
     Notes
     -----
-    This method does not perform any validation or normalization of the source,
-    destination, exclude-list, additional arguments or rsync options.
+    - This method does not perform any validation or normalization of the source,
+      destination, exclude-list, additional arguments or rsync options.
+    - Even when `reuse_dry_run` is set, a dry run's changes can't be reused if
+      hard links are being preserved (the "H" flag) and the dry run reports
+      any: rsync can only re-create a hard link if every path linked to the
+      same file is part of the sync, so the real sync will compare the full
+      trees.
+    - Changes made to the remote side of the sync between the dry run and the
+      real one cannot be detected, which is why reusing a dry run is opt-in.
     """
     rsync_flags = rsync_flags or "avzs"
+    exclude = tuple(exclude)
+
+    reuse_from = local_path if reuse_dry_run else None
+    sync_key = (
+        working_directory.absolute(),
+        source,
+        destination_folder,
+        delete,
+        exclude,
+        additional_args,
+        rsync_flags,
+    )
+    change_list: list[str] | None = None
+    if reuse_from is not None and not dry_run:
+        recorded = _CHANGE_LISTS.pop(sync_key, None)
+        if recorded is not None and monotonic() - recorded[0] < CHANGE_LIST_TTL:
+            if recorded[1] == _snapshot(reuse_from):
+                change_list = recorded[2]
+            else:
+                SYNC_LOGGER.debug(
+                    "Local files have changed since the dry run, so the full sync"
+                    " will need to compare everything"
+                )
+        if change_list is not None:
+            if not change_list:
+                SYNC_LOGGER.info("The dry run found nothing to sync")
+                return
+            SYNC_LOGGER.debug(
+                f"Reusing the {len(change_list)} changes found during the dry run"
+            )
+
+    if change_list is None:
+        snapshot = _snapshot(reuse_from) if reuse_from is not None and dry_run else None
+        changes = _run(
+            working_directory,
+            source,
+            destination_folder,
+            delete,
+            dry_run,
+            exclude,
+            *additional_args,
+            *(("--itemize-changes",) if dry_run else ("--progress",)),
+            timeout=timeout,
+            rsync_flags=rsync_flags,
+            progress_callback=progress_callback,
+        )
+        if snapshot is not None and changes is not None:
+            _CHANGE_LISTS[sync_key] = (monotonic(), snapshot, changes)
+        return
+
+    with NamedTemporaryFile(
+        "w", suffix=".txt", delete=False, encoding="UTF-8", errors="surrogateescape"
+    ) as files_from:
+        files_from.write("\0".join(change_list))
+    try:
+        _run(
+            working_directory,
+            _parent_of(source),
+            destination_folder,
+            delete,
+            dry_run,
+            exclude,
+            *additional_args,
+            f"--files-from={files_from.name}",
+            "--from0",
+            "--delete-missing-args",
+            "--progress",
+            timeout=timeout,
+            rsync_flags=rsync_flags,
+            progress_callback=progress_callback,
+        )
+    finally:
+        Path(files_from.name).unlink()
+
+
+def _run(
+    working_directory: Path,
+    source: str,
+    destination_folder: str,
+    delete: bool,
+    dry_run: bool,
+    exclude: Iterable[str],
+    *additional_args: str,
+    timeout: int | None = None,
+    rsync_flags: str = "avzs",
+    progress_callback: Callable[[ProgressEvent], None] | None = None,
+) -> list[str] | None:
+    """Actually run rsync, streaming (and logging) its output as it goes
+
+    Parameters
+    ----------
+    working_directory : Path
+        The working directory to run the sync command from
+    source : str
+        The source file or folder to sync
+    destination_folder : str
+        The destination folder where the file or folder should be synced to
+    delete : bool
+        Whether part of the syncing should include deleting files at the destination
+        that aren't at the source
+    dry_run : bool
+        Whether to only simulate this sync
+    exclude : list of str
+        Any patterns that should be excluded from the sync (and sync)
+    *additional_args : str
+        Any additional arguments to pass into the rsync command
+    timeout : int, optional
+        The number of seconds to wait before timing out the sync operation.
+        If None is provided, no explicit timeout value will be set.
+    rsync_flags : str, optional
+        The flags to run rsync with. Default is "avzs".
+    progress_callback : Callable, optional
+        A method that will be called with a `ProgressEvent` every time rsync
+        reports on the progress of the transfer
+
+    Returns
+    -------
+    list of str or None
+        The itemized changes reported by rsync (see `parse_itemized_changes`)
+        if the command completed successfully and those changes can be
+        replayed via `--files-from`, None otherwise (including when hard
+        links are being preserved and rsync reported changes to any)
+
+    Raises
+    ------
+    TimeoutError
+        If the command did not complete within the specified timeout
+    """
+    if RSYNC is None:
+        raise RuntimeError(
+            "No rsync executable found on your system. Cannot sync using."
+        )
     log_level = logging.INFO if dry_run else logging.DEBUG
 
-    args: list[str] = [RSYNC, f"-{rsync_flags}"]  # type: ignore[list-item]
+    args: list[str] = [RSYNC, f"-{rsync_flags}"]
     if delete:
         args.append("--delete")
     if dry_run:
@@ -80,28 +320,260 @@ def run_rsync(
 
     SYNC_LOGGER.log(log_level, f"Executing the following command:\n  {' '.join(args)}")
 
+    changes: list[str] = []
+    replayable = True
     with subprocess.Popen(
         args,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         cwd=working_directory,
     ) as proc:
-        if timeout:
-            try:
-                proc.wait(timeout)
-            except subprocess.TimeoutExpired:
-                proc.kill()
-                SYNC_LOGGER.warning(
-                    proc.stdout.read().decode("UTF-8")  # type: ignore[union-attr]
-                )
-                raise TimeoutError("Timeout reached.")
+        timed_out = threading.Event()
+
+        def kill() -> None:
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill) if timeout else None
+        if timer is not None:
+            timer.start()
+        try:
+            tracker = _ProgressTracker()
+            last_logged = 0.0
+            for line in _read_lines(proc.stdout):  # type: ignore[arg-type]
+                if (event := tracker.update(line)) is not None:
+                    if progress_callback is not None:
+                        progress_callback(event)
+                    if monotonic() - last_logged >= PROGRESS_LOG_INTERVAL:
+                        last_logged = monotonic()
+                        SYNC_LOGGER.debug(
+                            f"Transferred {event.files} files ({event.bytes:,} bytes)"
+                            f" at {event.rate / (1 << 20):.2f} MB/s",
+                            extra={"progress": event},
+                        )
+                    continue
+                SYNC_LOGGER.log(log_level, line)
+                if (change := _parse_itemized_change(line)) is not None:
+                    changes.append(change)
+                    if replayable and "H" in rsync_flags and _is_hard_link(line):
+                        SYNC_LOGGER.debug(
+                            "Hard links have changed, so the full sync"
+                            " will need to compare everything"
+                        )
+                        replayable = False
+            proc.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+        if timed_out.is_set():
+            raise TimeoutError("Timeout reached.")
+    return changes if proc.returncode == 0 and replayable else None
+
+
+def _read_lines(stream: IO[bytes]) -> Iterator[str]:
+    """Read a stream of output one line at a time, treating carriage returns
+    (which rsync uses to redraw its progress meter) as line breaks
 
-        SYNC_LOGGER.log(
-            log_level,
-            proc.stdout.read().decode("UTF-8"),  # type: ignore[union-attr]
+    Parameters
+    ----------
+    stream : file-like of bytes
+        The stream to read
+
+    Yields
+    ------
+    str
+        Each non-empty line (no longer than `MAX_LINE_LENGTH`) of output
+    """
+    buffer = b""
+    while chunk := stream.read1(8192):  # type: ignore[attr-defined]
+        *lines, buffer = re.split(rb"[\r\n]", buffer + chunk)
+        if len(buffer) > MAX_LINE_LENGTH:
+            lines.append(buffer)
+            buffer = b""
+        for line in lines:
+            if line:
+                yield line.decode("UTF-8", "replace")
+    if buffer:
+        yield buffer.decode("UTF-8", "replace")
+
+
+class _ProgressTracker:
+    """Keeps a running tally of an rsync transfer by reading its output"""
+
+    def __init__(self):
+        self.files_done = 0
+        self.bytes_done = 0
+        self.current_file: str | None = None
+
+    def update(self, line: str) -> ProgressEvent | None:
+        """Process a line of rsync output
+
+        Parameters
+        ----------
+        line : str
+            The line of output
+
+        Returns
+        -------
+        ProgressEvent or None
+            The current state of the transfer, if the line was a progress
+            update
+        """
+        if not (progress := _PROGRESS.match(line)):
+            self.current_file = line
+            return None
+        transferred = int(progress.group("bytes").replace(",", ""))
+        rate = float(progress.group("rate")) * _UNITS[progress.group("unit")]
+        if progress.group("files") is not None:  # file is done
+            self.files_done = int(progress.group("files"))
+            self.bytes_done += transferred
+            transferred = 0
+        return ProgressEvent(
+            self.files_done, self.bytes_done + transferred, rate, self.current_file
         )
 
 
+def parse_itemized_changes(transcript: str) -> list[str]:
+    """Extract the list of changed (or deleted) files from the output of
+    rsync run with `--itemize-changes`
+
+    Parameters
+    ----------
+    transcript : str
+        The rsync output
+
+    Returns
+    -------
+    list of str
+        The paths (relative to the parent of the source) of every file, folder
+        or symlink that rsync reported it would transfer or delete, in the
+        order they were reported
+    """
+    return [
+        change
+        for change in map(_parse_itemized_change, transcript.splitlines())
+        if change is not None
+    ]
+
+
+def _parse_itemized_change(line: str) -> str | None:
+    """Extract the changed (or deleted) file from a line of itemized rsync
+    output
+
+    Parameters
+    ----------
+    line : str
+        The line of output
+
+    Returns
+    -------
+    str or None
+        The path of the file, folder or symlink, if the line described a change
+    """
+    if not (match := _ITEMIZED_CHANGE.match(line)):
+        return None
+    # rsync escapes unprintable bytes as \#ooo
+    return (
+        re.sub(
+            rb"\\#([0-7]{3})",
+            lambda escape: bytes((int(escape.group(1), 8),)),
+            match.group("name").encode("UTF-8"),
+        )
+        .decode("UTF-8", "surrogateescape")
+        .rstrip("/")
+    )
+
+
+def _is_hard_link(line: str) -> bool:
+    """Check whether a line of itemized rsync output describes a hard link
+
+    Parameters
+    ----------
+    line : str
+        The line of output
+
+    Returns
+    -------
+    bool
+        True if rsync reported that the file will be hard-linked to another
+        file in the transfer, False otherwise
+    """
+    match = _ITEMIZED_CHANGE.match(line)
+    return match is not None and match.group("update") == "h"
+
+
+def _snapshot(local_path: Path) -> str:
+    """Fingerprint the current state of a local file or folder, so that any
+    changes made to it can be detected
+
+    Parameters
+    ----------
+    local_path : Path
+        The file or folder to fingerprint
+
+    Returns
+    -------
+    str
+        A digest of the type, size, inode and modification time of the file
+        or folder and of everything inside of it
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    paths = [str(local_path)]
+    for root, folders, files in os.walk(local_path):
+        paths.extend(os.path.join(root, name) for name in (*folders, *files))
+    for path in sorted(paths):
+        try:
+            stat = os.lstat(path)
+            state = f"{stat.st_mode} {stat.st_size} {stat.st_ino} {stat.st_mtime_ns}"
+        except OSError:  # it was removed while we were looking
+            state = "missing"
+        digest.update(f"{path}\0{state}\n".encode("UTF-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def _default_flags(local_chest: Path) -> str:
+    """Choose the flags to run rsync with when the user hasn't specified any
+
+    Parameters
+    ----------
+    local_chest : Path
+        The local copy of the EnderChest folder being synced
+
+    Returns
+    -------
+    str
+        "avzs", plus "H" if the EnderChest has a store of deduplicated files
+        (since preserving hard links is costly on large trees, it's only worth
+        doing when there's a store full of them)
+    """
+    if (local_chest / fs.STORE_FOLDER_NAME).is_dir():
+        return "avzsH"
+    return "avzs"
+
+
+def _parent_of(source: str) -> str:
+    """Get the folder containing an rsync source
+
+    Parameters
+    ----------
+    source : str
+        The source, specified as either a URI string, an ssh address or a path
+        relative to the working directory
+
+    Returns
+    -------
+    str
+        The source's parent folder, in the same format
+    """
+    head, slash, _ = source.rstrip("/").rpartition("/")
+    if not slash:  # "EnderChest" or "host:EnderChest"
+        host, colon, _ = source.rpartition(":")
+        return f"{host}{colon}."
+    if head.endswith(":") or head == "":  # "host:/EnderChest" or "/EnderChest"
+        return head + "/"
+    return head
+
+
 def pull(
     remote_uri: ParseResult,
     local_path: Path,
@@ -112,6 +584,8 @@ def pull(
     delete: bool = True,
     rsync_flags: str | None = None,
     rsync_args: Iterable[str] | None = None,
+    progress_callback: Callable[[ProgressEvent], None] | None = None,
+    reuse_dry_run: bool = False,
 ) -> None:
     """Sync an upstream file or folder into the specified location using rsync.
     This will overwrite any files and folders already at the destination.
@@ -145,10 +619,22 @@ def pull(
           - use compression
           - no space splitting
 
+        If the local EnderChest has a store of deduplicated files (see
+        `enderchest dedupe`), "H" is added so that hard links are preserved
+        (and each of those files is only transferred once).
+
         Advanced users may choose to override these options, but **you do so
         at your own peril**.
     rsync_args: list of str, optional
         Any additional arguments to pass into rsync
+    progress_callback : Callable, optional
+        A method that will be called with a `ProgressEvent` every time rsync
+        reports on the progress of the transfer
+    reuse_dry_run : bool, optional
+        Whether a dry run should record the changes rsync reports, so that
+        running the same sync for real afterwards only has to transfer those
+        files (so long as nothing in the local folder has changed in the
+        meantime). Default is False.
 
     Raises
     ------
@@ -160,6 +646,9 @@ def pull(
     - This method does not provide for interactive authentication. If using
       rsync over SSH, you'll need to be set up for password-less (key-based)
       access.
+    - When syncing over SSH, the connection is shared with every other
+      rsync (and SSH) command run against the same remote until EnderChest
+      exits (unless a remote shell is explicitly specified via `rsync_args`).
     - If the destination folder does not already exist, this method will not
       create it or its parent directories.
     """
@@ -173,6 +662,7 @@ def pull(
         remote_path = remote_uri.geturl()
     else:
         remote_path = uri_to_ssh(remote_uri)
+        rsync_args = (*_remote_shell(remote_uri, rsync_args or ()), *(rsync_args or ()))
 
     run_rsync(
         local_path.parent,
@@ -183,7 +673,11 @@ def pull(
         exclude,
         *(rsync_args or ()),
         timeout=timeout,
-        rsync_flags=rsync_flags,
+        rsync_flags=rsync_flags
+        or _default_flags(local_path / path_from_uri(remote_uri).name),
+        progress_callback=progress_callback,
+        reuse_dry_run=reuse_dry_run,
+        local_path=local_path,
     )
 
 
@@ -197,6 +691,8 @@ def push(
     delete: bool = True,
     rsync_flags: str | None = None,
     rsync_args: Iterable[str] | None = None,
+    progress_callback: Callable[[ProgressEvent], None] | None = None,
+    reuse_dry_run: bool = False,
 ) -> None:
     """Sync a local file or folder into the specified location using rsync.
     This will overwrite any files and folders already at the destination.
@@ -230,16 +726,31 @@ def push(
           - use compression
           - no space splitting
 
+        If the local EnderChest has a store of deduplicated files (see
+        `enderchest dedupe`), "H" is added so that hard links are preserved
+        (and each of those files is only transferred once).
+
         Advanced users may choose to override these options, but **you do so
         at your own peril**.
     rsync_args: list of str, optional
         Any additional arguments to pass into rsync
+    progress_callback : Callable, optional
+        A method that will be called with a `ProgressEvent` every time rsync
+        reports on the progress of the transfer
+    reuse_dry_run : bool, optional
+        Whether a dry run should record the changes rsync reports, so that
+        running the same sync for real afterwards only has to transfer those
+        files (so long as nothing in the local folder has changed in the
+        meantime). Default is False.
 
     Notes
     -----
     - This method does not provide for interactive authentication. If using
       rsync over SSH, you'll need to be set up for password-less (key-based)
       access.
+    - When syncing over SSH, the connection is shared with every other
+      rsync (and SSH) command run against the same remote until EnderChest
+      exits (unless a remote shell is explicitly specified via `rsync_args`).
     - If the destination folder does not already exist, this method will very
       likely fail.
     """
@@ -250,6 +761,7 @@ def push(
         remote_path = remote_uri.geturl()
     else:
         remote_path = uri_to_ssh(remote_uri)
+        rsync_args = (*_remote_shell(remote_uri, rsync_args or ()), *(rsync_args or ()))
 
     run_rsync(
         local_path.parent,
@@ -260,10 +772,106 @@ def push(
         exclude,
         *(rsync_args or ()),
         timeout=timeout,
-        rsync_flags=rsync_flags,
+        rsync_flags=rsync_flags or _default_flags(local_path),
+        progress_callback=progress_callback,
+        reuse_dry_run=reuse_dry_run,
+        local_path=local_path,
     )
 
 
+def read_file(
+    uri: ParseResult,
+    use_daemon: bool = False,
+    timeout: int | None = None,
+    **unsupported_kwargs,
+) -> bytes:
+    """Read the contents of a remote file straight into memory by streaming
+    it over SSH (rather than rsyncing it into a temp folder)
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the file to read
+    use_daemon : bool, optional
+        Whether the remote is being accessed through an rsync daemon (in which
+        case the file can't be streamed). Default is False.
+    timeout : int, optional
+        The number of seconds to wait before giving up
+    **unsupported_kwargs
+        Any other provided options will be ignored
+
+    Returns
+    -------
+    bytes
+        The contents of the file
+
+    Raises
+    ------
+    NotImplementedError
+        If the file can't be streamed, and needs to be pulled using rsync
+        instead
+    FileNotFoundError
+        If the file could not be read
+    TimeoutError
+        If the file could not be read within the specified timeout
+
+    Notes
+    -----
+    The stream uses the same shared SSH connection as any rsync commands run
+    against the same remote.
+    """
+    if uri.netloc == get_default_netloc():
+        return path_from_uri(uri).read_bytes()
+    if use_daemon:
+        raise NotImplementedError("Files cannot be streamed from an rsync daemon")
+    if ssh.SSH is None:
+        raise NotImplementedError("No ssh executable found on your system")
+    try:
+        result = subprocess.run(
+            [
+                *ssh.ssh_command(uri),
+                ssh.destination(uri),
+                "cat",
+                "--",
+                shlex.quote(path_from_uri(uri).as_posix()),
+            ],
+            capture_output=True,
+            timeout=timeout,
+            check=False,
+        )
+    except subprocess.TimeoutExpired as timed_out:
+        raise TimeoutError(f"Timed out reading {uri.geturl()}") from timed_out
+    if result.returncode != 0:
+        raise FileNotFoundError(
+            f"Could not read {uri.geturl()}:"
+            f"\n  {result.stderr.decode(errors='replace').strip()}"
+        )
+    return result.stdout
+
+
+def _remote_shell(
+    remote_uri: ParseResult, rsync_args: Iterable[str]
+) -> tuple[str, ...]:
+    """Generate the rsync arguments for syncing over a shared SSH connection
+
+    Parameters
+    ----------
+    remote_uri : ParseResult
+        The URI of the remote
+    rsync_args : list of str
+        Any additional arguments the user has specified for rsync
+
+    Returns
+    -------
+    tuple of str
+        The arguments to pass into rsync (empty if the user has already
+        specified a remote shell)
+    """
+    if any(arg.startswith(("-e", "--rsh")) for arg in rsync_args):
+        return ()
+    return ("-e", ssh.remote_shell(remote_uri))
+
+
 # TODO: this will eventually go in the SFTP module or be replaced by Paramiko
 def uri_to_ssh(uri: ParseResult) -> str:
     """Convert a URI to an SSH address
@@ -0,0 +1,160 @@
+"""Shared SSH connections, so that repeated operations against the same
+remote only have to pay for the SSH handshake once"""
+import atexit
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from urllib.parse import ParseResult
+
+from . import SYNC_LOGGER
+
+SSH = shutil.which("ssh")
+
+CONTROL_PERSIST = 60
+"""The number of seconds a shared connection will stay open once nothing is
+using it, in case EnderChest exits without getting the chance to close it"""
+
+_CONTROL_FOLDER: Path | None = None
+_DESTINATIONS: dict[tuple[str, int | None], list[str]] = {}
+_LOCK = threading.Lock()
+
+
+def multiplexing_available() -> bool:
+    """Check whether connections can be shared on this system
+
+    Returns
+    -------
+    bool
+        True if there's an ssh executable and the OS supports the Unix
+        sockets OpenSSH uses for connection sharing, False otherwise
+    """
+    return SSH is not None and os.name == "posix"
+
+
+def destination(uri: ParseResult) -> str:
+    """Render the SSH destination for a URI
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the remote
+
+    Returns
+    -------
+    str
+        The destination in the form of [user@]host
+    """
+    return (f"{uri.username}@" if uri.username else "") + (uri.hostname or "localhost")
+
+
+def ssh_command(uri: ParseResult) -> list[str]:
+    """Generate the command for connecting to a remote over SSH, sharing
+    a single connection across every command run against the same remote
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the remote
+
+    Returns
+    -------
+    list of str
+        The ssh command, not including the destination
+
+    Notes
+    -----
+    The first connection to a remote becomes the "master" connection, which
+    stays open (in the background) until `close_connections` is called,
+    which will happen automatically once EnderChest exits.
+    """
+    command = [SSH or "ssh"]
+    if uri.port:
+        command.extend(("-p", str(uri.port)))
+    if not multiplexing_available():
+        return command
+    options = [
+        "-o",
+        f"ControlPath={_control_folder() / '%C'}",
+    ]
+    with _LOCK:
+        # (the port is part of the key, as each port gets its own connection)
+        _DESTINATIONS.setdefault((destination(uri), uri.port), command + options)
+    command.extend(options)
+    command.extend(
+        ("-o", "ControlMaster=auto", "-o", f"ControlPersist={CONTROL_PERSIST}")
+    )
+    return command
+
+
+def remote_shell(uri: ParseResult) -> str:
+    """Generate the remote shell (`rsync -e`) for syncing with a remote over
+    a shared SSH connection
+
+    Parameters
+    ----------
+    uri : ParseResult
+        The URI of the remote
+
+    Returns
+    -------
+    str
+        The ssh command, as a single string
+    """
+    return " ".join(shlex.quote(arg) for arg in ssh_command(uri))
+
+
+def close_connections() -> None:
+    """Close every shared connection that was opened by this process"""
+    global _CONTROL_FOLDER
+    with _LOCK:
+        destinations = dict(_DESTINATIONS)
+        _DESTINATIONS.clear()
+        control_folder, _CONTROL_FOLDER = _CONTROL_FOLDER, None
+    for (ssh_destination, _), command in destinations.items():
+        SYNC_LOGGER.debug(f"Closing shared connection to {ssh_destination}")
+        try:
+            subprocess.run(
+                [*command, "-O", "exit", ssh_destination],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=5,
+                check=False,
+            )
+        except (OSError, subprocess.TimeoutExpired) as close_fail:
+            SYNC_LOGGER.debug(
+                f"Could not close connection to {ssh_destination}:\n  {close_fail}"
+            )
+    if control_folder is not None:
+        shutil.rmtree(control_folder, ignore_errors=True)
+
+
+def _control_folder() -> Path:
+    """Get (creating it if needed) the private folder for holding the sockets
+    for this process's shared connections
+
+    Returns
+    -------
+    Path
+        The path to the folder
+
+    Notes
+    -----
+    Socket paths are limited to ~100 characters, so the folder is created
+    directly under /tmp when possible (rather than inside of, say, macOS's
+    rather long per-user temp folder).
+    """
+    global _CONTROL_FOLDER
+    with _LOCK:
+        if _CONTROL_FOLDER is None:
+            _CONTROL_FOLDER = Path(
+                tempfile.mkdtemp(
+                    prefix="enderchest-ssh-",
+                    dir="/tmp" if os.path.isdir("/tmp") else None,
+                )
+            )
+            atexit.register(close_connections)
+        return _CONTROL_FOLDER
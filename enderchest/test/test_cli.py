@@ -217,6 +217,14 @@ class TestPlace(ActionTestSuite):
         *_, options = cli.parse_args(["enderchest", "place", "/home", flag])
         assert options["cleanup"] is False
 
+    def test_deep_clean_is_off_by_default(self):
+        *_, options = cli.parse_args(["enderchest", "place", "/home"])
+        assert options["deep_clean"] is False
+
+    def test_deep_clean(self):
+        *_, options = cli.parse_args(["enderchest", "place", "--deep-clean"])
+        assert options["deep_clean"] is True
+
     def test_prompt_on_error_by_default(self):
         *_, options = cli.parse_args(["enderchest", "place"])
         assert (
@@ -245,6 +253,17 @@ class TestPlace(ActionTestSuite):
         action(Path(), **options)
         assert place_log[0][1]["error_handling"] == "ignore"
 
+    def test_linking_is_serial_by_default(self, place_log):
+        action, *_, options = cli.parse_args(["enderchest", "place"])
+        action(Path(), **options)
+        assert place_log[0][1]["jobs"] is None
+
+    @pytest.mark.parametrize("flag", ("-j", "--jobs"))
+    def test_specifying_number_of_jobs(self, place_log, flag):
+        action, *_, options = cli.parse_args(["enderchest", "place", flag, "4"])
+        action(Path(), **options)
+        assert place_log[0][1]["jobs"] == 4
+
     def test_absolute_path_links_is_the_default(self, place_log):
         action, *_, options = cli.parse_args(["enderchest", "place"])
         action(Path(), **options)
@@ -426,7 +445,92 @@ class TestOpen:
             "exclude": ["private", "*.secret"],
         }
 
+    def test_workers_are_only_passed_through_when_specified(self):
+        _, _, _, kwargs = cli.parse_args(["enderchest", *self.action.split()])
+        assert "workers" not in kwargs
+
+    @pytest.mark.parametrize("flag", ("-j", "--workers"))
+    def test_setting_the_number_of_workers(self, flag):
+        _, _, _, kwargs = cli.parse_args(
+            ["enderchest", *self.action.split(), flag, "8"]
+        )
+        assert kwargs["workers"] == 8
+
+    def test_setting_concurrency(self):
+        _, _, _, kwargs = cli.parse_args(
+            ["enderchest", *self.action.split(), "--concurrency", "3"]
+        )
+        assert kwargs["concurrency"] == 3
+
+    def test_setting_hardlink_patterns(self):
+        _, _, _, kwargs = cli.parse_args(
+            ["enderchest", *self.action.split(), "--hardlink", "*.jar", "*.zip"]
+        )
+        assert kwargs["hardlink"] == ["*.jar", "*.zip"]
+
+
+class TestOpenFastest:
+    def test_fastest_remote_is_only_passed_through_when_specified(self):
+        _, _, _, kwargs = cli.parse_args(["enderchest", "open"])
+        assert "fastest_remote" not in kwargs
+
+    def test_setting_fastest_remote(self):
+        _, _, _, kwargs = cli.parse_args(["enderchest", "open", "--fastest"])
+        assert kwargs["fastest_remote"] is True
+
 
 class TestClose(TestOpen):
     action = "close"
     op = "push"
+
+    def test_fastest_is_only_an_option_for_open(self):
+        with pytest.raises(SystemExit):
+            cli.parse_args(["enderchest", *self.action.split(), "--fastest"])
+
+
+class TestStatus(ActionTestSuite):
+    action = "status"
+
+    def test_remotes_are_checked_by_default(self):
+        _, _, _, kwargs = cli.parse_args(["enderchest", "status"])
+        assert kwargs == {"offline": False, "timeout": None}
+
+    def test_offline_status(self):
+        _, _, _, kwargs = cli.parse_args(["enderchest", "status", "--offline"])
+        assert kwargs["offline"] is True
+
+
+class TestDedupe(ActionTestSuite):
+    action = "dedupe"
+
+    def test_default_patterns_are_used_if_none_are_specified(self):
+        _, _, _, kwargs = cli.parse_args(["enderchest", "dedupe"])
+        assert kwargs == {"symlink": False, "dry_run": False}
+
+    def test_specifying_patterns_and_symlinks(self):
+        _, _, _, kwargs = cli.parse_args(
+            ["enderchest", "dedupe", "--symlink", "-p", "*.jar", "*.mrpack"]
+        )
+        assert kwargs == {
+            "patterns": ["*.jar", "*.mrpack"],
+            "symlink": True,
+            "dry_run": False,
+        }
+
+
+class TestWatch(ActionTestSuite):
+    action = "watch"
+
+    def test_watch_uses_inotify_by_default(self):
+        _, _, _, kwargs = cli.parse_args(["enderchest", "watch"])
+        assert kwargs == {"absolute": False, "relative": False, "polling": False}
+
+    def test_polling_with_a_custom_interval(self):
+        _, _, _, kwargs = cli.parse_args(
+            ["enderchest", "watch", "--polling", "--interval", "10", "--debounce", "1"]
+        )
+        assert (kwargs["polling"], kwargs["poll_interval"], kwargs["debounce"]) == (
+            True,
+            10,
+            1,
+        )
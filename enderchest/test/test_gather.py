@@ -1,14 +1,16 @@
 """Tests around file discovery and registration"""
+import json
 import os
 import re
 from pathlib import Path
 
 import pytest
 
-from enderchest import craft
+from enderchest import EnderChest, craft
 from enderchest import filesystem as fs
 from enderchest import gather
 from enderchest import instance as i
+from enderchest.enderchest import create_ender_chest
 
 from . import utils
 
@@ -209,6 +211,55 @@ offer-to-update-symlink-allowlist = False
         )
 
 
+class TestMinecraftFolderSearch:
+    def test_search_finds_minecraft_folders_in_order(self, tmp_path):
+        for name in ("b", "a", "c/nested"):
+            (tmp_path / name / ".minecraft").mkdir(parents=True)
+        assert list(fs.minecraft_folders(tmp_path)) == [
+            tmp_path / "a" / ".minecraft",
+            tmp_path / "b" / ".minecraft",
+            tmp_path / "c" / "nested" / ".minecraft",
+        ]
+
+    @pytest.mark.parametrize("skipped", sorted(fs.SKIP_WHEN_SEARCHING))
+    def test_search_does_not_descend_into_heavy_folders(self, tmp_path, skipped):
+        (tmp_path / skipped / "deep" / ".minecraft").mkdir(parents=True)
+        assert list(fs.minecraft_folders(tmp_path)) == []
+
+    def test_search_does_not_descend_into_minecraft_folders(self, tmp_path):
+        (tmp_path / ".minecraft" / "versions" / ".minecraft").mkdir(parents=True)
+        assert list(fs.minecraft_folders(tmp_path)) == [tmp_path / ".minecraft"]
+
+    def test_search_does_not_follow_symlinks(self, tmp_path):
+        (tmp_path / "real" / ".minecraft").mkdir(parents=True)
+        (tmp_path / "linked").symlink_to(tmp_path / "real", target_is_directory=True)
+        assert list(fs.minecraft_folders(tmp_path)) == [
+            tmp_path / "real" / ".minecraft"
+        ]
+
+    def test_search_of_missing_folder_finds_nothing(self, tmp_path):
+        assert list(fs.minecraft_folders(tmp_path / "nope")) == []
+
+    def test_parallel_gather_matches_serial_gather(self, minecraft_root, home):
+        utils.pre_populate_enderchest(
+            fs.ender_chest_folder(minecraft_root, check_exists=False)
+        )
+        with fs.ender_chest_config(minecraft_root).open("a") as ec_config:
+            ec_config.write(
+                """
+[properties]
+offer-to-update-symlink-allowlist = False
+"""
+            )
+        parallel = gather.gather_minecraft_instances(
+            minecraft_root, minecraft_root, official=None, jobs=4
+        )
+        assert len(parallel) > 1
+        assert parallel == gather.gather_minecraft_instances(
+            minecraft_root, minecraft_root, official=None, jobs=1
+        )
+
+
 class TestSymlinkAllowlistVersionChecker:
     """aka check my regex"""
 
@@ -335,3 +386,113 @@ class TestSymlinkAllowlistHandling:
         # make sure all responses were used
         with pytest.raises(StopIteration):
             mkay()
+
+
+class TestConfigCache:
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self, minecraft_root, monkeypatch):
+        utils.pre_populate_enderchest(
+            minecraft_root / "EnderChest", *utils.TESTING_SHULKER_CONFIGS
+        )
+        self.parse_count = 0
+        from_cfg = EnderChest.from_cfg
+
+        def counting_from_cfg(config_file):
+            self.parse_count += 1
+            return from_cfg(config_file)
+
+        monkeypatch.setattr(EnderChest, "from_cfg", counting_from_cfg)
+        yield
+        fs.invalidate_cached_config()
+
+    def test_repeat_loads_only_parse_once(self, minecraft_root):
+        first = gather.load_ender_chest(minecraft_root)
+        second = gather.load_ender_chest(minecraft_root)
+
+        assert (self.parse_count, first.instances) == (1, second.instances)
+
+    def test_each_load_gets_its_own_copy(self, minecraft_root):
+        first = gather.load_ender_chest(minecraft_root)
+        first.register_remote("sftp://steamdeck/home/deck", "deck")
+
+        assert "deck" not in {
+            alias for _, alias in gather.load_ender_chest(minecraft_root).remotes
+        }
+
+    def test_modifying_the_config_invalidates_the_cache(self, minecraft_root):
+        _ = gather.load_ender_chest(minecraft_root)
+        with fs.ender_chest_config(minecraft_root).open("a") as config_file:
+            config_file.write("\n[remotes]\ndeck = sftp://steamdeck/home/deck\n")
+
+        assert "deck" in {
+            alias for _, alias in gather.load_ender_chest(minecraft_root).remotes
+        }
+        assert self.parse_count == 2
+
+    def test_writing_the_config_invalidates_the_cache(self, minecraft_root):
+        ender_chest = gather.load_ender_chest(minecraft_root)
+        ender_chest.register_remote("sftp://steamdeck/home/deck", "deck")
+        create_ender_chest(minecraft_root, ender_chest)
+
+        assert "deck" in {
+            alias for _, alias in gather.load_ender_chest(minecraft_root).remotes
+        }
+
+    def test_shulker_boxes_are_cached_too(self, minecraft_root):
+        first = gather.load_shulker_boxes(minecraft_root)
+        second = gather.load_shulker_boxes(minecraft_root)
+
+        assert all(a is b for a, b in zip(first, second))
+
+
+class TestInstanceMetadataCache:
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self, minecraft_root, monkeypatch):
+        self.reads: list[str] = []
+        open_file, read_text = Path.open, Path.read_text
+
+        def counting_open(path, *args, **kwargs):
+            self.reads.append(path.name)
+            return open_file(path, *args, **kwargs)
+
+        def counting_read_text(path, *args, **kwargs):
+            self.reads.append(path.name)
+            return read_text(path, *args, **kwargs)
+
+        fs.invalidate_cached_config()
+        monkeypatch.setattr(Path, "open", counting_open)
+        monkeypatch.setattr(Path, "read_text", counting_read_text)
+        yield
+        fs.invalidate_cached_config()
+
+    def gather_all(self, minecraft_root):
+        return [
+            gather.gather_metadata_for_mmc_instance(
+                minecraft_root / "instances" / instance / ".minecraft"
+            )
+            for instance in ("axolotl", "bee", "chest-boat")
+        ]
+
+    def test_instgroups_is_only_read_once_per_launcher(self, minecraft_root):
+        _ = self.gather_all(minecraft_root)
+        assert self.reads.count("instgroups.json") == 1
+
+    def test_regathering_an_unchanged_launcher_reads_nothing(self, minecraft_root):
+        first = self.gather_all(minecraft_root)
+        self.reads.clear()
+
+        assert (self.gather_all(minecraft_root), self.reads) == (first, [])
+
+    def test_modifying_instgroups_invalidates_the_cache(self, minecraft_root):
+        _ = self.gather_all(minecraft_root)
+        instgroups = minecraft_root / "instances" / "instgroups.json"
+        groups = json.loads(instgroups.read_text())
+        groups["groups"]["new"] = {"hidden": False, "instances": ["bee"]}
+        instgroups.write_text(json.dumps(groups))
+
+        assert (
+            "new"
+            in gather.gather_metadata_for_mmc_instance(
+                minecraft_root / "instances" / "bee" / ".minecraft"
+            ).tags
+        )
@@ -0,0 +1,127 @@
+"""Tests of the EnderChest index"""
+import logging
+import os
+
+import pytest
+
+from enderchest import filesystem as fs
+from enderchest import index
+
+from . import utils
+
+
+@pytest.fixture
+def chest(minecraft_root):
+    utils.pre_populate_enderchest(
+        minecraft_root / "EnderChest", *utils.TESTING_SHULKER_CONFIGS[:2]
+    )
+    chest = fs.ender_chest_folder(minecraft_root)
+    (chest / "global" / "config").mkdir(parents=True, exist_ok=True)
+    (chest / "global" / "config" / "sodium.json").write_text("fast\n")
+    (chest / "global" / "options.txt").write_text("fov:70\n")
+    (chest / ".link_manifest.json").write_text("{}")
+    yield chest
+
+
+class TestUpdateIndex:
+    def test_index_covers_everything_that_gets_synced(self, minecraft_root, chest):
+        files = index.update_index(minecraft_root).files
+        assert "global/config/sodium.json" in files
+        assert "1.19/shulkerbox.cfg" in files
+        assert fs.ENDER_CHEST_CONFIG_NAME not in files
+        assert ".link_manifest.json" not in files
+        assert fs.index_file(minecraft_root).exists()
+
+    def test_index_round_trips(self, minecraft_root, chest):
+        assert index.update_index(minecraft_root) == index.load_index(minecraft_root)
+
+    def test_no_changes_if_nothing_changed(self, minecraft_root, chest):
+        previous = index.update_index(minecraft_root)
+        assert not index.compare(previous, index.update_index(minecraft_root))
+
+    def test_detects_added_and_removed_files(self, minecraft_root, chest):
+        previous = index.update_index(minecraft_root)
+        (chest / "global" / "config" / "sodium.json").unlink()
+        (chest / "1.19" / "mods").mkdir()
+        (chest / "1.19" / "mods" / "lithium.jar").write_bytes(b"faster")
+
+        changes = index.compare(previous, index.update_index(minecraft_root))
+
+        assert changes == (
+            ["1.19/mods/lithium.jar"],
+            [],
+            ["global/config/sodium.json"],
+        )
+
+    def test_detects_files_edited_in_place(self, minecraft_root, chest):
+        options = chest / "global" / "options.txt"
+        previous = index.update_index(minecraft_root)
+        folder_mtime = options.parent.stat().st_mtime_ns
+        with options.open("a") as f:
+            f.write("gamma:5.0\n")
+        os.utime(options.parent, ns=(folder_mtime, folder_mtime))
+
+        changes = index.compare(previous, index.update_index(minecraft_root))
+
+        assert changes.modified == ["global/options.txt"]
+
+    def test_unchanged_folders_are_not_rescanned(
+        self, minecraft_root, chest, monkeypatch
+    ):
+        index.update_index(minecraft_root)
+        index.update_index(minecraft_root)  # first save modifies the root folder
+        (chest / "global" / "config" / "sodium.json").write_text("faster\n")
+
+        scanned: list[str] = []
+        scandir = os.scandir
+
+        def spy_scandir(path):
+            scanned.append(os.fspath(path))
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", spy_scandir)
+        index.update_index(minecraft_root)
+
+        assert scanned == []
+
+    def test_hashes_are_only_computed_for_changed_files(
+        self, minecraft_root, chest, monkeypatch
+    ):
+        index.update_index(minecraft_root, checksum=True)
+        (chest / "global" / "options.txt").write_text("fov:110\n")
+
+        hashed: list[str] = []
+        file_digest = index._file_digest
+
+        def spy_digest(path):
+            hashed.append(path.name)
+            return file_digest(path)
+
+        monkeypatch.setattr(index, "_file_digest", spy_digest)
+        new_index = index.update_index(minecraft_root, checksum=True)
+
+        assert hashed == ["options.txt"]
+        assert new_index.files["global/config/sodium.json"].digest is not None
+
+    def test_identical_contents_are_not_modifications_when_hashed(
+        self, minecraft_root, chest
+    ):
+        previous = index.update_index(minecraft_root, checksum=True)
+        (chest / "global" / "options.txt").write_text("fov:70\n")
+
+        changes = index.compare(
+            previous, index.update_index(minecraft_root, checksum=True)
+        )
+
+        assert not changes
+
+    def test_corrupt_index_triggers_full_rescan(self, minecraft_root, chest, caplog):
+        fs.index_file(minecraft_root).write_text("{not json")
+
+        files = index.update_index(minecraft_root).files
+
+        assert "global/options.txt" in files
+        assert any(
+            record.levelno == logging.WARNING and "corrupt" in record.msg
+            for record in caplog.records
+        )
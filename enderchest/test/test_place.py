@@ -7,42 +7,12 @@ import pytest
 
 from enderchest import ShulkerBox
 from enderchest import filesystem as fs
-from enderchest import place
+from enderchest import gather, place
 from enderchest import shulker_box as sb
 
 from . import utils
 
 
-class TestRglob:
-    def test_max_depth_of_one_is_equivalent_to_a_plain_glob(self, minecraft_root):
-        glob = sorted(minecraft_root.iterdir())
-        assert len(glob) > 0  # meta-test
-
-        assert glob == sorted(place._rglob(minecraft_root, 1))
-
-    def test_max_depth_of_zero_finds_all_files_in_path(self, minecraft_root):
-        search_dir = minecraft_root / "workspace"  # choose someplace with no links
-        rglob = sorted([path for path in search_dir.rglob("*") if not path.is_dir()])
-        assert len(rglob) > 0  # meta-test
-
-        assert rglob == sorted(place._rglob(minecraft_root / "workspace", 0))
-
-    def test_max_depth_of_two_returns_subdirectories(self, minecraft_root):
-        instances_folder = minecraft_root / "instances"
-        expected: list[Path] = [instances_folder / "instgroups.json"]
-        for instance in utils.TESTING_INSTANCES[1:]:
-            expected.extend(
-                (
-                    instances_folder / instance.root.parent.name / ".minecraft",
-                    instances_folder / instance.root.parent.name / "instance.cfg",
-                    instances_folder / instance.root.parent.name / "mmc-pack.json",
-                )
-            )
-        expected.sort()
-
-        assert expected == sorted(place._rglob(instances_folder, 2))
-
-
 class TestSingleShulkerPlace:
     """Test the simplest case of linking--where the files in the shulker should
     go into every instance"""
@@ -185,15 +155,43 @@ class TestSingleShulkerPlace:
             minecraft_root / "worlds" / "testbench" / "level.dat"
         )
 
-    @utils.parametrize_over_instances("axolotl", "bee")
+    @utils.parametrize_over_instances("official", "axolotl")
     def test_place_cleans_up_broken_symlinks_by_default(self, minecraft_root, instance):
+        broken_resource = (
+            minecraft_root / "EnderChest" / "global" / "config" / "sodium.properties"
+        )
+        broken_resource.symlink_to(minecraft_root / "i-do-not-exist.txt")
+        instance_folder = utils.resolve(instance.root, minecraft_root)
+        broken_link = instance_folder / "config" / "sodium.properties"
+
+        place.place_ender_chest(minecraft_root)
+
+        assert broken_link not in broken_link.parent.iterdir()
+        broken_resource.unlink()
+
+    @utils.parametrize_over_instances("axolotl", "bee")
+    def test_place_only_cleans_up_where_it_links_by_default(
+        self, minecraft_root, instance
+    ):
         instance_folder = utils.resolve(instance.root, minecraft_root)
         broken_link = instance_folder / "shaderpacks" / "Seuss CitH.zip.txt"
         broken_link.symlink_to(minecraft_root / "i-do-not-exist.txt")
-        assert broken_link in broken_link.parent.iterdir()
 
         place.place_ender_chest(minecraft_root)
 
+        assert broken_link in broken_link.parent.iterdir()
+
+    @utils.parametrize_over_instances("axolotl", "bee")
+    def test_place_deep_clean_cleans_up_all_broken_symlinks(
+        self, minecraft_root, instance
+    ):
+        instance_folder = utils.resolve(instance.root, minecraft_root)
+        broken_link = instance_folder / "shaderpacks" / "Seuss CitH.zip.txt"
+        broken_link.symlink_to(minecraft_root / "i-do-not-exist.txt")
+        assert broken_link in broken_link.parent.iterdir()
+
+        place.place_ender_chest(minecraft_root, deep_clean=True)
+
         assert broken_link not in broken_link.parent.iterdir()
 
     @utils.parametrize_over_instances("axolotl")
@@ -280,6 +278,179 @@ class TestSingleShulkerPlace:
         )
 
 
+class TestIncrementalPlace:
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self, minecraft_root, home):
+        """Setup / teardown for this test class"""
+        chest_folder = minecraft_root / "EnderChest"
+        utils.pre_populate_enderchest(chest_folder, utils.GLOBAL_SHULKER)
+        (chest_folder / "global" / "logs").mkdir()
+        yield
+
+    def test_place_writes_a_link_manifest(self, minecraft_root):
+        place.place_ender_chest(minecraft_root)
+
+        manifest = place._load_link_manifest(minecraft_root)
+        linked = {
+            (record["instance"], record["resource"]) for record in manifest["links"]
+        }
+        assert {("axolotl", "logs"), ("axolotl", "usercache.json")} <= linked
+
+    @utils.parametrize_over_instances("official", "axolotl")
+    def test_replace_leaves_unchanged_links_alone(self, minecraft_root, instance):
+        place.place_ender_chest(minecraft_root)
+        instance_folder = utils.resolve(instance.root, minecraft_root)
+        link_ids = {
+            path: os.lstat(path).st_ino
+            for path in (instance_folder / "logs", instance_folder / "usercache.json")
+        }
+
+        place.place_ender_chest(minecraft_root)
+
+        assert {path: os.lstat(path).st_ino for path in link_ids} == link_ids
+
+    def test_replace_picks_up_new_resources(self, minecraft_root):
+        place.place_ender_chest(minecraft_root)
+        (minecraft_root / "EnderChest" / "global" / "servers.dat").write_text(
+            "localhost:25565"
+        )
+
+        place.place_ender_chest(minecraft_root)
+
+        assert (
+            minecraft_root / "instances" / "axolotl" / ".minecraft" / "servers.dat"
+        ).read_text() == "localhost:25565"
+
+    @utils.parametrize_over_instances("official", "axolotl")
+    def test_replace_removes_stale_links(self, minecraft_root, instance):
+        place.place_ender_chest(minecraft_root)
+        instance_folder = utils.resolve(instance.root, minecraft_root)
+        assert (instance_folder / "usercache.json").is_symlink()  # meta-test
+
+        with fs.shulker_box_config(minecraft_root, "global").open("a") as config:
+            config.write("\n[hosts]\nnot-this-chest\n")
+
+        place.place_ender_chest(minecraft_root)
+
+        assert not (instance_folder / "usercache.json").exists()
+        assert not (instance_folder / "usercache.json").is_symlink()
+
+    def test_replace_does_not_remove_links_it_did_not_create(self, minecraft_root):
+        place.place_ender_chest(minecraft_root)
+        instance_folder = minecraft_root / "instances" / "axolotl" / ".minecraft"
+        user_link = instance_folder / "usercache.json"
+        user_link.unlink()
+        user_link.symlink_to(minecraft_root / "README.md")
+
+        with fs.shulker_box_config(minecraft_root, "global").open("a") as config:
+            config.write("\n[hosts]\nnot-this-chest\n")
+
+        place.place_ender_chest(minecraft_root)
+
+        assert user_link.resolve() == minecraft_root / "README.md"
+
+    @pytest.mark.parametrize("jobs", (None, 4))
+    def test_aborted_place_keeps_the_previous_manifest(self, minecraft_root, jobs):
+        place.place_ender_chest(minecraft_root)
+        manifest = fs.link_manifest(minecraft_root).read_text()
+
+        (minecraft_root / "EnderChest" / "global" / "servers.dat").write_text(
+            "localhost:25565"
+        )
+        instance_folder = minecraft_root / "instances" / "axolotl" / ".minecraft"
+        (instance_folder / "logs").unlink()
+        (instance_folder / "logs").mkdir()
+        (instance_folder / "logs" / "latest.log").write_text("I'm in the way")
+
+        place.place_ender_chest(minecraft_root, error_handling="abort", jobs=jobs)
+
+        assert fs.link_manifest(minecraft_root).read_text() == manifest
+
+        (instance_folder / "logs" / "latest.log").unlink()
+        (instance_folder / "logs").rmdir()
+        place.place_ender_chest(minecraft_root, jobs=jobs)
+
+        assert (
+            minecraft_root / "instances" / "bee" / ".minecraft" / "servers.dat"
+        ).is_symlink()
+
+    def _stop_linking_to_this_chest(self, minecraft_root):
+        with fs.shulker_box_config(minecraft_root, "global").open("a") as config:
+            config.write("\n[hosts]\nnot-this-chest\n")
+
+    def test_no_cleanup_keeps_stale_links(self, minecraft_root):
+        place.place_ender_chest(minecraft_root)
+        user_cache = (
+            minecraft_root / "instances" / "axolotl" / ".minecraft" / "usercache.json"
+        )
+        self._stop_linking_to_this_chest(minecraft_root)
+
+        place.place_ender_chest(minecraft_root, cleanup=False)
+        assert user_cache.is_symlink()
+
+        place.place_ender_chest(minecraft_root)
+        assert not user_cache.is_symlink()
+
+    @pytest.mark.parametrize("error_handling", ("ignore", "abort"))
+    def test_stale_link_removal_errors_are_handled(
+        self, minecraft_root, monkeypatch, caplog, error_handling
+    ):
+        place.place_ender_chest(minecraft_root)
+        user_cache = (
+            minecraft_root / "instances" / "axolotl" / ".minecraft" / "usercache.json"
+        )
+        self._stop_linking_to_this_chest(minecraft_root)
+
+        unlink = Path.unlink
+
+        def protected_unlink(path, *args, **kwargs):
+            if path == user_cache:
+                raise PermissionError("Not allowed")
+            return unlink(path, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "unlink", protected_unlink)
+        place.place_ender_chest(minecraft_root, error_handling=error_handling)
+
+        assert "Could not remove stale link" in caplog.text
+        assert ("Aborting" in caplog.text) is (error_handling == "abort")
+
+        monkeypatch.setattr(Path, "unlink", unlink)
+        place.place_ender_chest(minecraft_root)
+        assert not user_cache.is_symlink()
+
+    def test_interrupted_manifest_write_keeps_the_previous_manifest(
+        self, minecraft_root, monkeypatch
+    ):
+        place.place_ender_chest(minecraft_root)
+        manifest = fs.link_manifest(minecraft_root).read_text()
+
+        def interrupted_write(path, contents, *args, **kwargs):
+            with path.open("w") as f:
+                f.write(contents[:10])
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(Path, "write_text", interrupted_write)
+        with pytest.raises(KeyboardInterrupt):
+            place._write_link_manifest(
+                minecraft_root, {"links": [], "shulker_boxes": {}}
+            )
+        monkeypatch.undo()
+
+        assert fs.link_manifest(minecraft_root).read_text() == manifest
+        assert [
+            path.name for path in (minecraft_root / "EnderChest").glob(".*.tmp")
+        ] == []
+
+    def test_corrupt_manifest_just_means_relinking_everything(self, minecraft_root):
+        fs.link_manifest(minecraft_root).write_text("}{")
+
+        place.place_ender_chest(minecraft_root)
+
+        assert (
+            minecraft_root / "instances" / "axolotl" / ".minecraft" / "usercache.json"
+        ).is_symlink()
+
+
 class TestMatchesVersion:
     @pytest.mark.parametrize(
         "version", ("1.19.4", "1.20-pre6", "23w13a_or_b", "not even trying")
@@ -308,6 +479,44 @@ class TestMatchesVersion:
         assert sb._matches_version("1.20*", version)
 
 
+class TestVersionCaching:
+    @pytest.fixture(autouse=True)
+    def fresh_caches(self):
+        sb.clear_version_caches()
+        yield
+        sb.clear_version_caches()
+
+    def test_repeat_version_checks_hit_the_cache(self):
+        for _ in range(3):
+            assert sb._matches_version(">=1.19.0,<1.20", "1.19.4")
+
+        assert sb.version_cache_info()["_matches_version"] == {
+            "hits": 2,
+            "misses": 1,
+            "maxsize": 4096,
+            "currsize": 1,
+        }
+
+    def test_version_caches_are_shared_with_the_symlink_allowlist_check(self):
+        for _ in range(2):
+            assert gather._needs_symlink_allowlist("1.20.1")
+
+        assert sb.version_cache_info()["_matches_version"]["hits"] > 0
+        assert sb.version_cache_info()["_parse_version"]["hits"] > 0
+
+    def test_compiled_matching_reuses_parsed_versions(self):
+        shulker = ShulkerBox(
+            0, "wild", Path("ignoreme"), (("minecraft", (">=1.19.0,<1.20",)),), ()
+        )
+        for _ in range(2):
+            for instance in utils.TESTING_INSTANCES:
+                shulker.matches(instance)
+
+        assert sb.version_cache_info()["_parse_semver"]["hits"] >= len(
+            utils.TESTING_INSTANCES
+        )
+
+
 class TestShulkerInstanceMatching:
     @staticmethod
     def matchall(shulker: ShulkerBox) -> list[str]:
@@ -470,6 +679,26 @@ class TestShulkerInstanceMatching:
         )
         assert self.matchall(multi_condition_shulker) == ["Chest Boat"]
 
+    def test_condition_with_no_values_matches_nothing(self):
+        picky_shulker = ShulkerBox(0, "picky", Path("ignoreme"), (("tags", ()),), ())
+
+        assert self.matchall(picky_shulker) == []
+
+    def test_unknown_condition_raises(self):
+        confused_shulker = ShulkerBox(
+            0, "confused", Path("ignoreme"), (("biomes", ("plains",)),), ()
+        )
+
+        with pytest.raises(NotImplementedError):
+            confused_shulker.matches(utils.TESTING_INSTANCES[0])
+
+    def test_shulker_boxes_with_the_same_criteria_share_a_match_plan(self):
+        criteria = (("minecraft", (">=1.19.0,<1.20", "23w*")), ("tags", ("modded",)))
+        one = ShulkerBox(0, "one", Path("ignoreme"), criteria, ())
+        two = ShulkerBox(3, "two", Path("ignoreme"), criteria, ("saves",))
+
+        assert one.compile() is two.compile()
+
 
 class TestMultiShulkerPlacing:
     @pytest.fixture(autouse=True)
@@ -547,11 +776,14 @@ class TestMultiShulkerPlacing:
             f'{os.path.join(instance, ".minecraft")} to {shulker_box}' in link_log
         ) is should_match
 
+    @pytest.mark.parametrize("jobs", (None, 4), ids=("serial", "parallel"))
     @pytest.mark.parametrize("error_handling", ("ignore", "skip"))
     def test_multi_shulker_place_overwrites_overlapping_symlinks(
-        self, minecraft_root, error_handling
+        self, minecraft_root, error_handling, jobs
     ):
-        place.place_ender_chest(minecraft_root, error_handling=error_handling)
+        place.place_ender_chest(
+            minecraft_root, error_handling=error_handling, jobs=jobs
+        )
 
         assert (
             minecraft_root
@@ -610,8 +842,11 @@ class TestMultiShulkerPlacing:
             home / ".minecraft" / "data" / "achievements.txt"
         ).read_text() == "Spelled acheivements correctly!"
 
-    def test_skip_instance(self, home, minecraft_root):
-        place.place_ender_chest(minecraft_root, error_handling="skip-instance")
+    @pytest.mark.parametrize("jobs", (None, 4), ids=("serial", "parallel"))
+    def test_skip_instance(self, home, minecraft_root, jobs):
+        place.place_ender_chest(
+            minecraft_root, error_handling="skip-instance", jobs=jobs
+        )
 
         assert (
             minecraft_root / "instances" / "chest-boat" / ".minecraft" / "options.txt"
@@ -629,6 +864,13 @@ class TestMultiShulkerPlacing:
             minecraft_root / "instances" / "chest-boat" / ".minecraft" / "options.txt"
         ).exists()
 
+    def test_parallel_place_stops_linking_after_abort(self, home, minecraft_root):
+        place.place_ender_chest(minecraft_root, error_handling="abort", jobs=4)
+
+        # the official instance fails on the 1.19 box, so it should never
+        # make it to the vanilla box
+        assert not (home / ".minecraft" / "data" / "achievements.txt").exists()
+
     def test_skip_shulker_box_that_doesnt_match_host(self, home, minecraft_root):
         with fs.shulker_box_config(minecraft_root, "1.19").open("a") as config_file:
             config_file.write(
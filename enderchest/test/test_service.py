@@ -0,0 +1,240 @@
+"""Tests of the long-running EnderChest service"""
+import logging
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+from enderchest import cli
+from enderchest import filesystem as fs
+from enderchest import place, service
+
+from . import utils
+
+pytestmark = pytest.mark.skipif(
+    sys.platform.startswith("win"), reason="Unix sockets aren't supported"
+)
+
+
+@pytest.fixture(autouse=True)
+def runtime_folder(monkeypatch):
+    # tmp_path is often too long to hold a socket
+    runtime_folder = tempfile.mkdtemp(prefix="ec-test-")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", runtime_folder)
+    yield runtime_folder
+    shutil.rmtree(runtime_folder, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def populate_chest(minecraft_root, home):
+    utils.pre_populate_enderchest(minecraft_root / "EnderChest", utils.GLOBAL_SHULKER)
+
+
+@pytest.fixture
+def running_service(minecraft_root):
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=service.serve, args=(minecraft_root,), kwargs={"stop": stop}
+    )
+    thread.start()
+    socket_path = fs.service_socket(minecraft_root)
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        time.sleep(0.05)
+    yield thread
+    stop.set()
+    thread.join(5)
+
+
+class TestService:
+    def test_requests_fall_through_when_the_service_is_not_running(
+        self, minecraft_root
+    ):
+        assert service.request(minecraft_root, "ping") is False
+
+    def test_service_responds_to_pings(self, minecraft_root, running_service):
+        assert service.request(minecraft_root, "ping") is True
+
+    def test_service_can_place(self, minecraft_root, running_service):
+        assert service.request(minecraft_root, "place", {"relative": True})
+
+        assert (
+            minecraft_root / "instances" / "axolotl" / ".minecraft" / "usercache.json"
+        ).is_symlink()
+
+    def test_service_logs_get_relayed(self, minecraft_root, running_service, caplog):
+        service.request(minecraft_root, "inventory")
+
+        assert "global" in "\n".join(
+            record.msg
+            for record in caplog.records
+            if record.name == "enderchest.gather" and record.levelname == "INFO"
+        )
+
+    @pytest.mark.parametrize("log_level", (logging.INFO, logging.WARNING))
+    def test_service_only_sends_back_logs_at_the_requested_level(
+        self, minecraft_root, log_level
+    ):
+        response = service._handle_request(
+            minecraft_root,
+            {"action": "place", "options": {"errors": "abort"}, "log_level": log_level},
+            threading.Event(),
+        )
+
+        assert response["ok"]
+        assert (
+            min((level for _, level, _ in response["log"]), default=logging.CRITICAL)
+            >= log_level
+        )
+        assert bool(response["log"]) is (log_level == logging.INFO)
+
+    @pytest.mark.parametrize(
+        "options, prompts",
+        (
+            ({}, True),
+            ({"errors": "prompt"}, True),
+            ({"errors": "skip"}, False),
+            ({"errors": "prompt", "stop_at_first_failure": True}, False),
+            ({"errors": "prompt", "ignore_errors": True}, False),
+        ),
+    )
+    def test_will_prompt(self, options, prompts):
+        assert service.will_prompt("place", options) is prompts
+
+    def test_service_does_not_prompt(
+        self, minecraft_root, running_service, monkeypatch, caplog
+    ):
+        def no_prompting(*args, **kwargs):
+            raise AssertionError("The service should never prompt")
+
+        monkeypatch.setattr(place, "prompt", no_prompting)
+        blocker = minecraft_root / "instances" / "axolotl" / ".minecraft" / "logs"
+        (blocker / "latest.log").write_text("I'm in the way")
+
+        service.request(minecraft_root, "place", {"errors": "prompt"})
+
+        assert "Aborting" in "\n".join(record.msg for record in caplog.records)
+        assert any(
+            record.levelno == logging.WARNING and "can't prompt" in record.msg
+            for record in caplog.records
+        )
+
+    def test_unsupported_actions_are_reported(
+        self, minecraft_root, running_service, caplog
+    ):
+        assert service.request(minecraft_root, "craft")
+        assert "Unsupported action" in caplog.records[-1].msg
+
+    def test_service_can_be_stopped(self, minecraft_root, running_service):
+        service.stop_service(minecraft_root)
+        running_service.join(5)
+
+        assert not running_service.is_alive()
+        assert not fs.service_socket(minecraft_root).exists()
+
+    def test_only_one_service_can_run_at_once(
+        self, minecraft_root, running_service, caplog
+    ):
+        service.serve(minecraft_root)
+
+        assert "already running" in caplog.records[-1].msg
+        assert service.request(minecraft_root, "ping")
+
+    @pytest.mark.parametrize("tampering", ("open folder", "symlink"))
+    def test_service_refuses_a_socket_folder_others_could_access(
+        self, minecraft_root, tmp_path, caplog, tampering
+    ):
+        socket_folder = fs.service_socket(minecraft_root).parent
+        if tampering == "open folder":
+            socket_folder.mkdir()
+            os.chmod(socket_folder, 0o777)
+        else:
+            (tmp_path / "elsewhere").mkdir(mode=0o700)
+            socket_folder.symlink_to(tmp_path / "elsewhere")
+
+        service.serve(minecraft_root)
+
+        assert "Refusing to serve" in caplog.records[-1].msg
+        assert list(socket_folder.iterdir()) == []
+
+    def test_requests_are_not_sent_to_a_socket_others_could_access(
+        self, minecraft_root, running_service
+    ):
+        os.chmod(fs.service_socket(minecraft_root).parent, 0o755)
+
+        assert service.request(minecraft_root, "ping") is False
+
+    def test_requests_fall_through_if_the_service_hangs(
+        self, minecraft_root, monkeypatch, caplog
+    ):
+        socket_path = fs.service_socket(minecraft_root)
+        socket_path.parent.mkdir(mode=0o700)
+        monkeypatch.setattr(service, "RESPONSE_TIMEOUT", 0.1)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hung_service:
+            hung_service.bind(str(socket_path))
+            hung_service.listen()
+
+            assert service.request(minecraft_root, "ping") is False
+        assert "did not respond" in caplog.records[-1].msg
+
+    def test_idle_service_shuts_itself_down(self, minecraft_root):
+        thread = threading.Thread(
+            target=service.serve, args=(minecraft_root,), kwargs={"idle_timeout": 0.1}
+        )
+        thread.start()
+        thread.join(5)
+
+        assert not thread.is_alive()
+
+
+class TestCLIUsesService:
+    @pytest.fixture(autouse=True)
+    def cleanup_handlers(self):
+        logger = logging.getLogger("enderchest")
+        handlers, level = list(logger.handlers), logger.level
+        yield
+        logger.handlers, logger.level = handlers, level
+
+    @pytest.fixture
+    def local_place_log(self, monkeypatch):
+        place_log: list = []
+        monkeypatch.setattr(
+            place,
+            "place_ender_chest",
+            lambda *args, **kwargs: place_log.append(threading.current_thread()),
+        )
+        yield place_log
+
+    @pytest.mark.parametrize("flags", (("--errors", "skip"), ("-x",)))
+    def test_cli_forwards_to_the_service(
+        self, minecraft_root, running_service, local_place_log, monkeypatch, flags
+    ):
+        monkeypatch.setattr(
+            sys, "argv", ["enderchest", "place", str(minecraft_root), *flags]
+        )
+        cli.main()
+
+        assert local_place_log == [running_service]
+
+    def test_cli_places_locally_if_it_might_need_to_prompt(
+        self, minecraft_root, running_service, local_place_log, monkeypatch
+    ):
+        monkeypatch.setattr(sys, "argv", ["enderchest", "place", str(minecraft_root)])
+        cli.main()
+
+        assert local_place_log == [threading.current_thread()]
+
+    def test_cli_works_without_the_service(
+        self, minecraft_root, local_place_log, monkeypatch
+    ):
+        monkeypatch.setattr(sys, "argv", ["enderchest", "place", str(minecraft_root)])
+        cli.main()
+
+        assert local_place_log == [threading.current_thread()]
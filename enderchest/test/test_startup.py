@@ -0,0 +1,98 @@
+"""Tests that the CLI stays quick to start up"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from enderchest import cli
+
+HEAVY_MODULES = (
+    "enderchest._version",
+    "enderchest.enderchest",
+    "enderchest.gather",
+    "enderchest.index",
+    "enderchest.place",
+    "enderchest.remote",
+    "enderchest.service",
+    "enderchest.status",
+    "enderchest.store",
+    "enderchest.sync",
+    "enderchest.sync.rsync",
+    "importlib.metadata",
+    "semantic_version",
+    "tempfile",
+)
+"""Modules that should only be imported once an action actually needs them
+(checking for these, rather than timing the import, keeps the tests from
+being at the mercy of how busy the machine running them is)"""
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        # (other tests may have changed the working directory)
+        cwd=Path(cli.__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _imported_modules(code: str) -> set[str]:
+    """Run some code in a fresh interpreter and report what got imported"""
+    return set(
+        json.loads(
+            _run(
+                code + "\nimport json, sys\nprint(json.dumps(list(sys.modules)))"
+            ).stdout.splitlines()[-1]
+        )
+    )
+
+
+class TestImports:
+    def test_importing_the_cli_does_not_import_any_heavy_modules(self):
+        imported = _imported_modules("import enderchest.cli")
+        assert sorted(imported.intersection(HEAVY_MODULES)) == []
+
+    def test_importing_the_package_does_not_import_any_heavy_modules(self):
+        imported = _imported_modules("import enderchest")
+        assert sorted(imported.intersection(HEAVY_MODULES)) == []
+
+    def test_package_attributes_still_resolve(self):
+        imported = _imported_modules(
+            "import enderchest\nassert enderchest.EnderChest.__name__ == 'EnderChest'"
+        )
+        assert "enderchest.enderchest" in imported
+
+    def test_parsing_only_imports_the_modules_the_action_needs(self):
+        imported = _imported_modules(
+            "from enderchest import cli\n"
+            "cli.parse_args(['enderchest', 'place', '--keep-broken'])"
+        )
+        assert sorted(imported.intersection(HEAVY_MODULES) - {"enderchest.place"}) == []
+
+
+class TestLazyParsers:
+    @pytest.fixture
+    def built_parsers(self, monkeypatch):
+        built: list[str] = []
+        build_parser = cli._action_parser
+
+        def record_and_build(verb):
+            built.append(verb)
+            return build_parser(verb)
+
+        monkeypatch.setattr(cli, "_action_parser", record_and_build)
+        yield built
+
+    def test_only_the_requested_parser_is_built(self, built_parsers):
+        cli.parse_args(["enderchest", "gather", "instance", ".", "~/.minecraft"])
+        assert built_parsers == ["gather minecraft"]
+
+    def test_version_does_not_build_any_action_parsers(self, built_parsers, capsys):
+        with pytest.raises(SystemExit):
+            cli.parse_args(["enderchest", "--version"])
+        assert built_parsers == []
+        assert capsys.readouterr().out.startswith("enderchest v")
@@ -0,0 +1,100 @@
+"""Tests of the content-addressed store"""
+import os
+
+import pytest
+
+from enderchest import filesystem as fs
+from enderchest import store
+
+from . import utils
+
+
+@pytest.fixture
+def duplicated_mod(minecraft_root):
+    utils.pre_populate_enderchest(
+        minecraft_root / "EnderChest", *utils.TESTING_SHULKER_CONFIGS[:2]
+    )
+    chest = fs.ender_chest_folder(minecraft_root)
+    mods = []
+    for box in ("global", "1.19"):
+        (chest / box / "mods").mkdir(parents=True, exist_ok=True)
+        mod = chest / box / "mods" / "sodium.jar"
+        mod.write_bytes(b"very fast" * 1000)
+        mods.append(mod)
+    (chest / "global" / "mods" / "notes.txt").write_text("not a mod")
+    yield mods
+
+
+class TestDeduplicate:
+    def test_duplicates_are_hard_linked(self, minecraft_root, duplicated_mod):
+        report = store.deduplicate(minecraft_root)
+
+        first, second = duplicated_mod
+        assert first.samefile(second)
+        assert first.read_bytes() == b"very fast" * 1000
+        assert (report.files, report.bytes_saved) == (2, 9000)
+
+    def test_objects_are_content_addressed(self, minecraft_root, duplicated_mod):
+        store.deduplicate(minecraft_root)
+
+        content_hash = store.hash_file(duplicated_mod[0])
+        stored = store.object_path(fs.store_folder(minecraft_root), content_hash)
+        assert stored.samefile(duplicated_mod[0])
+
+    def test_only_matching_files_are_deduplicated(self, minecraft_root, duplicated_mod):
+        store.deduplicate(minecraft_root)
+        notes = duplicated_mod[0].parent / "notes.txt"
+        assert notes.stat().st_nlink == 1
+
+    def test_symlink_mode_uses_relative_links(self, minecraft_root, duplicated_mod):
+        store.deduplicate(minecraft_root, symlink=True)
+
+        for mod in duplicated_mod:
+            assert mod.is_symlink()
+            assert not os.path.isabs(os.readlink(mod))
+            assert mod.read_bytes() == b"very fast" * 1000
+
+    def test_symlink_mode_converts_hard_links(self, minecraft_root, duplicated_mod):
+        store.deduplicate(minecraft_root)
+        report = store.deduplicate(minecraft_root, symlink=True)
+
+        assert all(mod.is_symlink() for mod in duplicated_mod)
+        assert (report.files, report.bytes_saved) == (2, 0)
+
+    def test_deduplicating_twice_is_a_no_op(self, minecraft_root, duplicated_mod):
+        store.deduplicate(minecraft_root)
+        assert store.deduplicate(minecraft_root) == (0, 0, 0)
+
+    def test_dry_run_does_nothing(self, minecraft_root, duplicated_mod):
+        report = store.deduplicate(minecraft_root, dry_run=True)
+
+        assert report.bytes_saved == 9000
+        assert not duplicated_mod[0].samefile(duplicated_mod[1])
+        assert not fs.store_folder(minecraft_root).exists()
+
+    def test_store_is_not_a_shulker_box(self, minecraft_root, duplicated_mod):
+        store.deduplicate(minecraft_root)
+        assert fs.store_folder(minecraft_root) not in {
+            config.parent for config in fs.shulker_box_configs(minecraft_root)
+        }
+
+
+class TestPrune:
+    @pytest.mark.parametrize("symlink", (False, True), ids=("hardlink", "symlink"))
+    def test_unreferenced_objects_are_pruned(
+        self, minecraft_root, duplicated_mod, symlink
+    ):
+        store.deduplicate(minecraft_root, symlink=symlink)
+        for mod in duplicated_mod:
+            mod.unlink()
+
+        assert store.prune(minecraft_root) == 1
+        assert list(fs.store_folder(minecraft_root).iterdir()) == []
+
+    @pytest.mark.parametrize("symlink", (False, True), ids=("hardlink", "symlink"))
+    def test_referenced_objects_are_kept(self, minecraft_root, duplicated_mod, symlink):
+        store.deduplicate(minecraft_root, symlink=symlink)
+        duplicated_mod[0].unlink()
+
+        assert store.prune(minecraft_root) == 0
+        assert duplicated_mod[1].read_bytes() == b"very fast" * 1000
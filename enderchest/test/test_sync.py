@@ -1,6 +1,15 @@
 """Tests around file transfer functionality."""
+import datetime as dt
+import io
+import json
+import logging
 import os
 import shutil
+import subprocess
+import sys
+import threading
+import types
+from importlib.metadata import EntryPoint
 from pathlib import Path
 from urllib.parse import urlparse
 
@@ -8,8 +17,9 @@ import pytest
 
 from enderchest import craft
 from enderchest import filesystem as fs
-from enderchest import gather
+from enderchest import gather, index
 from enderchest import remote as r
+from enderchest import status, sync
 from enderchest.sync import file, path_from_uri
 
 from . import utils
@@ -21,9 +31,6 @@ class TestPathFromURI:
         assert path_from_uri(urlparse(original_path.as_uri())) == original_path
 
 
-@pytest.mark.xfail(
-    not shutil.which("rsync"), reason="rsync is not installed on this system"
-)  # TODO: remove xfail once this method has been moved to a different module
 class TestURIToSSH:
     @pytest.fixture(scope="class")
     def rsync_module(self):
@@ -55,6 +62,590 @@ class TestURIToSSH:
         assert address == "nugget@localhost:/home/nugget"
 
 
+class TestRsyncChangeList:
+    @pytest.fixture(scope="class")
+    @staticmethod
+    def rsync_module():
+        from enderchest.sync import rsync
+
+        yield rsync
+
+    def test_parse_itemized_changes(self, rsync_module):
+        transcript = "\n".join(
+            (
+                "sending incremental file list",
+                "*deleting   EnderChest/old/thing.txt",
+                "*deleting   EnderChest/old/",
+                ".d..t...... EnderChest/",
+                ">f+++++++++ EnderChest/global/options.txt",
+                "cd+++++++++ EnderChest/new folder/",
+                "cL+++++++++ EnderChest/global/mods -> ../mods",
+                r">f.st...... EnderChest/caf\#303\#251.txt",
+                "",
+                "sent 1,234 bytes  received 56 bytes  2,580.00 bytes/sec",
+                "total size is 9,999  speedup is 7.75 (DRY RUN)",
+            )
+        )
+        assert rsync_module.parse_itemized_changes(transcript) == [
+            "EnderChest/old/thing.txt",
+            "EnderChest/old",
+            "EnderChest",
+            "EnderChest/global/options.txt",
+            "EnderChest/new folder",
+            "EnderChest/global/mods",
+            "EnderChest/café.txt",
+        ]
+
+    def test_parse_hard_link(self, rsync_module):
+        change = rsync_module._parse_itemized_change(
+            "hf          EnderChest/box2/mods/sodium.jar"
+            " => EnderChest/_objects/ab/abcdef"
+        )
+        assert change == "EnderChest/box2/mods/sodium.jar"
+
+    @pytest.fixture
+    def fake_rsync(self, rsync_module, monkeypatch):
+        """Record the commands that would be run, replying with the given
+        dry-run transcript"""
+        commands: list[tuple[list[str], str | None]] = []
+        transcript: list[str] = []
+
+        class FakeRsync:
+            def __init__(self, args, **kwargs):
+                files_from = next(
+                    (
+                        Path(arg.partition("=")[-1]).read_text()
+                        for arg in args
+                        if arg.startswith("--files-from=")
+                    ),
+                    None,
+                )
+                commands.append((args, files_from))
+                output = "\n".join(transcript) if "--dry-run" in args else ""
+                self.stdout = io.BufferedReader(io.BytesIO(output.encode()))
+                self.returncode = 0
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def wait(self):
+                return self.returncode
+
+        monkeypatch.setattr(rsync_module, "RSYNC", "/usr/bin/rsync")
+        monkeypatch.setattr(rsync_module.subprocess, "Popen", FakeRsync)
+        monkeypatch.setattr(rsync_module, "_CHANGE_LISTS", {})
+        yield commands, transcript
+
+    def _sync_twice(
+        self, rsync_module, tmp_path, rsync_flags=None, reuse_dry_run=True, edit=None
+    ):
+        (tmp_path / "EnderChest").mkdir(exist_ok=True)
+        for dry_run in (True, False):
+            rsync_module.run_rsync(
+                tmp_path,
+                "EnderChest",
+                "steamdeck:/home/deck/minecraft",
+                False,
+                dry_run,
+                (),
+                rsync_flags=rsync_flags,
+                reuse_dry_run=reuse_dry_run,
+                local_path=tmp_path / "EnderChest",
+            )
+            if edit is not None and dry_run:
+                edit(tmp_path / "EnderChest")
+
+    def test_real_sync_replays_the_dry_run(self, rsync_module, fake_rsync, tmp_path):
+        commands, transcript = fake_rsync
+        transcript.append(">f+++++++++ EnderChest/box2/mods/sodium.jar")
+
+        self._sync_twice(rsync_module, tmp_path)
+
+        assert commands[-1][1] == "EnderChest/box2/mods/sodium.jar"
+
+    def test_dry_runs_are_not_reused_by_default(
+        self, rsync_module, fake_rsync, tmp_path
+    ):
+        commands, transcript = fake_rsync
+        transcript.append(">f+++++++++ EnderChest/box2/mods/sodium.jar")
+
+        self._sync_twice(rsync_module, tmp_path, reuse_dry_run=False)
+
+        args, files_from = commands[-1]
+        assert (files_from, args[-2]) == (None, "EnderChest")
+
+    @pytest.mark.parametrize(
+        "edit",
+        (
+            lambda chest: (chest / "options.txt").write_text("fov:90\n"),
+            lambda chest: (chest / "box2").mkdir(),
+        ),
+        ids=("new file", "new folder"),
+    )
+    def test_local_changes_after_the_dry_run_fall_back_to_a_full_sync(
+        self, rsync_module, fake_rsync, tmp_path, edit
+    ):
+        commands, transcript = fake_rsync
+        transcript.append(">f+++++++++ EnderChest/box2/mods/sodium.jar")
+
+        self._sync_twice(rsync_module, tmp_path, edit=edit)
+
+        args, files_from = commands[-1]
+        assert (files_from, args[-2]) == (None, "EnderChest")
+
+    def test_local_edits_after_the_dry_run_fall_back_to_a_full_sync(
+        self, rsync_module, fake_rsync, tmp_path
+    ):
+        commands, transcript = fake_rsync
+        transcript.append(">f.st...... EnderChest/options.txt")
+        (tmp_path / "EnderChest").mkdir()
+        options = tmp_path / "EnderChest" / "options.txt"
+        options.write_text("fov:70\n")
+
+        def edit(chest):
+            options.write_text("fov:90\n")
+            os.utime(options, ns=(0, 0))
+
+        self._sync_twice(rsync_module, tmp_path, edit=edit)
+
+        args, files_from = commands[-1]
+        assert (files_from, args[-2]) == (None, "EnderChest")
+
+    @staticmethod
+    def _contents(folder):
+        return {
+            path.relative_to(folder).as_posix(): (
+                path.read_text() if path.is_file() else None
+            )
+            for path in folder.rglob("*")
+        }
+
+    @pytest.mark.skipif(
+        not shutil.which("rsync"), reason="rsync is not installed on this system"
+    )
+    @pytest.mark.parametrize("edit_after_dry_run", (False, True))
+    def test_replaying_a_real_dry_run(
+        self, rsync_module, monkeypatch, tmp_path, edit_after_dry_run
+    ):
+        monkeypatch.setattr(rsync_module, "_CHANGE_LISTS", {})
+        chest = tmp_path / "local" / "EnderChest"
+        (chest / "global" / "old").mkdir(parents=True)
+        (chest / "global" / "options.txt").write_text("fov:70\n")
+        (chest / "global" / "old" / "stale.txt").write_text("baa\n")
+        (tmp_path / "remote").mkdir()
+
+        def sync(dry_run):
+            rsync_module.run_rsync(
+                chest.parent,
+                "EnderChest",
+                (tmp_path / "remote").as_posix(),
+                True,
+                dry_run,
+                (),
+                reuse_dry_run=True,
+                local_path=chest,
+            )
+
+        sync(False)
+
+        shutil.rmtree(chest / "global" / "old")
+        (chest / "global" / "options.txt").write_text("fov:90\n")
+        (chest / "box" / "config").mkdir(parents=True)
+        (chest / "box" / "config" / "sodium.json").write_text("fast\n")
+
+        sync(True)
+        if edit_after_dry_run:
+            (chest / "box" / "config" / "iris.json").write_text("pretty\n")
+        sync(False)
+
+        assert self._contents(tmp_path / "remote" / "EnderChest") == self._contents(
+            chest
+        )
+
+    def test_hard_links_fall_back_to_a_full_sync(
+        self, rsync_module, fake_rsync, tmp_path
+    ):
+        commands, transcript = fake_rsync
+        transcript.extend(
+            (
+                ">f+++++++++ EnderChest/box1/mods/sodium.jar",
+                "hf          EnderChest/box2/mods/sodium.jar"
+                " => EnderChest/box1/mods/sodium.jar",
+            )
+        )
+
+        self._sync_twice(rsync_module, tmp_path, rsync_flags="avzsH")
+
+        args, files_from = commands[-1]
+        assert (files_from, args[-2]) == (None, "EnderChest")
+
+    def test_hard_links_can_be_replayed_when_not_preserved(
+        self, rsync_module, fake_rsync, tmp_path
+    ):
+        commands, transcript = fake_rsync
+        transcript.append(
+            "hf          EnderChest/box2/mods/sodium.jar"
+            " => EnderChest/box1/mods/sodium.jar",
+        )
+
+        self._sync_twice(rsync_module, tmp_path)
+
+        assert commands[-1][1] == "EnderChest/box2/mods/sodium.jar"
+
+    @pytest.mark.parametrize("has_store", (False, True), ids=("plain", "deduped"))
+    @pytest.mark.parametrize("operation", ("pull", "push"))
+    def test_hard_links_are_only_preserved_for_deduplicated_chests(
+        self, rsync_module, fake_rsync, tmp_path, operation, has_store
+    ):
+        commands, _ = fake_rsync
+        (tmp_path / "local" / "EnderChest").mkdir(parents=True)
+        (tmp_path / "remote" / "EnderChest").mkdir(parents=True)
+        if has_store:
+            (tmp_path / "local" / "EnderChest" / fs.STORE_FOLDER_NAME).mkdir()
+
+        if operation == "pull":
+            rsync_module.pull(
+                urlparse((tmp_path / "remote" / "EnderChest").as_uri())._replace(
+                    netloc=sync.get_default_netloc()
+                ),
+                tmp_path / "local",
+                (),
+                False,
+            )
+        else:
+            rsync_module.push(
+                tmp_path / "local" / "EnderChest",
+                urlparse((tmp_path / "remote").as_uri())._replace(
+                    netloc=sync.get_default_netloc()
+                ),
+                (),
+                False,
+            )
+
+        assert commands[-1][0][1] == ("-avzsH" if has_store else "-avzs")
+
+    @pytest.mark.parametrize(
+        "source, parent",
+        (
+            ("EnderChest", "."),
+            ("/home/openbagtwo/minecraft/EnderChest", "/home/openbagtwo/minecraft"),
+            ("steamdeck:/home/deck/EnderChest", "steamdeck:/home/deck"),
+            ("steamdeck:/EnderChest", "steamdeck:/"),
+            (
+                "rsync://couchgaming/minecraft/EnderChest/",
+                "rsync://couchgaming/minecraft",
+            ),
+        ),
+    )
+    def test_parent_of_source(self, rsync_module, source, parent):
+        assert rsync_module._parent_of(source) == parent
+
+
+class TestSSHMultiplexing:
+    @pytest.fixture
+    def ssh_module(self, monkeypatch):
+        from enderchest.sync import ssh
+
+        monkeypatch.setattr(ssh, "SSH", "/usr/bin/ssh")
+        monkeypatch.setattr(ssh, "_DESTINATIONS", {})
+        monkeypatch.setattr(ssh, "_CONTROL_FOLDER", None)
+        yield ssh
+        ssh.close_connections()
+
+    @pytest.fixture
+    def closed(self, ssh_module, monkeypatch):
+        commands: list[list[str]] = []
+        monkeypatch.setattr(
+            ssh_module.subprocess,
+            "run",
+            lambda command, **kwargs: commands.append(command),
+        )
+        yield commands
+
+    def test_connections_to_the_same_host_share_a_socket(self, ssh_module):
+        first = ssh_module.ssh_command(urlparse("rsync://deck@steamdeck/home/deck"))
+        second = ssh_module.ssh_command(urlparse("rsync://deck@steamdeck/minecraft"))
+
+        assert first == second
+        assert "ControlMaster=auto" in first
+        assert any(option.startswith("ControlPath=") for option in first)
+
+    def test_no_multiplexing_without_ssh(self, ssh_module, monkeypatch):
+        monkeypatch.setattr(ssh_module, "SSH", None)
+        assert ssh_module.ssh_command(urlparse("rsync://steamdeck:2222/deck")) == [
+            "ssh",
+            "-p",
+            "2222",
+        ]
+
+    def test_rsync_uses_the_shared_connection(self, ssh_module):
+        from enderchest.sync import rsync
+
+        shell = rsync._remote_shell(urlparse("rsync://deck@steamdeck/home/deck"), ())
+
+        assert shell[0] == "-e"
+        assert "ControlPath=" in shell[1]
+
+    def test_user_specified_remote_shell_wins(self, ssh_module):
+        from enderchest.sync import rsync
+
+        assert (
+            rsync._remote_shell(
+                urlparse("rsync://deck@steamdeck/home/deck"), ("--rsh=ssh -i key",)
+            )
+            == ()
+        )
+
+    def test_close_connections_closes_every_master(self, ssh_module, closed):
+        ssh_module.ssh_command(urlparse("rsync://deck@steamdeck/home/deck"))
+        ssh_module.ssh_command(urlparse("rsync://couchgaming/minecraft"))
+        control_folder = ssh_module._CONTROL_FOLDER
+
+        ssh_module.close_connections()
+
+        assert sorted(command[-1] for command in closed) == [
+            "couchgaming",
+            "deck@steamdeck",
+        ]
+        assert all(command[-3:-1] == ["-O", "exit"] for command in closed)
+        assert not control_folder.exists()
+
+    def test_each_port_gets_its_connection_closed(self, ssh_module, closed):
+        ssh_module.ssh_command(urlparse("rsync://deck@steamdeck/home/deck"))
+        ssh_module.ssh_command(urlparse("rsync://deck@steamdeck:2222/home/deck"))
+
+        ssh_module.close_connections()
+
+        assert sorted("2222" in command for command in closed) == [False, True]
+
+
+class TestReadRemoteFile:
+    @pytest.fixture
+    def remote_config(self, tmp_path):
+        config = tmp_path / "EnderChest" / "enderchest.cfg"
+        config.parent.mkdir()
+        config.write_text("[properties]\nname = faraway\n")
+        yield config
+
+    def test_local_files_are_read_without_a_temp_folder(
+        self, remote_config, monkeypatch
+    ):
+        def no_temp_files(*args, **kwargs):
+            raise AssertionError("File should have been read directly")
+
+        monkeypatch.setattr(sync, "remote_file", no_temp_files)
+        assert (
+            sync.read_remote_file(urlparse(remote_config.as_uri()))
+            == "[properties]\nname = faraway\n"
+        )
+
+    def test_fall_back_to_pulling_the_file(self, remote_config, monkeypatch):
+        from enderchest.sync import file as file_protocol
+
+        monkeypatch.delattr(file_protocol, "read_file")
+        assert sync.read_remote_file(urlparse(remote_config.as_uri())).startswith(
+            "[properties]"
+        )
+
+    @pytest.fixture
+    def ssh_calls(self, monkeypatch):
+        from enderchest.sync import rsync, ssh
+
+        calls: list[tuple[list[str], dict]] = []
+
+        def fake_run(command, **kwargs):
+            calls.append((command, kwargs))
+            return subprocess.CompletedProcess(command, 0, b"[properties]\n", b"")
+
+        monkeypatch.setattr(ssh, "SSH", "/usr/bin/ssh")
+        monkeypatch.setattr(ssh, "multiplexing_available", lambda: False)
+        monkeypatch.setattr(rsync.subprocess, "run", fake_run)
+        yield calls
+
+    def test_rsync_streams_remote_files_over_ssh(self, ssh_calls):
+        from enderchest.sync import rsync
+
+        contents = rsync.read_file(
+            urlparse("rsync://deck@steamdeck/home/deck/my%20minecraft/enderchest.cfg"),
+            timeout=5,
+        )
+
+        (command, kwargs) = ssh_calls[0]
+        assert (contents, command[-4:], kwargs["timeout"]) == (
+            b"[properties]\n",
+            [
+                "deck@steamdeck",
+                "cat",
+                "--",
+                "'/home/deck/my minecraft/enderchest.cfg'",
+            ],
+            5,
+        )
+
+    def test_rsync_cannot_stream_from_a_daemon(self, ssh_calls):
+        from enderchest.sync import rsync
+
+        with pytest.raises(NotImplementedError):
+            rsync.read_file(
+                urlparse("rsync://steamdeck/minecraft/enderchest.cfg"),
+                use_daemon=True,
+            )
+
+    def test_remote_index_is_read_in_memory(self, remote_config, monkeypatch):
+        index.update_index(remote_config.parent.parent)
+
+        def no_temp_files(*args, **kwargs):
+            raise AssertionError("Index should have been read directly")
+
+        monkeypatch.setattr(sync, "remote_file", no_temp_files)
+        fetched = status.fetch_remote_index(
+            urlparse(remote_config.parent.parent.as_uri()), "faraway"
+        )
+
+        assert fetched is not None
+        assert fetched[0] <= dt.datetime.now()
+
+    def test_parse_remote_config_in_memory(self, remote_config):
+        chest = r.load_remote_ender_chest(remote_config.parent.parent.as_uri())
+        assert (chest.name, chest.root) == ("faraway", remote_config.parent)
+
+    def test_load_many_remote_configs_at_once(self, remote_config, caplog):
+        chests = r.load_remote_ender_chests(
+            [remote_config.parent.parent.as_uri(), "file:///not/a/real/place"],
+            timeout=5,
+        )
+
+        assert [chest.name if chest else None for chest in chests] == [
+            "faraway",
+            None,
+        ]
+        assert "Could not load the EnderChest config" in caplog.text
+
+
+class TestRsyncOutputStreaming:
+    @pytest.fixture(scope="class")
+    @staticmethod
+    def rsync_module():
+        from enderchest.sync import rsync
+
+        yield rsync
+
+    def test_read_lines_splits_on_carriage_returns(self, rsync_module):
+        stream = io.BufferedReader(
+            io.BytesIO(b"sending incremental file list\nmods/sodium.jar\n  0   0%\r")
+        )
+        assert list(rsync_module._read_lines(stream)) == [
+            "sending incremental file list",
+            "mods/sodium.jar",
+            "  0   0%",
+        ]
+
+    def test_read_lines_bounds_line_length(self, rsync_module, monkeypatch):
+        monkeypatch.setattr(rsync_module, "MAX_LINE_LENGTH", 10)
+        stream = io.BufferedReader(io.BytesIO(b"x" * 100 + b"\ndone\n"))
+        lines = list(rsync_module._read_lines(stream))
+        assert "".join(lines[:-1]) == "x" * 100
+        assert lines[-1] == "done"
+
+    def test_progress_tracking(self, rsync_module):
+        tracker = rsync_module._ProgressTracker()
+        events = [
+            tracker.update(line)
+            for line in (
+                "mods/sodium.jar",
+                "        32,768  50%    1.00MB/s    0:00:00",
+                "        65,536 100%    2.00MB/s    0:00:00 (xfr#1, to-chk=1/3)",
+                "mods/lithium.jar",
+                "         1,024 100%  512.00kB/s    0:00:00 (xfer#2, to-check=0/3)",
+            )
+        ]
+        assert events == [
+            None,
+            rsync_module.ProgressEvent(0, 32768, 1 << 20, "mods/sodium.jar"),
+            rsync_module.ProgressEvent(1, 65536, 2 << 20, "mods/sodium.jar"),
+            None,
+            rsync_module.ProgressEvent(2, 66560, 512 << 10, "mods/lithium.jar"),
+        ]
+
+
+class TestProtocolRegistry:
+    @pytest.fixture
+    def carrier_pigeon(self, monkeypatch):
+        protocol = types.ModuleType("carrier_pigeon")
+        protocol.CAPABILITIES = sync.Capabilities(  # type: ignore[attr-defined]
+            options=frozenset(("bird_seed",))
+        )
+        monkeypatch.setitem(sys.modules, "carrier_pigeon", protocol)
+        monkeypatch.setattr(
+            sync,
+            "entry_points",
+            lambda group: [
+                EntryPoint(name="ipoac", value="carrier_pigeon", group=group)
+            ],
+        )
+        sync._protocol_registry.cache_clear()
+        sync._import_protocol.cache_clear()
+        yield protocol
+        sync._protocol_registry.cache_clear()
+        sync._import_protocol.cache_clear()
+
+    def test_builtin_protocols_are_registered(self):
+        assert sync.registered_protocols()[:2] == ["rsync", "file"]
+
+    def test_unknown_protocol_is_not_implemented(self):
+        with pytest.raises(NotImplementedError, match="not currently implemented"):
+            sync.load_protocol("prayer")
+
+    def test_protocols_can_be_provided_by_plugins(self, carrier_pigeon):
+        assert (
+            sync.registered_protocols()[-1],
+            sync.load_protocol("IPoAC"),
+            sync.protocol_capabilities("ipoac").options,
+        ) == ("ipoac", carrier_pigeon, {"bird_seed"})
+
+    def test_unavailable_protocol(self, carrier_pigeon):
+        carrier_pigeon.is_available = lambda: False  # type: ignore[attr-defined]
+        with pytest.raises(NotImplementedError, match="not available"):
+            sync.load_protocol("ipoac")
+
+    def test_unsupported_options_ignores_unset_options(self):
+        assert sync.unsupported_options(
+            "file", {"workers": 4, "timeout": 15, "delete": None}
+        ) == ["timeout"]
+
+    def test_ignored_options_are_reported(self, tmp_path, caplog):
+        (tmp_path / "source").mkdir()
+        (tmp_path / "destination").mkdir()
+        sync.push(
+            tmp_path / "source",
+            urlparse((tmp_path / "destination").as_uri()),
+            timeout=15,
+            workers=None,
+        )
+
+        warnings = [
+            record.msg for record in caplog.records if record.levelname == "WARNING"
+        ]
+        assert len(warnings) == 1
+        assert "timeout" in warnings[0] and "workers" not in warnings[0]
+
+    @pytest.mark.parametrize("host", ("localhost", "faraway"))
+    def test_resolve_falls_back_to_file_for_local_remotes(self, monkeypatch, host):
+        from enderchest.sync import rsync
+
+        monkeypatch.setattr(rsync, "RSYNC", None)
+
+        uri = urlparse(f"rsync://{host}/home/openbagtwo/minecraft")
+        if host == "localhost":
+            assert sync.resolve_protocol(uri) == uri._replace(scheme="file")
+        else:
+            with pytest.raises(NotImplementedError, match="not available"):
+                sync.resolve_protocol(uri)
+
+
 class TestFileIgnorePatternBuilder:
     def test_simple_match(self):
         assert file.ignore_patterns("hello")(
@@ -325,6 +916,139 @@ class TestFileSync:
             / "diamond.png"
         ).read_text() == "lab-grown!"
 
+    def test_close_reports_changes_since_the_last_sync(
+        self, minecraft_root, remote, caplog
+    ):
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        r.sync_with_remotes(minecraft_root, "push")
+        (minecraft_root / "EnderChest" / "global" / "options.txt").write_text("hi")
+        caplog.clear()
+
+        r.sync_with_remotes(minecraft_root, "push", dry_run=True)
+
+        assert "1 added, 0 modified, 0 removed" in caplog.text
+
+    @pytest.mark.parametrize("concurrency", (None, 2), ids=("serial", "concurrent"))
+    def test_close_only_indexes_the_chest_once(
+        self, minecraft_root, remote, monkeypatch, concurrency
+    ):
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        r.sync_with_remotes(minecraft_root, "push", sync_confirm_wait=False)
+        (minecraft_root / "EnderChest" / "global" / "options.txt").write_text("hi")
+
+        scans: list[bool] = []
+        update_index = index.update_index
+
+        def record_and_update(*args, **kwargs):
+            scans.append(kwargs.get("save", True))
+            return update_index(*args, **kwargs)
+
+        monkeypatch.setattr(index, "update_index", record_and_update)
+        r.sync_with_remotes(
+            minecraft_root, "push", sync_confirm_wait=False, concurrency=concurrency
+        )
+
+        assert len(scans) == 1
+        assert index.load_index(minecraft_root).files.keys() >= {"global/options.txt"}
+
+    def test_status_before_syncing(self, minecraft_root, remote):
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        assert [
+            remote_status.state for remote_status in status.get_status(minecraft_root)
+        ] == ["never synced"]
+
+    def test_status_after_close(self, minecraft_root, remote):
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        r.sync_with_remotes(minecraft_root, "push")
+
+        (remote_status,) = status.get_status(minecraft_root)
+        assert (remote_status.state, remote_status.local_changes) == (
+            "up to date",
+            ([], [], []),
+        )
+
+    def test_status_picks_up_local_changes(self, minecraft_root, remote):
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        r.sync_with_remotes(minecraft_root, "push")
+        (minecraft_root / "EnderChest" / "global" / "options.txt").write_text("hi")
+
+        (remote_status,) = status.get_status(minecraft_root, offline=True)
+        assert (remote_status.state, remote_status.local_changes.added) == (
+            "ahead",
+            ["global/options.txt"],
+        )
+
+    @pytest.mark.parametrize("local_change", (False, True), ids=("behind", "diverged"))
+    def test_status_picks_up_remote_changes(self, minecraft_root, remote, local_change):
+        another_root = path_from_uri(remote)
+        index.update_index(another_root)
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        r.sync_with_remotes(minecraft_root, "pull")
+        assert status.get_status(minecraft_root)[0].state == "up to date"
+
+        (another_root / "EnderChest" / "1.19" / "options.txt").write_text("fov:90")
+        index.update_index(another_root)
+        if local_change:
+            (minecraft_root / "EnderChest" / "vanilla" / "options.txt").write_text("hi")
+
+        (remote_status,) = status.get_status(minecraft_root)
+        assert (remote_status.state, remote_status.remote_changes.added) == (
+            "diverged" if local_change else "behind",
+            ["1.19/options.txt"],
+        )
+
+    @staticmethod
+    def _skew_clock(another_root, skew):
+        """Make it look like the remote's index was saved by a machine whose
+        clock is off by the given amount"""
+        index_file = fs.index_file(another_root)
+        saved = json.loads(index_file.read_text())
+        saved["updated"] = (dt.datetime.now() + skew).isoformat(sep=" ")
+        index_file.write_text(json.dumps(saved))
+
+    def test_status_with_a_remote_that_has_not_reindexed_ignores_its_clock(
+        self, minecraft_root, remote
+    ):
+        another_root = path_from_uri(remote)
+        index.update_index(another_root)
+        self._skew_clock(another_root, dt.timedelta(days=1))
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        (minecraft_root / "EnderChest" / "global" / "options.txt").write_text("hi")
+        r.sync_with_remotes(minecraft_root, "push", sync_confirm_wait=False)
+
+        (remote_status,) = status.get_status(minecraft_root)
+        assert (remote_status.state, remote_status.remote_changes) == (
+            "up to date",
+            None,
+        )
+
+    def test_status_with_a_remote_that_has_reindexed_ignores_its_clock(
+        self, minecraft_root, remote
+    ):
+        another_root = path_from_uri(remote)
+        index.update_index(another_root)
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        r.sync_with_remotes(minecraft_root, "pull", sync_confirm_wait=False)
+
+        (another_root / "EnderChest" / "1.19" / "options.txt").write_text("fov:90")
+        index.update_index(another_root)
+        self._skew_clock(another_root, -dt.timedelta(days=1))
+
+        (remote_status,) = status.get_status(minecraft_root)
+        assert (remote_status.state, remote_status.remote_changes.added) == (
+            "behind",
+            ["1.19/options.txt"],
+        )
+
+    def test_offline_status_does_not_check_remotes(self, minecraft_root, remote):
+        another_root = path_from_uri(remote)
+        index.update_index(another_root)
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        r.sync_with_remotes(minecraft_root, "pull")
+
+        (remote_status,) = status.get_status(minecraft_root, offline=True)
+        assert remote_status.remote_changes is None
+
     def test_close_deletes_remote_copies_when_locals_are_deleted(
         self, minecraft_root, remote
     ):
@@ -355,9 +1079,351 @@ class TestFileSync:
         assert len(warnings) == 1
         assert "Could not sync changes with prayer://unreachable" in warnings[0]
 
+    @pytest.fixture
+    def stale_remote(self, remote, tmp_path):
+        stale_root = tmp_path / "stale"
+        shutil.copytree(
+            path_from_uri(remote) / "EnderChest",
+            stale_root / "EnderChest",
+            symlinks=True,
+        )
+        config = stale_root / "EnderChest" / "enderchest.cfg"
+        config.write_text(
+            "\n".join(
+                "last_modified = 2000-01-01 00:00:00"
+                if line.startswith("last_modified")
+                else line
+                for line in config.read_text().splitlines()
+            )
+        )
+        (stale_root / "EnderChest" / "vanilla" / "conflict" / "diamond.png").write_text(
+            "cubic zirconia"
+        )
+        yield urlparse(stale_root.as_uri())._replace(scheme=self.protocol)
+
+    def test_fastest_open_pulls_from_the_freshest_remote(
+        self, minecraft_root, remote, stale_remote
+    ):
+        gather.update_ender_chest(
+            minecraft_root,
+            remotes=(
+                "prayer://unreachable",
+                (stale_remote, "stale"),
+                remote,
+            ),
+        )
+        r.sync_with_remotes(minecraft_root, "pull", fastest_remote=True)
+        assert (
+            minecraft_root / "EnderChest" / "vanilla" / "conflict" / "diamond.png"
+        ).read_text() == "lab-grown!"
+
+    def test_ranking_puts_unreachable_remotes_last(self, remote, stale_remote):
+        unreachable = urlparse("prayer://unreachable")
+        assert [
+            probe.alias
+            for probe in r.rank_remotes(
+                [
+                    (unreachable, "unreachable"),
+                    (stale_remote, "stale"),
+                    (remote, "fresh"),
+                ]
+            )
+        ] == ["fresh", "stale", "unreachable"]
+
+    def test_probe_results_are_cached(self, remote):
+        r.probe_remote(remote, "fresh")
+        fs.ender_chest_config(path_from_uri(remote)).unlink()
+
+        assert r.probe_remote(remote, "fresh").latency is not None
+        assert r.probe_remote(remote, "fresh", ttl=0).latency is None
+
+    def test_unsupported_options_are_flagged_up_front(
+        self, minecraft_root, remote, caplog
+    ):
+        gather.update_ender_chest(minecraft_root, remotes=(remote,))
+        r.sync_with_remotes(minecraft_root, "push", bird_seed="millet")
+        warnings = [
+            record.msg for record in caplog.records if record.levelname == "WARNING"
+        ]
+        assert len(warnings) == 1
+        assert "will be ignored" in warnings[0] and "bird_seed" in warnings[0]
+
+    def test_concurrent_close_pushes_to_every_remote(
+        self, minecraft_root, remote, tmp_path, caplog
+    ):
+        backup = tmp_path / "backup"
+        backup.mkdir()
+        backup_uri = urlparse(backup.as_uri())._replace(scheme=self.protocol)
+        gather.update_ender_chest(
+            minecraft_root,
+            remotes=(
+                remote,
+                (backup_uri, "backup"),
+                "prayer://unreachable",
+            ),
+        )
+        r.sync_with_remotes(minecraft_root, "push", concurrency=3)
+
+        for destination in (path_from_uri(remote), backup):
+            assert (
+                destination / "EnderChest" / "vanilla" / "conflict" / "diamond.png"
+            ).read_text() == "sparkle"
+
+        warnings = [
+            record.msg for record in caplog.records if record.levelname == "WARNING"
+        ]
+        assert len(warnings) == 1
+        assert "Could not sync changes with prayer://unreachable" in warnings[0]
+
+        summary = [
+            record.msg for record in caplog.records if "Push summary" in record.msg
+        ]
+        assert len(summary) == 1
+        assert "(backup): synced" in summary[0]
+
+    def test_concurrent_close_only_waits_once(
+        self, minecraft_root, remote, tmp_path, monkeypatch
+    ):
+        waits: list[int] = []
+        monkeypatch.setattr(r, "sleep", waits.append)
+
+        backup = tmp_path / "backup"
+        backup.mkdir()
+        gather.update_ender_chest(
+            minecraft_root,
+            remotes=(
+                remote,
+                (urlparse(backup.as_uri())._replace(scheme=self.protocol), "backup"),
+            ),
+        )
+        r.sync_with_remotes(minecraft_root, "push", sync_confirm_wait=3, concurrency=2)
+
+        assert waits == [3]
+        assert (
+            backup / "EnderChest" / "vanilla" / "conflict" / "diamond.png"
+        ).read_text() == "sparkle"
+
+    def test_concurrent_dry_runs_are_reported_one_remote_at_a_time(
+        self, minecraft_root, remote, tmp_path, caplog
+    ):
+        backup = tmp_path / "backup"
+        backup.mkdir()
+        gather.update_ender_chest(
+            minecraft_root,
+            remotes=(
+                remote,
+                (urlparse(backup.as_uri())._replace(scheme=self.protocol), "backup"),
+            ),
+        )
+        caplog.set_level(logging.DEBUG)
+        r.sync_with_remotes(minecraft_root, "push", dry_run=True, concurrency=2)
+
+        worker_records = [
+            record
+            for record in caplog.records
+            if record.name == "enderchest.sync"
+            and record.thread != threading.main_thread().ident
+        ]
+        starts = [
+            record
+            for record in worker_records
+            if record.msg.startswith("Attempting to push")
+        ]
+        assert len(starts) == 2
+        current = None
+        for record in worker_records:
+            if record in starts:
+                current = record.thread
+            assert record.thread == current
 
-@pytest.mark.xfail(
+
+class TestLogBuffer:
+    def test_messages_from_other_threads_are_held_back(self, caplog):
+        log_buffer = r._LogBuffer()
+        held: list[logging.LogRecord] = []
+
+        def log_from_a_thread():
+            with log_buffer.capture() as records:
+                r.SYNC_LOGGER.warning("Held back")
+            held.extend(records)
+
+        r.SYNC_LOGGER.addFilter(log_buffer)
+        try:
+            thread = threading.Thread(target=log_from_a_thread)
+            thread.start()
+            thread.join()
+            r.SYNC_LOGGER.warning("Not held back")
+        finally:
+            r.SYNC_LOGGER.removeFilter(log_buffer)
+
+        assert [record.msg for record in caplog.records] == ["Not held back"]
+        assert [record.msg for record in held] == ["Held back"]
+
+
+@pytest.mark.skipif(
     not shutil.which("rsync"), reason="rsync is not installed on this system"
 )
 class TestRsyncSync(TestFileSync):
     protocol = "rsync"
+
+
+class TestFileDeltaCopy:
+    @pytest.fixture
+    def source(self, tmp_path):
+        source = tmp_path / "source" / "EnderChest"
+        (source / "global" / "config").mkdir(parents=True)
+        (source / "global" / "config" / "sodium.json").write_text("fast\n")
+        (source / "global" / "options.txt").write_text("fov:70\n")
+        (source / "global" / "mods").symlink_to(
+            source / "global" / "config", target_is_directory=True
+        )
+        (source / "enderchest.cfg").write_text("[properties]\n")
+        (tmp_path / "destination").mkdir()
+        file.copy(
+            source, tmp_path / "destination", ("EnderChest/enderchest.cfg",), False
+        )
+        yield source
+
+    @pytest.fixture
+    def destination(self, tmp_path, source):
+        yield tmp_path / "destination" / "EnderChest"
+
+    def test_initial_copy_preserves_modification_times(self, source, destination):
+        assert [
+            path.stat().st_mtime_ns
+            for path in (
+                destination / "global" / "config" / "sodium.json",
+                destination / "global" / "options.txt",
+            )
+        ] == [
+            path.stat().st_mtime_ns
+            for path in (
+                source / "global" / "config" / "sodium.json",
+                source / "global" / "options.txt",
+            )
+        ]
+
+    def test_unchanged_files_are_not_recopied(self, source, destination):
+        copied = destination / "global" / "options.txt"
+        original_inode = copied.stat().st_ino
+        file.copy(source, destination.parent, (), False)
+        assert copied.stat().st_ino == original_inode
+
+    def test_changed_files_are_recopied(self, source, destination):
+        (source / "global" / "options.txt").write_text("fov:110\n")
+        file.copy(source, destination.parent, (), False)
+        assert (destination / "global" / "options.txt").read_text() == "fov:110\n"
+
+    @pytest.mark.parametrize("checksum", (False, True), ids=("mtime", "checksum"))
+    def test_checksum_catches_changes_that_keep_size_and_mtime(
+        self, source, destination, checksum
+    ):
+        copied = destination / "global" / "options.txt"
+        original_stat = copied.stat()
+        copied.write_text("fov:90\n")
+        os.utime(copied, ns=(original_stat.st_atime_ns, original_stat.st_mtime_ns))
+
+        file.copy(source, destination.parent, (), False, checksum=checksum)
+        assert copied.read_text() == ("fov:70\n" if checksum else "fov:90\n")
+
+    def test_files_missing_from_the_source_are_deleted(self, source, destination):
+        (source / "global" / "options.txt").unlink()
+        file.copy(source, destination.parent, (), False)
+        assert not (destination / "global" / "options.txt").exists()
+        assert (destination / "global" / "config" / "sodium.json").exists()
+
+    def test_excluded_files_are_left_alone(self, source, destination):
+        (destination / "enderchest.cfg").write_text("[properties]\nname=mine\n")
+        file.copy(source, destination.parent, ("EnderChest/enderchest.cfg",), False)
+        assert (
+            destination / "enderchest.cfg"
+        ).read_text() == "[properties]\nname=mine\n"
+
+    def test_symlinks_are_copied_as_symlinks(self, source, destination):
+        assert os.readlink(destination / "global" / "mods") == os.readlink(
+            source / "global" / "mods"
+        )
+
+    def test_file_replaced_by_a_folder(self, source, destination):
+        (source / "global" / "options.txt").unlink()
+        (source / "global" / "options.txt").mkdir()
+        (source / "global" / "options.txt" / "surprise").write_text("!")
+        file.copy(source, destination.parent, (), False)
+        assert (destination / "global" / "options.txt" / "surprise").read_text() == "!"
+
+    def test_dry_run_does_nothing(self, source, destination):
+        (source / "global" / "options.txt").write_text("fov:110\n")
+        (source / "global" / "config" / "sodium.json").unlink()
+        (source / "global" / "saves").mkdir()
+        (source / "global" / "saves" / "level.dat").write_text("new world")
+
+        file.copy(source, destination.parent, (), True)
+
+        assert (destination / "global" / "options.txt").read_text() == "fov:70\n"
+        assert (destination / "global" / "config" / "sodium.json").exists()
+        assert not (destination / "global" / "saves").exists()
+
+    def test_parallel_copy_matches_serial_copy(self, source, destination):
+        for i in range(20):
+            (source / "global" / "config" / f"mod_{i}.toml").write_text(f"{i}\n")
+        (source / "global" / "config" / "nested").mkdir()
+        (source / "global" / "config" / "nested" / "deep.json").write_text("{}")
+
+        file.copy(source, destination.parent, (), False, workers=4)
+
+        assert sorted(
+            path.relative_to(destination) for path in destination.rglob("*")
+        ) == sorted(path.relative_to(source) for path in source.rglob("*"))
+        assert (destination / "global" / "config" / "mod_13.toml").read_text() == "13\n"
+
+    def test_parallel_copy_raises_copy_errors(self, source, destination, monkeypatch):
+        def broken_copy(source_path, destination_path, **kwargs):
+            raise PermissionError(f"Cannot write to {destination_path}")
+
+        monkeypatch.setattr(file, "_copy_file", broken_copy)
+        (source / "global" / "options.txt").write_text("fov:110\n")
+
+        with pytest.raises(PermissionError):
+            file.copy(source, destination.parent, (), False, workers=4)
+
+    def test_hardlink_patterns_link_instead_of_copying(self, source, destination):
+        (source / "global" / "config" / "sodium.json").write_text("faster\n")
+        (source / "global" / "options.txt").write_text("fov:110\n")
+
+        file.copy(source, destination.parent, (), False, hardlink=("*.json",))
+
+        assert (destination / "global" / "config" / "sodium.json").samefile(
+            source / "global" / "config" / "sodium.json"
+        )
+        assert not (destination / "global" / "options.txt").samefile(
+            source / "global" / "options.txt"
+        )
+
+    @pytest.mark.parametrize("workers", (None, 4), ids=("serial", "parallel"))
+    def test_hard_links_are_preserved(self, source, destination, workers):
+        (source / "global" / "mods.jar").write_text("shared\n")
+        os.link(source / "global" / "mods.jar", source / "global" / "config" / "a.jar")
+
+        file.copy(source, destination.parent, (), False, workers=workers)
+
+        assert (destination / "global" / "mods.jar").samefile(
+            destination / "global" / "config" / "a.jar"
+        )
+        assert not (destination / "global" / "mods.jar").samefile(
+            source / "global" / "mods.jar"
+        )
+
+    @pytest.mark.parametrize("clone_works", (True, False), ids=("clone", "fallback"))
+    def test_same_device_copy(self, source, destination, monkeypatch, clone_works):
+        if not clone_works:
+            monkeypatch.setattr(file, "_clone_file", lambda *args: False)
+        (source / "global" / "options.txt").write_text("fov:110\n")
+
+        file.copy(source, destination.parent, (), False)
+
+        copied = destination / "global" / "options.txt"
+        assert (copied.read_text(), copied.stat().st_mtime_ns) == (
+            "fov:110\n",
+            (source / "global" / "options.txt").stat().st_mtime_ns,
+        )
+        assert not copied.samefile(source / "global" / "options.txt")
@@ -0,0 +1,66 @@
+"""Tests of the shulker box walker"""
+from pathlib import Path
+
+from enderchest import walk
+
+from . import utils
+
+
+class TestWalk:
+    def test_max_depth_of_one_is_equivalent_to_a_plain_glob(self, minecraft_root):
+        glob = sorted(path.name for path in minecraft_root.iterdir())
+        assert len(glob) > 0  # meta-test
+
+        assert glob == sorted(
+            path.as_posix() for path in walk.walk(minecraft_root, 1).resources
+        )
+
+    def test_max_depth_of_zero_finds_all_files_in_path(self, minecraft_root):
+        search_dir = minecraft_root / "workspace"  # choose someplace with no links
+        rglob = sorted(
+            path.relative_to(search_dir)
+            for path in search_dir.rglob("*")
+            if not path.is_dir()
+        )
+        assert len(rglob) > 0  # meta-test
+
+        assert rglob == sorted(walk.walk(search_dir, 0).resources)
+
+    def test_max_depth_of_two_returns_subdirectories(self, minecraft_root):
+        expected: list[Path] = [Path("instgroups.json")]
+        for instance in utils.TESTING_INSTANCES[1:]:
+            expected.extend(
+                (
+                    Path(instance.root.parent.name) / ".minecraft",
+                    Path(instance.root.parent.name) / "instance.cfg",
+                    Path(instance.root.parent.name) / "mmc-pack.json",
+                )
+            )
+        expected.sort()
+
+        assert expected == sorted(walk.walk(minecraft_root / "instances", 2).resources)
+
+    def test_walk_records_every_folder_it_searches(self, minecraft_root):
+        instances_folder = minecraft_root / "instances"
+
+        folders = walk.walk(instances_folder, 2).folders
+
+        assert sorted(folders.keys()) == sorted(
+            (
+                Path(),
+                *(
+                    Path(instance.root.parent.name)
+                    for instance in utils.TESTING_INSTANCES[1:]
+                ),
+            )
+        )
+        assert folders[Path()] == instances_folder.stat().st_mtime_ns
+
+    def test_walk_does_not_follow_symlink_loops(self, minecraft_root, caplog):
+        search_dir = minecraft_root / "workspace"
+        (search_dir / "ouroboros").symlink_to(search_dir, target_is_directory=True)
+
+        resources = walk.walk(search_dir, 0).resources
+
+        assert Path("ouroboros") in resources
+        assert "ouroboros links back" in caplog.text
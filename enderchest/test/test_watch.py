@@ -0,0 +1,210 @@
+"""Tests of keeping links up to date while watching for changes"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from enderchest import filesystem as fs
+from enderchest import place, watch
+
+from . import utils
+
+
+class TestApplyChanges:
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self, minecraft_root, home, monkeypatch):
+        chest_folder = minecraft_root / "EnderChest"
+        utils.pre_populate_enderchest(chest_folder, *utils.TESTING_SHULKER_CONFIGS)
+        (chest_folder / "global" / "resourcepacks" / "stuff.zip").write_text("global")
+        place.place_ender_chest(minecraft_root, error_handling="ignore")
+
+        def no_full_place(*args, **kwargs):
+            raise AssertionError("watching should never re-run a full place")
+
+        monkeypatch.setattr(place, "place_ender_chest", no_full_place)
+        yield
+
+    @staticmethod
+    def instance_path(minecraft_root, instance, *parts):
+        return minecraft_root / "instances" / instance / ".minecraft" / Path(*parts)
+
+    def test_new_files_get_linked(self, minecraft_root):
+        new_mod = minecraft_root / "EnderChest" / "global" / "mods" / "lithium.jar"
+        new_mod.parent.mkdir(exist_ok=True)
+        new_mod.write_text("fast")
+
+        watch.apply_changes(minecraft_root, [new_mod])
+
+        assert (
+            self.instance_path(minecraft_root, "axolotl", "mods", "lithium.jar")
+        ).read_text() == "fast"
+
+    def test_new_links_are_recorded_in_the_manifest(self, minecraft_root):
+        new_mod = minecraft_root / "EnderChest" / "global" / "mods" / "lithium.jar"
+        new_mod.parent.mkdir(exist_ok=True)
+        new_mod.write_text("fast")
+
+        watch.apply_changes(minecraft_root, [new_mod])
+
+        assert ("axolotl", "mods/lithium.jar") in {
+            (record["instance"], record["resource"])
+            for record in place._load_link_manifest(minecraft_root)["links"]
+        }
+
+    def test_new_folders_get_their_contents_linked(self, minecraft_root):
+        new_folder = minecraft_root / "EnderChest" / "global" / "shaderpacks"
+        new_folder.mkdir()
+        (new_folder / "BSL.zip").write_text("shiny")
+
+        watch.apply_changes(minecraft_root, [new_folder])
+
+        linked = self.instance_path(minecraft_root, "axolotl", "shaderpacks", "BSL.zip")
+        assert linked.is_symlink() and linked.read_text() == "shiny"
+
+    def test_deleted_files_get_unlinked(self, minecraft_root):
+        resource = minecraft_root / "EnderChest" / "global" / "servers.dat"
+        resource.write_text("localhost:25565")
+        watch.apply_changes(minecraft_root, [resource])
+        linked = self.instance_path(minecraft_root, "axolotl", "servers.dat")
+        assert linked.is_symlink()  # meta-test
+
+        resource.unlink()
+        watch.apply_changes(minecraft_root, [resource])
+
+        assert not linked.is_symlink()
+
+    def test_higher_priority_boxes_win(self, minecraft_root):
+        optifine_pack = (
+            minecraft_root / "EnderChest" / "optifine" / "resourcepacks" / "stuff.zip"
+        )
+        optifine_pack.parent.mkdir(parents=True, exist_ok=True)
+        optifine_pack.write_text("optifine-optimized!")
+
+        watch.apply_changes(minecraft_root, [optifine_pack])
+
+        assert (
+            self.instance_path(minecraft_root, "bee", "resourcepacks", "stuff.zip")
+        ).read_text() == "optifine-optimized!"
+
+    def test_removing_an_override_falls_back_to_the_lower_priority_box(
+        self, minecraft_root
+    ):
+        optifine_pack = (
+            minecraft_root / "EnderChest" / "optifine" / "resourcepacks" / "stuff.zip"
+        )
+        optifine_pack.parent.mkdir(parents=True, exist_ok=True)
+        optifine_pack.write_text("optifine-optimized!")
+        watch.apply_changes(minecraft_root, [optifine_pack])
+
+        optifine_pack.unlink()
+        watch.apply_changes(minecraft_root, [optifine_pack])
+
+        assert (
+            self.instance_path(minecraft_root, "bee", "resourcepacks", "stuff.zip")
+        ).read_text() == "global"
+
+    def test_deleted_links_get_put_back(self, minecraft_root):
+        linked = self.instance_path(minecraft_root, "axolotl", "usercache.json")
+        linked.unlink()
+
+        watch.apply_changes(minecraft_root, [linked])
+
+        assert linked.is_symlink()
+
+    def test_changes_to_hidden_files_do_nothing(self, minecraft_root):
+        manifest = fs.link_manifest(minecraft_root)
+        before = manifest.read_text()
+        (minecraft_root / "EnderChest" / "global" / "servers.dat").write_text("hi")
+
+        watch.apply_changes(minecraft_root, [manifest])
+
+        assert manifest.read_text() == before
+        assert not self.instance_path(minecraft_root, "axolotl", "servers.dat").exists()
+
+    def test_existing_files_are_not_overwritten(self, minecraft_root, caplog):
+        instance_file = self.instance_path(minecraft_root, "axolotl", "servers.dat")
+        instance_file.write_text("mine")
+        resource = minecraft_root / "EnderChest" / "global" / "servers.dat"
+        resource.write_text("yours")
+
+        watch.apply_changes(minecraft_root, [resource])
+
+        assert instance_file.read_text() == "mine"
+        assert "Could not link" in "\n".join(
+            record.msg for record in caplog.records if record.levelname == "ERROR"
+        )
+
+
+class TestWatchers:
+    @pytest.fixture
+    def stop(self):
+        stop = threading.Event()
+        yield stop
+        stop.set()
+
+    @pytest.fixture(
+        params=(
+            "polling",
+            pytest.param(
+                "inotify",
+                marks=pytest.mark.skipif(
+                    not sys.platform.startswith("linux"), reason="inotify is Linux-only"
+                ),
+            ),
+        )
+    )
+    def watcher(self, request, stop):
+        if request.param == "polling":
+            watcher = watch._Poller(stop)
+        else:
+            watcher = watch._Inotify()
+        yield watcher
+        watcher.close()
+
+    def test_watcher_sees_new_files(self, tmp_path, watcher):
+        watcher.watch({tmp_path})
+        (tmp_path / "new.txt").write_text("hello")
+
+        assert tmp_path / "new.txt" in watcher.changes(1)
+
+    def test_watcher_sees_deleted_files(self, tmp_path, watcher):
+        (tmp_path / "old.txt").write_text("goodbye")
+        watcher.watch({tmp_path})
+        (tmp_path / "old.txt").unlink()
+
+        assert tmp_path / "old.txt" in watcher.changes(1)
+
+    def test_watcher_stops_watching_removed_folders(self, tmp_path, watcher):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        watcher.watch({tmp_path / "a", tmp_path / "b"})
+        watcher.watch({tmp_path / "b"})
+        (tmp_path / "a" / "new.txt").write_text("hello")
+
+        assert watcher.changes(0.1) == set()
+
+    def test_watching_places_new_resources(self, minecraft_root, home, stop):
+        utils.pre_populate_enderchest(
+            minecraft_root / "EnderChest", utils.GLOBAL_SHULKER
+        )
+        place.place_ender_chest(minecraft_root)
+        watcher = threading.Thread(
+            target=watch.watch,
+            args=(minecraft_root,),
+            kwargs={"debounce": 0.1, "poll_interval": 0.1, "stop": stop},
+        )
+        watcher.start()
+        time.sleep(0.5)
+
+        (minecraft_root / "EnderChest" / "global" / "servers.dat").write_text("hi")
+        linked = minecraft_root / "instances" / "axolotl" / ".minecraft" / "servers.dat"
+        for _ in range(50):
+            if linked.exists():
+                break
+            time.sleep(0.1)
+
+        stop.set()
+        watcher.join(5)
+        assert linked.read_text() == "hi"
@@ -0,0 +1,103 @@
+"""Fast traversal of shulker box contents"""
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+from .loggers import PLACE_LOGGER
+
+
+class Listing(NamedTuple):
+    """The contents of a folder, as found by `walk`
+
+    Parameters
+    ----------
+    resources : list of Path
+        The files (and directories and symlinks) found in the folder, relative
+        to the folder that was walked
+    folders : dict of Path to int
+        The modification time (in nanoseconds) of every folder that was
+        searched, keyed by its path relative to the folder that was walked
+    """
+
+    resources: list[Path]
+    folders: dict[Path, int]
+
+
+def walk(root: Path, max_depth: int) -> Listing:
+    """Find all files (and directories* and symlinks) in the path up to the
+    specified depth
+
+    Parameters
+    ----------
+    root : Path
+        The path to search
+    max_depth : int
+        The maximum number of levels to go
+
+    Returns
+    -------
+    Listing
+        The files (and directories and symlinks) in the path up to that depth,
+        along with the modification times of every folder that was searched
+
+    Notes
+    -----
+    - Unlike an actual rglob, this method does not return any directories that
+      are not at the maximum depth
+    - Setting max_depth to 0 (or below) will return all files in the root.
+      This method follows symlinks, but if it finds a link to a folder it's
+      already inside of, it will report the link as a resource rather than
+      following it around in circles.
+    """
+    root_stat = os.stat(root)
+    listing = Listing([], {Path(): root_stat.st_mtime_ns})
+    _walk(
+        os.fspath(root),
+        Path(),
+        max_depth,
+        {(root_stat.st_dev, root_stat.st_ino)},
+        listing,
+    )
+    return listing
+
+
+def _walk(
+    folder: str,
+    relative_folder: Path,
+    max_depth: int,
+    ancestors: set[tuple[int, int]],
+    listing: Listing,
+) -> None:
+    """Recursive helper for `walk`
+
+    Parameters
+    ----------
+    folder : str
+        The (full) path of the folder currently being searched
+    relative_folder : Path
+        The path of that folder relative to the root of the walk
+    max_depth : int
+        The number of levels left to go
+    ancestors : set of (int, int) tuples
+        The (device, inode) pairs of the folder and all of its parents, used
+        for detecting symlink loops
+    listing : Listing
+        The listing to populate
+    """
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            resource = relative_folder / entry.name
+            if max_depth == 1 or not entry.is_dir():
+                listing.resources.append(resource)
+                continue
+            entry_stat = entry.stat()
+            inode = (entry_stat.st_dev, entry_stat.st_ino)
+            if inode in ancestors:
+                PLACE_LOGGER.warning(
+                    f"{entry.path} links back to a folder that contains it."
+                    " It will not be searched."
+                )
+                listing.resources.append(resource)
+                continue
+            listing.folders[resource] = entry_stat.st_mtime_ns
+            _walk(entry.path, resource, max_depth - 1, ancestors | {inode}, listing)
@@ -0,0 +1,741 @@
+"""Keep the links from your instances to your EnderChest up to date as files
+get added to (or removed from) your shulker boxes"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from . import filesystem as fs
+from .gather import load_ender_chest, load_ender_chest_instances, load_shulker_boxes
+from .instance import InstanceSpec
+from .loggers import PLACE_LOGGER
+from .place import (
+    _link_target,
+    _load_link_manifest,
+    _points_to,
+    _write_link_manifest,
+    link_resource,
+)
+from .shulker_box import ShulkerBox
+from .walk import walk
+
+# inotify constants (from <sys/inotify.h>)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_MASK = (
+    _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def watch(
+    minecraft_root: Path,
+    relative: bool = True,
+    debounce: float = 0.5,
+    poll_interval: float = 2.0,
+    polling: bool = False,
+    stop: threading.Event | None = None,
+) -> None:
+    """Watch the EnderChest (and the instances linked to it) for changes,
+    placing and removing links as resources get added to and removed from
+    shulker boxes
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    relative : bool, optional
+        By default, links will use relative paths when possible. To use absolute
+        paths instead, pass in `relative=False`. This should match what you
+        use when running `place`.
+    debounce : float, optional
+        The number of seconds to wait for things to settle down after a change
+        before updating any links. Default is half a second.
+    poll_interval : float, optional
+        When polling, the number of seconds between checks for changes.
+        Default is 2 seconds.
+    polling : bool, optional
+        By default, inotify will be used to watch for changes when it's
+        available (that is, on Linux), falling back to polling otherwise.
+        Pass in `polling=True` to always poll (which is useful for network
+        drives, where inotify doesn't pick up changes made by other machines).
+    stop : Event, optional
+        Set this event (from another thread) to stop watching. If None is
+        provided, this method will keep watching until it's interrupted.
+
+    Notes
+    -----
+    - Only the links affected by each change are updated (see
+      `apply_changes`). This is not a substitute for running `place` after
+      changes to which instances are registered with your EnderChest.
+    - Linking errors are logged and then ignored.
+    """
+    try:
+        load_ender_chest(minecraft_root)
+    except (FileNotFoundError, ValueError) as bad_chest:
+        PLACE_LOGGER.error(
+            f"Could not load EnderChest from {minecraft_root}:\n  {bad_chest}"
+        )
+        return
+    stop = stop or threading.Event()
+
+    watcher: _Inotify | _Poller
+    if polling or not sys.platform.startswith("linux"):
+        watcher = _Poller(stop)
+    else:
+        try:
+            watcher = _Inotify()
+        except OSError as no_inotify:
+            PLACE_LOGGER.debug(
+                f"Could not initialize inotify:\n  {no_inotify}"
+                "\nFalling back to polling"
+            )
+            watcher = _Poller(stop)
+
+    PLACE_LOGGER.info(
+        f"Watching {fs.ender_chest_folder(minecraft_root)} for changes."
+        " Press Ctrl+C to stop."
+    )
+    try:
+        watcher.watch(_watched_folders(minecraft_root))
+        while not stop.is_set():
+            changed = watcher.changes(poll_interval)
+            if not changed:
+                continue
+            # wait for things to settle down
+            while more_changes := watcher.changes(debounce):
+                changed.update(more_changes)
+            PLACE_LOGGER.debug(f"Detected changes to {len(changed)} path(s)")
+            apply_changes(minecraft_root, changed, relative=relative)
+            try:
+                watcher.watch(_watched_folders(minecraft_root))
+            except (FileNotFoundError, ValueError) as bad_chest:
+                PLACE_LOGGER.warning(
+                    f"Could not update the list of folders to watch:\n  {bad_chest}"
+                )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    PLACE_LOGGER.info("Stopped watching")
+
+
+def apply_changes(
+    minecraft_root: Path, changed: Iterable[Path], relative: bool = True
+) -> None:
+    """Update just the links affected by changes to the specified paths
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    changed : list-like of Path
+        The files and folders that were created, modified, moved or deleted.
+        These can be inside of the EnderChest or inside of the instances
+        registered with it.
+    relative : bool, optional
+        By default, links will use relative paths when possible. To use absolute
+        paths instead, pass in `relative=False`.
+
+    Notes
+    -----
+    - For each affected resource, every instance ends up linked to the
+      highest-priority matching shulker box that contains that resource (or
+      has it as a link folder), exactly as it would be by `place`. If no
+      shulker box has the resource anymore, any link EnderChest had placed
+      for it is removed.
+    - A resource that lives inside of a link folder of any shulker box
+      matching an instance is left alone for that instance, as placing a link
+      there would mean writing into the shulker box.
+    - Changes to the hidden files in the EnderChest folder (like the link
+      manifest) are ignored, as are changes to the EnderChest's config file
+      (which will only be picked up by running `place`).
+    """
+    try:
+        host = load_ender_chest(minecraft_root).name
+    except (FileNotFoundError, ValueError) as bad_chest:
+        PLACE_LOGGER.error(
+            f"Could not load EnderChest from {minecraft_root}:\n  {bad_chest}"
+        )
+        return
+    chest_folder = Path(os.path.abspath(fs.ender_chest_folder(minecraft_root)))
+    instances = load_ender_chest_instances(minecraft_root, log_level=logging.DEBUG)
+    shulker_boxes = [
+        shulker_box
+        for shulker_box in load_shulker_boxes(minecraft_root, log_level=logging.DEBUG)
+        if shulker_box.matches_host(host)
+    ]
+    manifest = _load_link_manifest(minecraft_root)
+    records: dict[str, dict[str, str]] = {
+        record["path"]: record for record in manifest["links"]
+    }
+
+    resources: set[Path] = set()
+    for path in changed:
+        path = Path(os.path.abspath(path))
+        if path == chest_folder or chest_folder in path.parents:
+            resources.update(
+                _box_changes(
+                    path.relative_to(chest_folder), chest_folder, shulker_boxes, records
+                )
+            )
+            continue
+        for instance in instances:
+            instance_root = _instance_root(minecraft_root, instance)
+            if path == instance_root or instance_root in path.parents:
+                if path != instance_root:
+                    # it could have been a link
+                    resources.add(path.relative_to(instance_root))
+                # or a folder containing links
+                resources.update(
+                    Path(record["resource"])
+                    for record in records.values()
+                    if path in Path(record["path"]).parents
+                )
+                break
+
+    updated = False
+    for resource in sorted(resources):
+        for instance in instances:
+            updated |= _update_link(
+                minecraft_root, resource, instance, shulker_boxes, records, relative
+            )
+    if updated:
+        _write_link_manifest(
+            minecraft_root,
+            {
+                "shulker_boxes": manifest["shulker_boxes"],
+                "links": list(records.values()),
+            },
+        )
+
+
+def _box_changes(
+    path: Path,
+    chest_folder: Path,
+    shulker_boxes: list[ShulkerBox],
+    records: dict[str, dict[str, str]],
+) -> set[Path]:
+    """Work out which resources could be affected by a change inside the
+    EnderChest folder
+
+    Parameters
+    ----------
+    path : Path
+        The path that changed, relative to the EnderChest folder
+    chest_folder : Path
+        The (absolute) path to the EnderChest folder
+    shulker_boxes : list of ShulkerBox
+        The shulker boxes that could be linked on this machine
+    records : dict of str to dict
+        The records of the links placed previously, keyed by link path
+
+    Returns
+    -------
+    set of Path
+        The affected resources, relative to the root of the shulker box
+    """
+    if not path.parts:
+        return set()
+    if path.parts[0] == fs.ENDER_CHEST_CONFIG_NAME:
+        PLACE_LOGGER.warning(
+            "Your EnderChest's config has changed."
+            " Run `enderchest place` to pick up any new or removed instances."
+        )
+        return set()
+    if path.parts[0].startswith("."):
+        return set()  # hidden, per-machine state
+
+    box_root = chest_folder / path.parts[0]
+    box_path = Path(*path.parts[1:])
+
+    # previously linked resources, so that deleting a whole folder removes
+    # all the links into it
+    resources = {
+        Path(record["resource"])
+        for record in records.values()
+        if record["shulker_box"] == path.parts[0]
+        and (
+            Path(record["resource"]) == box_path
+            or box_path in Path(record["resource"]).parents
+        )
+    }
+    for shulker_box in shulker_boxes:
+        if Path(os.path.abspath(shulker_box.root.expanduser())) == box_root:
+            break
+    else:  # not a shulker box (or not anymore)
+        return resources
+
+    depth = shulker_box.max_link_depth
+    if box_path in (Path(), Path(fs.SHULKER_BOX_CONFIG_NAME)):
+        # the whole box is new, or it's been reconfigured
+        resources.update(Path(folder) for folder in shulker_box.link_folders)
+        resources.update(_list_resources(box_root, Path(), depth))
+    elif 0 < depth <= len(box_path.parts):
+        resources.add(Path(*box_path.parts[:depth]))
+    else:
+        resources.update(
+            _list_resources(
+                box_root, box_path, depth - len(box_path.parts) if depth > 0 else 0
+            )
+        )
+    return resources
+
+
+def _list_resources(box_root: Path, box_path: Path, max_depth: int) -> set[Path]:
+    """List the resources at or within a path inside a shulker box
+
+    Parameters
+    ----------
+    box_root : Path
+        The root of the shulker box
+    box_path : Path
+        The path to list, relative to the shulker box root
+    max_depth : int
+        The maximum number of levels to go (see `walk`)
+
+    Returns
+    -------
+    set of Path
+        The resources, relative to the shulker box root. If the path is not
+        a folder (or does not exist anymore), then the path itself is the only
+        resource.
+    """
+    if not (box_root / box_path).is_dir():
+        return {box_path}
+    try:
+        return {
+            box_path / resource
+            for resource in walk(box_root / box_path, max_depth).resources
+        }
+    except OSError as walk_fail:
+        PLACE_LOGGER.debug(f"Could not list {box_root / box_path}:\n  {walk_fail}")
+        return {box_path}
+
+
+def _update_link(
+    minecraft_root: Path,
+    resource: Path,
+    instance: InstanceSpec,
+    shulker_boxes: list[ShulkerBox],
+    records: dict[str, dict[str, str]],
+    relative: bool,
+) -> bool:
+    """Make sure that the link for a single resource in a single instance
+    points where it should (or is removed if it shouldn't exist anymore)
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    resource : Path
+        The resource, relative to the instance's ".minecraft" folder
+    instance : InstanceSpec
+        The instance
+    shulker_boxes : list of ShulkerBox
+        The shulker boxes that could be linked on this machine, in priority order
+    records : dict of str to dict
+        The records of the links placed previously, keyed by link path. This
+        will be updated in place.
+    relative : bool
+        Whether the link should use a relative path (if possible)
+
+    Returns
+    -------
+    bool
+        True if the records were updated, False otherwise
+    """
+    instance_root = _instance_root(minecraft_root, instance)
+    matching = [box for box in shulker_boxes if box.matches(instance)]
+    if any(
+        Path(folder) in resource.parents
+        for box in matching
+        for folder in box.link_folders
+    ):
+        return False
+
+    providers = [box for box in matching if _provides(box, resource)]
+    if not providers:
+        instance_path, _ = _link_target(
+            resource, instance_root, instance_root, relative
+        )
+        record = records.pop(str(instance_path), None)
+        if record is None:
+            return False
+        if _points_to(instance_path, record["target"]):
+            PLACE_LOGGER.info(f"Removing stale link: {instance_path}")
+            instance_path.unlink()
+        return True
+
+    shulker_box = providers[-1]
+    box_root = shulker_box.root.expanduser().absolute()
+    instance_path, target = _link_target(resource, box_root, instance_root, relative)
+    record = {
+        "path": str(instance_path),
+        "instance": instance.name,
+        "shulker_box": shulker_box.name,
+        "resource": resource.as_posix(),
+        "target": target,
+    }
+    if not _points_to(instance_path, target):
+        if not instance_root.exists():
+            PLACE_LOGGER.debug(f"No minecraft instance exists at {instance_root}")
+            return False
+        try:
+            link_resource(resource, box_root, instance_root, relative)
+        except (OSError, NotADirectoryError) as link_fail:
+            PLACE_LOGGER.error(
+                f"Could not link {instance_path} to {shulker_box.name}:\n  {link_fail}"
+            )
+            return False
+        PLACE_LOGGER.info(f"Linked {instance_path} to {shulker_box.name}")
+    if records.get(record["path"]) == record:
+        return False
+    records[record["path"]] = record
+    return True
+
+
+def _provides(shulker_box: ShulkerBox, resource: Path) -> bool:
+    """Check whether `place` would link a resource from a shulker box
+
+    Parameters
+    ----------
+    shulker_box : ShulkerBox
+        The shulker box
+    resource : Path
+        The resource, relative to the shulker box root
+
+    Returns
+    -------
+    bool
+        True if the resource is one of the box's link folders or is a file
+        (or folder at the max link depth) inside the box, False otherwise
+    """
+    if any(resource == Path(folder) for folder in shulker_box.link_folders):
+        return True
+    if resource == Path(fs.SHULKER_BOX_CONFIG_NAME):
+        return False
+    box_path = shulker_box.root.expanduser().absolute() / resource
+    if not os.path.lexists(box_path):
+        return False
+    depth = shulker_box.max_link_depth
+    if depth > 0 and len(resource.parts) >= depth:
+        return len(resource.parts) == depth
+    return not box_path.is_dir()
+
+
+def _instance_root(minecraft_root: Path, instance: InstanceSpec) -> Path:
+    """Resolve the (absolute) path to an instance's ".minecraft" folder
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+    instance : InstanceSpec
+        The instance
+
+    Returns
+    -------
+    Path
+        The path to the instance's ".minecraft" folder
+    """
+    return Path(
+        os.path.abspath((minecraft_root / instance.root.expanduser()).expanduser())
+    )
+
+
+def _watched_folders(minecraft_root: Path) -> set[Path]:
+    """Determine which folders need watching
+
+    Parameters
+    ----------
+    minecraft_root : Path
+        The root directory that your minecraft stuff (or, at least, the one
+        that's the parent of your EnderChest folder)
+
+    Returns
+    -------
+    set of Path
+        The EnderChest folder, each folder inside of each shulker box that
+        `place` would search for resources, each instance's ".minecraft"
+        folder and each folder inside of an instance where EnderChest has
+        placed a link
+    """
+    chest_folder = Path(os.path.abspath(fs.ender_chest_folder(minecraft_root)))
+    folders = {chest_folder}
+    for shulker_box in load_shulker_boxes(minecraft_root, log_level=logging.DEBUG):
+        box_root = shulker_box.root.expanduser().absolute()
+        folders.add(box_root)
+        _add_searched_folders(
+            box_root,
+            Path(),
+            shulker_box.max_link_depth,
+            {Path(folder) for folder in shulker_box.link_folders},
+            folders,
+        )
+    for instance in load_ender_chest_instances(minecraft_root, log_level=logging.DEBUG):
+        folders.add(_instance_root(minecraft_root, instance))
+    for record in _load_link_manifest(minecraft_root)["links"]:
+        folders.add(Path(record["path"]).parent)
+    return {folder for folder in folders if folder.is_dir()}
+
+
+def _add_searched_folders(
+    folder: Path,
+    relative_folder: Path,
+    max_depth: int,
+    link_folders: set[Path],
+    folders: set[Path],
+) -> None:
+    """Recursive helper for `_watched_folders` that finds the folders inside
+    a shulker box that could contain resources
+
+    Parameters
+    ----------
+    folder : Path
+        The (full) path of the folder currently being searched
+    relative_folder : Path
+        The path of that folder relative to the shulker box root
+    max_depth : int
+        The number of levels left to go
+    link_folders : set of Path
+        The shulker box's link folders (which don't need to be searched)
+    folders : set of Path
+        The folders found so far. This will be updated in place.
+    """
+    if max_depth == 1:
+        return
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if relative_folder / entry.name in link_folders:
+                    continue
+                folders.add(Path(entry.path))
+                _add_searched_folders(
+                    Path(entry.path),
+                    relative_folder / entry.name,
+                    max_depth - 1,
+                    link_folders,
+                    folders,
+                )
+    except OSError as search_fail:
+        PLACE_LOGGER.debug(f"Could not search {folder}:\n  {search_fail}")
+
+
+class _Inotify:
+    """Watch folders for changes using Linux's inotify API"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            self._rm_watch = libc.inotify_rm_watch
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except AttributeError as no_inotify:
+            raise OSError("inotify is not supported on this system") from no_inotify
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._fd: int = fd
+        self._folders: dict[Path, int] = {}
+        self._descriptors: dict[int, set[Path]] = {}
+
+    def watch(self, folders: set[Path]) -> None:
+        """Set the folders to watch
+
+        Parameters
+        ----------
+        folders : set of Path
+            The folders to watch. Any folders that are currently being watched
+            but aren't in this set will stop being watched.
+        """
+        for folder in set(self._folders) - folders:
+            descriptor = self._folders.pop(folder)
+            self._descriptors[descriptor].discard(folder)
+            if not self._descriptors[descriptor]:
+                del self._descriptors[descriptor]
+                self._rm_watch(self._fd, descriptor)
+        for folder in folders - set(self._folders):
+            descriptor = self._add_watch(
+                self._fd, os.fsencode(folder), _IN_MASK | _IN_ONLYDIR
+            )
+            if descriptor < 0:
+                errno = ctypes.get_errno()
+                PLACE_LOGGER.warning(
+                    f"Could not watch {folder}:\n  {os.strerror(errno)}"
+                )
+                continue
+            self._folders[folder] = descriptor
+            self._descriptors.setdefault(descriptor, set()).add(folder)
+
+    def changes(self, timeout: float) -> set[Path]:
+        """Wait for changes to any of the watched folders
+
+        Parameters
+        ----------
+        timeout : float
+            The maximum number of seconds to wait
+
+        Returns
+        -------
+        set of Path
+            The paths that changed (empty if nothing changed before the
+            timeout)
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        buffer = b""
+        while True:
+            try:
+                buffer += os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+        changed: set[Path] = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            descriptor, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[
+                offset + _EVENT_HEADER.size : offset + _EVENT_HEADER.size + length
+            ]
+            offset += _EVENT_HEADER.size + length
+            if mask & _IN_Q_OVERFLOW:
+                PLACE_LOGGER.warning("Missed some changes. Re-checking everything.")
+                changed.update(self._folders)
+                continue
+            folders = self._descriptors.get(descriptor, set())
+            if mask & _IN_IGNORED:  # the watch was removed
+                for folder in folders:
+                    self._folders.pop(folder, None)
+                self._descriptors.pop(descriptor, None)
+            name = name.rstrip(b"\0")
+            for folder in folders:
+                changed.add(folder / os.fsdecode(name) if name else folder)
+        return changed
+
+    def close(self) -> None:
+        """Stop watching"""
+        os.close(self._fd)
+
+
+class _Poller:
+    """Watch folders for changes by periodically listing their contents
+
+    Parameters
+    ----------
+    stop : Event
+        Setting this event will interrupt any waiting
+    """
+
+    def __init__(self, stop: threading.Event):
+        self._stop = stop
+        self._listings: dict[Path, dict[str, tuple[bool, int, int]] | None] = {}
+
+    def watch(self, folders: set[Path]) -> None:
+        """Set the folders to watch
+
+        Parameters
+        ----------
+        folders : set of Path
+            The folders to watch. Any folders that are currently being watched
+            but aren't in this set will stop being watched.
+        """
+        self._listings = {
+            folder: self._listings[folder]
+            if folder in self._listings
+            else _list_folder(folder)
+            for folder in folders
+        }
+
+    def changes(self, timeout: float) -> set[Path]:
+        """Wait, then check for changes to any of the watched folders
+
+        Parameters
+        ----------
+        timeout : float
+            The number of seconds to wait before checking
+
+        Returns
+        -------
+        set of Path
+            The paths that changed since the last check
+        """
+        if self._stop.wait(timeout):
+            return set()
+        changed: set[Path] = set()
+        for folder, previous in self._listings.items():
+            current = _list_folder(folder)
+            if current == previous:
+                continue
+            self._listings[folder] = current
+            if current is None or previous is None:
+                changed.add(folder)
+                continue
+            changed.update(
+                folder / name
+                for name in current.keys() | previous.keys()
+                if current.get(name) != previous.get(name)
+            )
+        return changed
+
+    def close(self) -> None:
+        """Stop watching"""
+
+
+def _list_folder(folder: Path) -> dict[str, tuple[bool, int, int]] | None:
+    """List the contents of a folder for the purposes of polling for changes
+
+    Parameters
+    ----------
+    folder : Path
+        The folder to list
+
+    Returns
+    -------
+    dict of str to (bool, int, int) tuples, or None
+        Whether each entry is a folder, along with its modification time
+        (in nanoseconds) and size, keyed by name. If the folder cannot be
+        listed, this will be None.
+    """
+    try:
+        listing: dict[str, tuple[bool, int, int]] = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    entry_stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:  # deleted mid-listing
+                    continue
+                listing[entry.name] = (
+                    entry.is_dir(follow_symlinks=False),
+                    entry_stat.st_mtime_ns,
+                    entry_stat.st_size,
+                )
+        return listing
+    except OSError:
+        return None